@@ -0,0 +1,4 @@
+"""
+The correlation and forecast dashboards as one package, sharing one loaded table,
+its caches and fitted models. Run every view on one server with python -m dashboards.
+"""
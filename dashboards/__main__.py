@@ -0,0 +1,23 @@
+import argparse
+
+parser = argparse.ArgumentParser(prog='python -m dashboards', description="Runs the dashboards on one server.")
+parser.add_argument('--startup-report', action='store_true',
+                    help="print how long the app takes to start and which imports the time goes to, then exit")
+parser.add_argument('--top', type=int, default=15, help="packages and modules listed in the startup report")
+parser.add_argument('--metrics', action='store_true',
+                    help="time the stages of the operations, served as Prometheus text on /metrics")
+parser.add_argument('--trace-memory', action='store_true',
+                    help="with --metrics, trace the bytes each stage allocates too, slowing everything down")
+parser.add_argument('--port', type=int, default=8050, help="port the app is served on")
+parser.add_argument('--no-debug', action='store_true', help="run without the Dash debugger and reloader")
+args = parser.parse_args()
+
+if args.startup_report:
+    from dashboards.startup import startup_report
+    print(startup_report(top=args.top))
+else:
+    if args.metrics:
+        from dashboards.metrics import metrics
+        metrics.enable(trace_memory=args.trace_memory)
+    from dashboards.app import app
+    app.run_server(port=args.port, debug=not args.no_debug)
@@ -0,0 +1,65 @@
+from dash import dcc, Dash, html
+from dash.dependencies import Input, Output
+from flask import Response, request
+from dashboards.correlation.operations import SHARED_OBJECTS
+from dashboards.metrics import metrics
+from dashboards.registry import registry
+from dashboards.views import heatmap, scatter, forecast
+
+# the path of each page and the view serving it
+PAGES = {
+    '/heatmap': ('Correlation heatmap', heatmap),
+    '/scatter': ('Scatter plot', scatter),
+    '/forecast': ('Forecast', forecast),
+}
+
+
+def create_app(warm: bool = True) -> Dash:
+    """
+    Makes the Dash app serving every view in one process, so the views share the
+    table, caches and fitted models instead of each app loading its own.
+    Args:
+        warm: whether to start loading the table and building what the views need from it
+        on a background thread, otherwise it's loaded by the first request.
+    Returns:
+        a Dash app
+    """
+    # the figures are sent as json lists, gzip shrinks them on the way to the browser
+    app = Dash(__name__, suppress_callback_exceptions=True, compress=True)
+    # the sheets are listed from the workbook's zip metadata, a sheet is only loaded when it's chosen
+    sheet_selector = dcc.Dropdown(id='sheet', value=registry.sheet_name, clearable=False,
+                                  options=[{'label': sheet, 'value': sheet} for sheet in registry.sheets()])
+    app.layout = html.Div(children=[
+        dcc.Location(id='url'),
+        html.Nav(children=[dcc.Link(title, href=path, style={'margin-right': '1em'})
+                           for path, (title, _) in PAGES.items()]),
+        sheet_selector,
+        html.Div(id='page')
+    ])
+    for _, view in PAGES.values():
+        view.register_callbacks(app)
+
+    @app.callback(Output('page', 'children'), Input('url', 'pathname'), Input('sheet', 'value'))
+    def display_page(pathname, sheet):
+        # the heatmap is the home page, the page is made again from the chosen sheet when it changes
+        _, view = PAGES.get(pathname, PAGES['/heatmap'])
+        return view.layout(sheet)
+
+    # the timings of the operations, as Prometheus text or as json with ?format=json
+    @app.server.route('/metrics')
+    def metrics_route():
+        if request.args.get('format') == 'json':
+            return Response(metrics.to_json(), mimetype='application/json')
+        return Response(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    if warm:
+        registry.warm(SHARED_OBJECTS)
+    return app
+
+
+app = create_app()
+# for running the app with a wsgi server e.g gunicorn dashboards.app:server
+server = app.server
+
+if __name__ == "__main__":
+    app.run_server(debug=True)
@@ -0,0 +1,198 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+from dashboards.data_loader import compact_frame, tag_frame
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# the series every synthetic sheet has one clean row per year of, so it can be forecast
+SERIES = ('Indicator 00', 'Benchmark State', 'Source 0')
+
+
+def synthetic_sheet(rows: int, indicators: int = 12, states: int = 37, lgas: int = 20,
+                    sources: int = 4, first_year: int = 1990, years: int = 30,
+                    seed: int = 0, compact: bool = False) -> pd.DataFrame:
+    """
+    Makes a dataframe laid out like the correlation input sheet, with the columns
+    Indicator, Period, State, LGA, Source and Value, filled with random rows.
+    Args:
+        rows: number of rows in the dataframe.
+        indicators: number of distinct indicators.
+        states: number of distinct states.
+        lgas: number of distinct LGAs in each state, 'All' is used for state level rows.
+        sources: number of distinct data sources.
+        first_year: the first year in the Period column.
+        years: number of distinct years in the Period column.
+        seed: seed for the random number generator.
+        compact: make the dataframe compact like load_sheet does, see compact_frame.
+    Returns:
+        a pandas dataframe
+    """
+    rng = np.random.default_rng(seed)
+    indicator_names = np.array([f"Indicator {i:02d}" for i in range(indicators)], dtype=object)
+    state_names = np.array([f"State {i:02d}" for i in range(states)], dtype=object)
+    lga_names = np.array(['All'] + [f"LGA {i:03d}" for i in range(lgas)], dtype=object)
+    source_names = np.array([f"Source {i}" for i in range(sources)], dtype=object)
+
+    # one clean row per year for SERIES, the rest of the rows are random
+    series_years = min(years, rows)
+    random_rows = rows - series_years
+    indicator, state, source = SERIES
+    data_frame = pd.DataFrame({
+        'Indicator': np.concatenate([np.full(series_years, indicator, dtype=object),
+                                     indicator_names[rng.integers(0, indicators, random_rows)]]),
+        'Period': np.concatenate([np.arange(first_year, first_year + series_years),
+                                  rng.integers(first_year, first_year + years, random_rows)]),
+        'State': np.concatenate([np.full(series_years, state, dtype=object),
+                                 state_names[rng.integers(0, states, random_rows)]]),
+        'LGA': np.concatenate([np.full(series_years, 'All', dtype=object),
+                               lga_names[rng.integers(0, lgas + 1, random_rows)]]),
+        'Source': np.concatenate([np.full(series_years, source, dtype=object),
+                                  source_names[rng.integers(0, sources, random_rows)]]),
+        'Value': np.concatenate([100 - np.arange(series_years) + rng.normal(0, 1, series_years),
+                                 rng.gamma(2.0, 50.0, random_rows)]),
+    })
+    if compact:
+        data_frame = compact_frame(data_frame)
+    return tag_frame(data_frame, f"synthetic-{rows}-{seed}{'-compact' if compact else ''}")
+
+
+def measure(func, repeat: int = 3, memory: bool = True) -> dict:
+    """
+    Times a function and tracks the most memory it allocates at once.
+    The memory is measured on an extra run, tracemalloc slows the timed runs down otherwise.
+    Args:
+        func: the function to be measured, called with no arguments.
+        repeat: the number of timed runs.
+        memory: whether to measure the peak memory.
+    Returns:
+        a dictionary with the best and median time in seconds and the peak memory in MB
+    """
+    timings = []
+    # keep the print outs and warnings of the operations out of the benchmark report
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        peak = np.nan
+        if memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            finally:
+                tracemalloc.stop()
+    return {'best': min(timings), 'median': statistics.median(timings), 'peak_mb': peak}
+
+
+def run_suite(cases: dict, sizes=SIZES, repeat: int = 3, memory: bool = True, **sheet_options) -> pd.DataFrame:
+    """
+    Measures every case on a synthetic sheet of each size.
+    Args:
+        cases: dictionary of case name to a setup function, the setup function takes
+               the synthetic sheet and gives back the function to be measured.
+        sizes: the number of rows of the synthetic sheets.
+        repeat: the number of timed runs of every case.
+        memory: whether to measure the peak memory.
+        sheet_options: options passed on to synthetic_sheet.
+    Returns:
+        a dataframe with a row per case and size
+    """
+    results = []
+    for rows in sizes:
+        data_frame = synthetic_sheet(rows, **sheet_options)
+        for name, setup in cases.items():
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                func = setup(data_frame)
+            result = measure(func, repeat=repeat, memory=memory)
+            results.append({'case': name, 'rows': rows, **result})
+            print(f"{name:<40} {rows:>10} rows  {result['best']:.4f}s  {result['peak_mb']:.1f}MB")
+    return pd.DataFrame(results)
+
+
+def save_baseline(results: pd.DataFrame, path: str):
+    """
+    Saves results as the baseline later runs are compared against.
+    Args:
+        results: the dataframe from run_suite.
+        path: path of the json file.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as baseline_file:
+        json.dump(results.to_dict(orient='records'), baseline_file, indent=1)
+
+
+def load_baseline(path: str) -> pd.DataFrame:
+    """Reads the results saved with save_baseline."""
+    with open(path) as baseline_file:
+        return pd.DataFrame(json.load(baseline_file))
+
+
+def compare(results: pd.DataFrame, baseline: pd.DataFrame, threshold: float = 0.1) -> pd.DataFrame:
+    """
+    Compares results with a baseline.
+    Args:
+        results: the dataframe from run_suite.
+        baseline: the dataframe from load_baseline.
+        threshold: how much slower than the baseline, as a fraction, a case can get
+                   before it is marked as a regression.
+    Returns:
+        a dataframe with the baseline and current best times and their ratio for each case and size
+    """
+    merged = results.merge(baseline, on=['case', 'rows'], how='left', suffixes=('', '_baseline'))
+    merged['speedup'] = merged['best_baseline'] / merged['best']
+    merged['regression'] = merged['best'] > merged['best_baseline'] * (1 + threshold)
+    return merged[['case', 'rows', 'best_baseline', 'best', 'speedup',
+                   'peak_mb_baseline', 'peak_mb', 'regression']]
+
+
+def main(cases: dict, baseline_path: str, argv=None):
+    """
+    Runs a benchmark suite from the command line.
+    e.g, python -m dashboards.correlation.benchmark_suite --sizes 1000 100000 --save
+    Args:
+        cases: the cases passed on to run_suite.
+        baseline_path: where the baseline is saved.
+        argv: command line arguments, sys.argv when None.
+    """
+    parser = argparse.ArgumentParser(description="Times the operations on synthetic sheets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES),
+                        help="number of rows of the synthetic sheets, up to 10000000")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs of every case")
+    parser.add_argument('--cases', nargs='+', default=None, help="only run these cases")
+    parser.add_argument('--no-memory', action='store_true', help="skip measuring peak memory")
+    parser.add_argument('--compact', action='store_true',
+                        help="run on compact sheets, with categorical text columns and float32 values")
+    parser.add_argument('--save', action='store_true', help="save the results as the baseline")
+    parser.add_argument('--baseline', default=baseline_path, help="path of the baseline file")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="slowdown over the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+
+    selected = {name: setup for name, setup in cases.items() if args.cases is None or name in args.cases}
+    results = run_suite(selected, sizes=args.sizes, repeat=args.repeat, memory=not args.no_memory,
+                        compact=args.compact)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        comparison = compare(results, load_baseline(args.baseline), threshold=args.threshold)
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(comparison.to_string(index=False))
+        if comparison['regression'].any():
+            print(f"\n{int(comparison['regression'].sum())} case(s) slower than the baseline")
+    return results
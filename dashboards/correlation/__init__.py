@@ -0,0 +1 @@
+"""Filtering, reshaping and correlating the indicators of the input sheet."""
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+import pandas as pd
+from dashboards.correlation.column_formatter import ColumnFormatter
+
+# the row by row replace this module is benchmarked against gets too slow to run past this size
+LOOP_MAX_ROWS = 10_000
+
+
+def state_column(rows: int, states: int = 37, seed: int = 0) -> pd.Series:
+    """
+    Makes a column of state names like the State column of the correlation input sheet.
+    Args:
+        rows: number of rows in the column.
+        states: number of distinct states in the column.
+        seed: seed for the random number generator.
+    Returns:
+        a pandas series
+    """
+    names = np.array([f"State {i:02d}" for i in range(states)], dtype=object)
+    return pd.Series(names[np.random.default_rng(seed).integers(0, states, rows)])
+
+
+def loop_replace(column: pd.Series, target_map: dict):
+    """The original replace_column_values, one replace call per row."""
+    column_to_list = column.to_list()
+    for i in range(len(column_to_list)):
+        column.replace(column_to_list[i], target_map[column_to_list[i]], inplace=True)
+
+
+def encode(column: pd.Series):
+    """Enumerates a column with encode_column, including building the formatter."""
+    return ColumnFormatter(column).encode_column()
+
+
+def time_call(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run(sizes=(1_000, 10_000, 100_000, 1_000_000, 10_000_000)):
+    """
+    Times enumerating a state column the old way and with encode_column for each size.
+    Args:
+        sizes: the number of rows to benchmark with.
+    Returns:
+        a dataframe of timings in seconds
+    """
+    timings = []
+    for rows in sizes:
+        column = state_column(rows)
+        encode_time = time_call(encode, column)
+        if rows <= LOOP_MAX_ROWS:
+            loop_time = time_call(loop_replace, column.copy(), ColumnFormatter(column).enumerate_column())
+        else:
+            loop_time = np.nan
+        timings.append({'rows': rows, 'loop_replace': loop_time, 'encode_column': encode_time})
+    return pd.DataFrame(timings).set_index('rows')
+
+
+if __name__ == "__main__":
+    print(run())
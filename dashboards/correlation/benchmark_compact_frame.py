@@ -0,0 +1,68 @@
+import timeit
+
+import pandas as pd
+from dashboards.data_loader import load_sheet
+from dashboards.correlation.data_frame_formatter import DataFrameFormatter, column_isin
+
+# filters the operations make, as (column, value) pairs
+FILTERS = [('Source', 'NHMIS'), ('Indicator', 'Infant Mortality rate'), ('State', 'Lagos'), ('Period', 2018)]
+
+
+def time_filters(data_frame: pd.DataFrame, number: int = 200) -> float:
+    """
+    Times finding the rows that match each filter in FILTERS, the comparison
+    sheet_splitter and DataFrameFormatter make on every request.
+    Args:
+        data_frame: the table to be filtered.
+        number: the number of times the filters are run.
+    Returns:
+        the seconds one round of filters takes
+    """
+    def filters():
+        for column, value in FILTERS:
+            column_isin(data_frame[column], [value])
+    return timeit.timeit(filters, number=number) / number
+
+
+def time_select(data_frame: pd.DataFrame, number: int = 200) -> float:
+    """
+    Times a DataFrameFormatter query like the one correlation_operations makes,
+    for the source and period with the most rows and their three most common indicators.
+    Args:
+        data_frame: the table to be queried.
+        number: the number of times the query is run.
+    Returns:
+        the seconds one query takes
+    """
+    formatter = DataFrameFormatter(data_frame)
+    source, period = data_frame.groupby(['Source', 'Period'], observed=True).size().idxmax()
+    rows = data_frame[(data_frame['Source'] == source) & (data_frame['Period'] == period)]
+    indicators = list(rows['Indicator'].value_counts().index[:3])
+    query = {'Source': [source], 'Period': period, 'Indicator': indicators}
+    return timeit.timeit(lambda: formatter.select(query), number=number) / number
+
+
+def run(workbook_path: str = "data/msdat_data.xlsx", sheet_name: str = "Sheet1"):
+    """
+    Compares the memory and filter times of a sheet loaded with the dtypes read_excel
+    gives and loaded compact, with categorical text columns, int16 periods and float32 values.
+    Args:
+        workbook_path: path to the excel workbook.
+        sheet_name: the sheet in the workbook to benchmark with.
+    Returns:
+        a dataframe with the memory in MB and the timings in seconds
+    """
+    frames = {'object': load_sheet(workbook_path, sheet_name, compact=False),
+              'compact': load_sheet(workbook_path, sheet_name, compact=True)}
+    results = pd.DataFrame({
+        name: {'memory_mb': data_frame.memory_usage(deep=True).sum() / 2 ** 20,
+               'filters': time_filters(data_frame),
+               'select': time_select(data_frame)}
+        for name, data_frame in frames.items()
+    }).T
+    results.loc['improvement'] = results.loc['object'] / results.loc['compact']
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
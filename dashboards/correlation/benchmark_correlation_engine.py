@@ -0,0 +1,59 @@
+import timeit
+
+import numpy as np
+import pandas as pd
+from dashboards.correlation.correlation_engine import correlate
+
+# numbers of indicators in the wide tables, the sample sheet has about 50
+WIDTHS = (50, 200, 500)
+
+
+def wide_table(indicators: int, rows: int = 774, missing: float = 0.2, seed: int = 0) -> pd.DataFrame:
+    """
+    Makes a reshaped table like the one a heatmap correlates, a row per state
+    and a column per indicator, with some of the values missing.
+    Args:
+        indicators: the number of columns.
+        rows: the number of rows.
+        missing: the fraction of values that are missing.
+        seed: seed for the random number generator.
+    Returns:
+        a dataframe
+    """
+    rng = np.random.default_rng(seed)
+    # mix a few shared factors into every column so the columns are correlated
+    factors = rng.normal(size=(rows, 5))
+    values = factors @ rng.normal(size=(5, indicators)) + rng.normal(size=(rows, indicators))
+    values[rng.random(values.shape) < missing] = np.nan
+    return pd.DataFrame(values, columns=[f"Indicator {i:03d}" for i in range(indicators)])
+
+
+def run(widths=WIDTHS, methods=('pearson', 'spearman'), number: int = 3):
+    """
+    Compares correlate with DataFrame.corr on wide tables, checking they give the
+    same matrix and timing both.
+    Args:
+        widths: the numbers of indicators to try.
+        methods: the correlation methods to try, kendall is left out by default
+                 since both sides loop over the pairs for it.
+        number: the number of times each is run.
+    Returns:
+        a dataframe with the seconds each takes, the speedup and the largest difference
+    """
+    results = []
+    for indicators in widths:
+        data_frame = wide_table(indicators)
+        for method in methods:
+            engine = correlate(data_frame, method=method)['corr']
+            pandas = data_frame.corr(method=method)
+            engine_time = timeit.timeit(lambda: correlate(data_frame, method=method), number=number) / number
+            pandas_time = timeit.timeit(lambda: data_frame.corr(method=method), number=number) / number
+            results.append({'indicators': indicators, 'method': method,
+                            'engine': engine_time, 'DataFrame.corr': pandas_time,
+                            'speedup': pandas_time / engine_time,
+                            'max_difference': np.nanmax(np.abs(engine.to_numpy() - pandas.to_numpy()))})
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(run())
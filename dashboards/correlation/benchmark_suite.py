@@ -0,0 +1,72 @@
+from dashboards.benchmark_tools import main
+from dashboards.correlation.column_formatter import ColumnFormatter
+from dashboards.correlation.correlation_cube import CorrelationCube
+from dashboards.correlation.data_frame_formatter import DataFrameFormatter
+from dashboards.correlation.operations import prep_data, correlation_operations, scatter_operations
+
+BASELINE_PATH = "data/benchmarks/correlation_baseline.json"
+
+# the query every case runs, in the shape the dashboard callbacks send it
+QUERY = {'query_elem': 'Period', 'query_value': 1995, 'source_query': ['Source 0'], 'source': 'Source'}
+INDICATORS = ['Indicator 00', 'Indicator 01', 'Indicator 02', 'Indicator 03']
+
+
+def prep_data_case(data_frame):
+    formatter = DataFrameFormatter(data_frame)
+    return lambda: list(prep_data(query_element=QUERY['query_elem'], query_value=QUERY['query_value'],
+                                  columns_to_drop=['Source', 'Period', 'LGA'],
+                                  source_query=QUERY['source_query'], source=QUERY['source'],
+                                  df_formatter=formatter))
+
+
+def correlation_case(data_frame):
+    # __wrapped__ skips the result cache so every run does the work
+    return lambda: list(correlation_operations.__wrapped__(values_to_see=INDICATORS, new_values='Value',
+                                                           new_columns='Indicator', new_index_column='State',
+                                                           correlation_input_df=data_frame,
+                                                           **QUERY))
+
+
+def correlation_cube_case(data_frame):
+    cube = CorrelationCube(data_frame)
+    return lambda: list(correlation_operations.__wrapped__(values_to_see=INDICATORS, new_values='Value',
+                                                           new_columns='Indicator', new_index_column='State',
+                                                           correlation_input_df=data_frame,
+                                                           correlation_cube=cube, **QUERY))
+
+
+def cube_append_case(data_frame):
+    # the last rows stand in for a batch from the data feed, each run adds them again
+    cube = CorrelationCube(data_frame)
+    new_rows = data_frame.tail(100)
+    return lambda: cube.append(new_rows)
+
+
+def cube_rebuild_case(data_frame):
+    return lambda: CorrelationCube(data_frame)
+
+
+def scatter_case(data_frame):
+    return lambda: list(scatter_operations.__wrapped__(data_frame=data_frame, horizontal=INDICATORS[0],
+                                                       vertical=INDICATORS[1], column_name='Indicator',
+                                                       **QUERY))
+
+
+def replace_column_values_case(data_frame):
+    states = data_frame['State']
+    target_map = ColumnFormatter(states).enumerate_column()
+    return lambda: ColumnFormatter(states).replace_column_values(target_map)
+
+
+CASES = {
+    'prep_data': prep_data_case,
+    'correlation_operations': correlation_case,
+    'correlation_operations (cube)': correlation_cube_case,
+    'CorrelationCube.append (100 rows)': cube_append_case,
+    'CorrelationCube (rebuild)': cube_rebuild_case,
+    'scatter_operations': scatter_case,
+    'ColumnFormatter.replace_column_values': replace_column_values_case,
+}
+
+if __name__ == "__main__":
+    main(CASES, BASELINE_PATH)
@@ -0,0 +1,86 @@
+import pandas as pd
+import numpy as np
+from dashboards.metrics import metrics
+
+# the enumerated equivalent of a missing value, it is never a position in labels
+MISSING_CODE = -1
+
+
+class ColumnFormatter:
+
+    def __init__(self, column: pd.Series):
+        self.column = column
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # the categories in use are the unique values, no need to look at every row
+            codes = column.cat.codes.to_numpy()
+            self._used = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(column.cat.categories)))
+            self.labels = np.sort(column.cat.categories.to_numpy()[self._used])
+        else:
+            # sorted unique values of the column, the position of a value is its enumerated equivalent,
+            # missing values aren't labels, they are encoded as MISSING_CODE
+            uniques = pd.unique(self.column.to_numpy())
+            self.labels = np.sort(uniques[~pd.isna(uniques)])
+
+    def enumerate_column(self):
+        """Enumerates the items in the column"""
+        enumerated = enumerate(self.labels)
+        target_dict = {k: v for v, k in enumerated}
+        return target_dict
+
+    def inverse_map(self):
+        """Maps the enumerated equivalents back to the items in the column"""
+        return dict(enumerate(self.labels))
+
+    def encode_column(self):
+        """
+        Finds the enumerated equivalent of every value in the column in a single pass
+        without changing the column itself.
+        Returns:
+            a numpy array with the enumerated equivalent of each value in the column,
+            MISSING_CODE for missing values
+        """
+        if isinstance(self.column.dtype, pd.CategoricalDtype):
+            # look the categories up in labels once and map every row's code through that
+            categories = self.column.cat.categories.to_numpy()
+            lookup = np.full(len(categories) + 1, -1, dtype=np.intp)
+            lookup[self._used] = np.searchsorted(self.labels, categories[self._used])
+            return lookup[self.column.cat.codes.to_numpy()]
+        # sorting the factorized uniques gives the same order as labels, missing values are -1
+        codes, _ = pd.factorize(self.column, sort=True)
+        return codes
+
+    def decode_column(self, codes):
+        """
+        Turns enumerated equivalents back into the items in the column.
+        Args:
+            codes: the enumerated equivalents to be decoded.
+        Returns:
+            a numpy array, with NaN where a code is MISSING_CODE
+        """
+        codes = np.asarray(codes)
+        if (codes < MISSING_CODE).any():
+            raise ValueError(f"codes can't be below {MISSING_CODE}, the code of missing values")
+        missing = codes == MISSING_CODE
+        if not missing.any():
+            return self.labels[codes]
+        # never index labels with -1, that would give the last label instead of a missing value
+        decoded = self.labels.astype(object)[np.where(missing, 0, codes)] if len(self.labels) \
+            else np.empty(codes.shape, dtype=object)
+        decoded[missing] = np.nan
+        return decoded
+
+    @metrics.timed()
+    def replace_column_values(self, target_map: dict = None) -> pd.Series:
+        """
+        Gives the column with its values replaced by their corresponding target dictionary value,
+        the column itself is left as it is.
+        Args:
+            target_map: target dictionary, the one enumerate_column gives when None
+        Returns:
+            a series with the index and name of the column
+        """
+        if target_map is None or target_map == self.enumerate_column():
+            codes = self.encode_column()
+        else:
+            codes = self.column.map(target_map).to_numpy()
+        return pd.Series(codes, index=self.column.index, name=self.column.name)
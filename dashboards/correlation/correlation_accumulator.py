@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from dashboards.correlation.correlation_engine import masked_values, pairwise_counts, pearson_from_sums
+
+
+class CorrelationAccumulator:
+    """
+    Keeps the sums the pairwise complete Pearson correlation of a reshaped table
+    is worked out from, the shared counts, sums, sums of squares and sums of products
+    of every pair of columns, and updates them as values are added to the table.
+    Adding a value to a cell only changes the sums of that cell's column, so new rows
+    cost O(k) each for k columns instead of reshaping and correlating the table again.
+    It isn't safe to add to from one thread while another reads it, CorrelationCube holds a lock for that.
+    e.g, accumulator.add('Lagos', 'Infant Mortality rate', 71.0); accumulator.correlation()
+    """
+
+    def __init__(self, capacity: int = 8):
+        """
+        Args:
+            capacity: the number of rows and columns room is made for at first.
+        """
+        self.row_positions = {}
+        self.column_positions = {}
+        self.cells = np.zeros((capacity, capacity))
+        self.present = np.zeros((capacity, capacity))
+        # every column is kept relative to a value of its own so the sums don't lose precision
+        self.shift = np.zeros(capacity)
+        self.counts = np.zeros((capacity, capacity))
+        self.sums = np.zeros((capacity, capacity))
+        self.squares = np.zeros((capacity, capacity))
+        self.products = np.zeros((capacity, capacity))
+        self._corr = None
+
+    @classmethod
+    def from_table(cls, reshaped_table: pd.DataFrame):
+        """
+        Makes an accumulator holding a reshaped table, working the sums out all at once.
+        Args:
+            reshaped_table: a wide dataframe, rows are observations (e.g states) and columns
+                            are variables (e.g indicators), NaN where missing.
+        Returns:
+            a CorrelationAccumulator
+        """
+        rows, columns = reshaped_table.shape
+        accumulator = cls(capacity=max(rows, columns, 1))
+        accumulator.row_positions = {label: position for position, label in enumerate(reshaped_table.index)}
+        accumulator.column_positions = {label: position for position, label in enumerate(reshaped_table.columns)}
+
+        values, mask = masked_values(reshaped_table)
+        column_counts = mask.sum(axis=0)
+        shift = np.divide(values.sum(axis=0), column_counts, out=np.zeros_like(column_counts),
+                          where=column_counts > 0)
+        values = (values - shift) * mask
+
+        accumulator.cells[:rows, :columns] = values
+        accumulator.present[:rows, :columns] = mask
+        accumulator.shift[:columns] = shift
+        square = (slice(0, columns), slice(0, columns))
+        accumulator.counts[square] = pairwise_counts(mask)
+        accumulator.sums[square] = values.T @ mask
+        accumulator.squares[square] = (values * values).T @ mask
+        accumulator.products[square] = values.T @ values
+        return accumulator
+
+    @property
+    def labels(self) -> np.ndarray:
+        """The column labels in the order of the matrices."""
+        return np.array(list(self.column_positions), dtype=object)
+
+    def _grow(self, rows: int, columns: int):
+        """Makes room for at least the given number of rows and columns, doubling the arrays."""
+        capacity_rows, capacity_columns = self.cells.shape
+        if rows > capacity_rows or columns > capacity_columns:
+            new_rows = max(rows, 2 * capacity_rows) if rows > capacity_rows else capacity_rows
+            new_columns = max(columns, 2 * capacity_columns) if columns > capacity_columns else capacity_columns
+            for name in ('cells', 'present'):
+                grown = np.zeros((new_rows, new_columns))
+                grown[:capacity_rows, :capacity_columns] = getattr(self, name)
+                setattr(self, name, grown)
+        if columns > len(self.shift):
+            size = max(columns, 2 * len(self.shift))
+            self.shift = np.resize(self.shift, size)
+            for name in ('counts', 'sums', 'squares', 'products'):
+                grown = np.zeros((size, size))
+                old = getattr(self, name)
+                grown[:old.shape[0], :old.shape[1]] = old
+                setattr(self, name, grown)
+
+    def _position(self, row_label, column_label, value: float):
+        """Gives the (row, column) position of a cell, adding its row or column when it is new."""
+        row = self.row_positions.get(row_label)
+        column = self.column_positions.get(column_label)
+        if row is None or column is None:
+            self._grow(len(self.row_positions) + (row is None), len(self.column_positions) + (column is None))
+        if row is None:
+            row = self.row_positions[row_label] = len(self.row_positions)
+        if column is None:
+            column = self.column_positions[column_label] = len(self.column_positions)
+            self.shift[column] = value
+        return row, column
+
+    def add(self, row_label, column_label, value: float):
+        """
+        Adds a value to a cell of the table, summed with what the cell already holds
+        like pivot_table(aggfunc='sum'), and updates the sums of the cell's column.
+        Args:
+            row_label: the row of the cell, e.g a state.
+            column_label: the column of the cell, e.g an indicator.
+            value: the value to add, missing values are left out.
+        """
+        if value is None or np.isnan(value):
+            return
+        row, column = self._position(row_label, column_label, value)
+        columns = len(self.column_positions)
+
+        # the rest of the row, the cell itself is handled on its own below
+        others_present = self.present[row, :columns].copy()
+        others_present[column] = 0.0
+        others = self.cells[row, :columns] * others_present
+
+        was_present = self.present[row, column]
+        old = self.cells[row, column] * was_present
+        new = old + value if was_present else value - self.shift[column]
+        added_count = 1.0 - was_present
+        added_value = new - old
+        added_square = new * new - old * old
+
+        self.counts[column, :columns] += added_count * others_present
+        self.counts[:columns, column] += added_count * others_present
+        self.counts[column, column] += added_count
+        self.sums[column, :columns] += added_value * others_present
+        self.sums[:columns, column] += added_count * others
+        self.sums[column, column] += added_value
+        self.squares[column, :columns] += added_square * others_present
+        self.squares[:columns, column] += added_count * others * others
+        self.squares[column, column] += added_square
+        self.products[column, :columns] += added_value * others
+        self.products[:columns, column] += added_value * others
+        self.products[column, column] += added_square
+
+        self.cells[row, column] = new
+        self.present[row, column] = 1.0
+        self._corr = None
+
+    def add_rows(self, rows: pd.DataFrame, index_column: str = 'State', columns: str = 'Indicator',
+                 values: str = 'Value'):
+        """
+        Adds rows of the long format table to the cells they land in.
+        Args:
+            rows: the new rows.
+            index_column: the column whose values are the rows of the table.
+            columns: the column whose values are the columns of the table.
+            values: the column with the values.
+        """
+        for row_label, column_label, value in zip(rows[index_column].to_numpy(), rows[columns].to_numpy(),
+                                                  rows[values].to_numpy(dtype='float64')):
+            self.add(row_label, column_label, value)
+
+    def correlation(self, min_periods: int = 1):
+        """
+        Works out the correlation matrix from the sums.
+        Args:
+            min_periods: the fewest shared rows a pair needs to get a correlation.
+        Returns:
+            a (corr, counts) tuple of square arrays in the order of labels
+        """
+        columns = len(self.column_positions)
+        square = (slice(0, columns), slice(0, columns))
+        counts = self.counts[square]
+        if self._corr is None:
+            self._corr = pearson_from_sums(counts, self.sums[square], self.squares[square],
+                                           self.products[square])
+        corr = self._corr
+        if min_periods > 1:
+            corr = np.where(counts < min_periods, np.nan, corr)
+        return corr, counts
@@ -0,0 +1,110 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboards.correlation.correlation_accumulator import CorrelationAccumulator
+from dashboards.tensor_store import TensorStore
+
+
+class CorrelationCube:
+    """
+    Holds the correlation matrix of every indicator against every other indicator
+    for each (source, period) pair in the table, worked out once so a heatmap only
+    has to slice the stored matrix. Each pair is correlated over the rows both have
+    a value in, so the correlation of a pair doesn't depend on the other indicators
+    chosen and slicing always gives what correlation_operations works out.
+    New rows are added with append, which only updates the groups they belong to.
+    Appended rows only reach the Pearson correlations the cube gives, they aren't in the
+    table, its TensorStore, the trendlines, rolling or Spearman and Kendall correlations,
+    and they are gone once the cube is built again, e.g when the workbook is reloaded.
+    """
+
+    def __init__(self, data_frame: pd.DataFrame, source: str = 'Source', period: str = 'Period',
+                 index_column: str = 'State', columns: str = 'Indicator', values: str = 'Value'):
+        """
+        Args:
+            data_frame: the long format table, e.g correlation_input_df.
+            source: the column with the data sources.
+            period: the column with the periods.
+            index_column: the column whose values become the rows that are correlated over.
+            columns: the column whose values are correlated against each other.
+            values: the column with the values.
+        """
+        self.source = source
+        self.period = period
+        self.index_column = index_column
+        self.columns = columns
+        self.values = values
+        self.groups = {}
+        # append changes the sums of a group while correlation reads them and caches the matrix
+        self._lock = threading.Lock()
+        # every (source, period) pair is a slice of the table's tensor, no rows are grouped or pivoted
+        store = TensorStore.of(data_frame, source=source, indicator=columns, state=index_column,
+                               period=period, values=values)
+        sources, periods = np.nonzero(store.has_row.any(axis=(1, 2)))
+        for source_value, period_value in zip(store.labels[source][sources].tolist(),
+                                              store.labels[period][periods].tolist()):
+            self.groups[(source_value, period_value)] = self.build_group(store, source_value, period_value)
+
+    def build_group(self, store: TensorStore, source_value, period_value) -> CorrelationAccumulator:
+        """
+        Reshapes the cells of one (source, period) pair and works out the sums its correlation matrix needs.
+        Args:
+            store: the TensorStore of the table.
+            source_value: the source of the pair.
+            period_value: the period of the pair.
+        Returns:
+            a CorrelationAccumulator
+        """
+        # states and indicators with only missing values are left out, like dropping them before a pivot
+        values, _, (index_labels, column_labels) = store.aggregate(
+            {self.source: source_value, self.period: period_value}, [self.index_column, self.columns],
+            require_value=True)
+        return CorrelationAccumulator.from_table(pd.DataFrame(values, index=index_labels, columns=column_labels))
+
+    def append(self, rows: pd.DataFrame) -> list:
+        """
+        Adds new rows of the long format table, e.g the rows of a new (source, period)
+        from the data feed, updating the sums of only the groups they belong to.
+        Args:
+            rows: the new rows, laid out like the table the cube was built from.
+        Returns:
+            the (source, period) keys of the groups that changed
+        """
+        rows = rows.dropna(subset=[self.values])
+        updated = []
+        with self._lock:
+            for key, group in rows.groupby([self.source, self.period], sort=False, observed=True):
+                accumulator = self.groups.setdefault(key, CorrelationAccumulator())
+                accumulator.add_rows(group, index_column=self.index_column, columns=self.columns,
+                                     values=self.values)
+                updated.append(key)
+        return updated
+
+    def correlation(self, source_value, period_value, values_to_see: list, min_periods: int = 1) -> pd.DataFrame:
+        """
+        Gives the correlation matrix of the chosen columns for a source and period,
+        the same table correlation_operations works out from scratch.
+        Args:
+            source_value: the source to look up.
+            period_value: the period to look up.
+            values_to_see: the column values to correlate.
+            min_periods: the fewest shared rows a pair needs to get a correlation.
+        Returns:
+            a dataframe
+        """
+        if not values_to_see:
+            return pd.DataFrame()
+        with self._lock:
+            group = self.groups.get((source_value, period_value))
+            if group is None:
+                return pd.DataFrame()
+            group_labels = group.labels
+            positions = np.flatnonzero(np.isin(group_labels, list(values_to_see)))
+            if positions.size == 0:
+                return pd.DataFrame()
+            # indexing with a list copies the cells, so later appends can't change them
+            cells = np.ix_(positions, positions)
+            corr = group.correlation(min_periods=min_periods)[0][cells]
+        labels = pd.Index(group_labels[positions], name=self.columns)
+        return pd.DataFrame(corr.astype(np.float32), index=labels, columns=labels)
@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+METHODS = ('pearson', 'spearman', 'kendall')
+
+
+def masked_values(values):
+    """
+    Splits a table of values into its values with missing cells set to 0 and a mask of the cells that are present.
+    Args:
+        values: a 2d array or dataframe, rows are observations and columns are variables.
+    Returns:
+        a (values, mask) tuple of float64 arrays
+    """
+    values = np.asarray(values, dtype='float64')
+    mask = ~np.isnan(values)
+    return np.where(mask, values, 0.0), mask.astype('float64')
+
+
+def pairwise_counts(mask: np.ndarray) -> np.ndarray:
+    """
+    Counts the rows two columns both have a value in, for every pair of columns.
+    Args:
+        mask: 1 where a cell is present, 0 where it is missing.
+    Returns:
+        a square array
+    """
+    return mask.T @ mask
+
+
+def pearson_matrix(values, min_periods: int = 1):
+    """
+    Works out the pairwise complete Pearson correlation of every pair of columns,
+    each pair using only the rows both columns have a value in, without a loop over
+    the pairs. The sums each pair needs are matrix products of the masked columns.
+    Args:
+        values: a 2d array, rows are observations and columns are variables, NaN where missing.
+        min_periods: the fewest shared rows a pair needs to get a correlation.
+    Returns:
+        a (corr, counts) tuple of square arrays
+    """
+    values, mask = masked_values(values)
+    # center every column on its own mean first so the sums below don't lose precision
+    column_counts = mask.sum(axis=0)
+    column_means = np.divide(values.sum(axis=0), column_counts, out=np.zeros_like(column_counts),
+                             where=column_counts > 0)
+    values = (values - column_means) * mask
+
+    counts = pairwise_counts(mask)
+    # sums[i, j] is the sum of column i over the rows column j has a value in
+    sums = values.T @ mask
+    squares = (values * values).T @ mask
+    products = values.T @ values
+    return pearson_from_sums(counts, sums, squares, products, min_periods=min_periods), counts
+
+
+def pearson_from_sums(counts: np.ndarray, sums: np.ndarray, squares: np.ndarray, products: np.ndarray,
+                      min_periods: int = 1) -> np.ndarray:
+    """
+    Works out pairwise complete Pearson correlations from the sums every pair of columns needs.
+    Args:
+        counts: counts[i, j] is the number of rows columns i and j share.
+        sums: sums[i, j] is the sum of column i over the rows it shares with column j.
+        squares: squares[i, j] is the sum of the squares of column i over those rows.
+        products: products[i, j] is the sum of column i times column j over those rows.
+        min_periods: the fewest shared rows a pair needs to get a correlation.
+    Returns:
+        a square array
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = products - sums * sums.T / counts
+        variance = squares - sums * sums / counts
+        corr = covariance / np.sqrt(variance * variance.T)
+    # rounding can leave a variance a hair above 0 for a constant column
+    constant = variance <= 1e-12 * squares
+    corr[constant | constant.T] = np.nan
+    corr[counts < max(min_periods, 2)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def column_ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks the values of every column, ties get their average rank and NaN stays NaN."""
+    return pd.DataFrame(values).rank(axis=0, method='average', na_option='keep').to_numpy()
+
+
+def sorted_groups(values: np.ndarray):
+    """
+    Sorts every column of values once and finds the run of equal values each sorted position belongs to.
+    Args:
+        values: a 2d array, NaN where missing.
+    Returns:
+        an (order, starts, ends) tuple of 2d arrays, order sorts each column with the missing
+        values last, starts and ends are the first and one past the last sorted position
+        of the run of equal values at each position
+    """
+    order = np.argsort(values, axis=0, kind='stable')
+    sorted_values = np.take_along_axis(values, order, axis=0)
+    positions = np.arange(values.shape[0])[:, None]
+    different = np.diff(sorted_values, axis=0) != 0
+    first = np.vstack([np.ones((1, values.shape[1]), dtype=bool), different])
+    last = np.vstack([different, np.ones((1, values.shape[1]), dtype=bool)])
+    starts = np.maximum.accumulate(np.where(first, positions, 0), axis=0)
+    ends = np.minimum.accumulate(np.where(last, positions + 1, values.shape[0])[::-1], axis=0)[::-1]
+    return order, starts, ends
+
+
+def subset_ranks(order: np.ndarray, starts: np.ndarray, ends: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    Ranks the values of every column among the rows in a subset, from the sorted_groups of the values.
+    Args:
+        order: the order from sorted_groups.
+        starts: the starts from sorted_groups.
+        ends: the ends from sorted_groups.
+        rows: 1 for the rows in the subset, 0 for the rest, a column of it per column of
+              order, or a single column of it shared by every column of order. A single
+              column of order can also be ranked among several subsets.
+    Returns:
+        a 2d array in row order, only meaningful where the value is present and the row is in the subset
+    """
+    # a running count of the subset rows in each column's sorted order gives the rows below every value
+    shape = np.broadcast_shapes(order.shape, rows.shape)
+    running = np.zeros((shape[0] + 1, shape[1]))
+    np.cumsum(np.take_along_axis(rows, order, axis=0), axis=0, out=running[1:])
+    below = np.take_along_axis(running, starts, axis=0)
+    up_to = np.take_along_axis(running, ends, axis=0)
+    ranks = np.empty(shape)
+    np.put_along_axis(ranks, order, below + (up_to - below + 1) / 2, axis=0)
+    return ranks
+
+
+def spearman_matrix(values, min_periods: int = 1):
+    """
+    Works out the pairwise complete Spearman correlation of every pair of columns.
+    Like DataFrame.corr, the two columns of a pair are ranked again on the rows they
+    share. Without missing values the columns are ranked once and correlated with
+    pearson_matrix, otherwise every column is sorted once and the ranks of the rest
+    among the rows it has a value in are found with running counts, one column at a time.
+    Args:
+        values: a 2d array, rows are observations and columns are variables, NaN where missing.
+        min_periods: the fewest shared rows a pair needs to get a correlation.
+    Returns:
+        a (corr, counts) tuple of square arrays
+    """
+    values = np.asarray(values, dtype='float64')
+    present = ~np.isnan(values)
+    if present.all():
+        return pearson_matrix(column_ranks(values), min_periods=min_periods)
+
+    mask = present.astype('float64')
+    counts = pairwise_counts(mask)
+    corr = np.full(counts.shape, np.nan)
+    order, starts, ends = sorted_groups(values)
+    for column in range(values.shape[1]):
+        # only the pairs with the columns from this one on, the matrix is symmetric
+        others = slice(column, values.shape[1])
+        # this column ranked among the rows each other column has, and the other way round
+        ranks = subset_ranks(order[:, [column]], starts[:, [column]], ends[:, [column]], mask[:, others])
+        other_ranks = subset_ranks(order[:, others], starts[:, others], ends[:, others], mask[:, [column]])
+        shared = present[:, others] & present[:, [column]]
+        corr[column, others] = corr[others, column] = masked_pearson(ranks, other_ranks, shared)
+
+    corr[counts < max(min_periods, 2)] = np.nan
+    return np.clip(corr, -1.0, 1.0), counts
+
+
+def masked_pearson(left: np.ndarray, right: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Correlates each column of left with the same column of right over the rows in mask.
+    Args:
+        left: a 2d array.
+        right: a 2d array the same shape as left, NaN where missing.
+        mask: True where both columns should be used.
+    Returns:
+        an array with a correlation per column
+    """
+    left = np.where(mask, left, 0.0)
+    right = np.where(mask, right, 0.0)
+    counts = mask.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        left = np.where(mask, left - left.sum(axis=0) / counts, 0.0)
+        right = np.where(mask, right - right.sum(axis=0) / counts, 0.0)
+        corr = (left * right).sum(axis=0) / np.sqrt((left * left).sum(axis=0) * (right * right).sum(axis=0))
+    return corr
+
+
+def kendall_matrix(values, min_periods: int = 1):
+    """
+    Works out the pairwise complete Kendall tau of every pair of columns with scipy,
+    one pair at a time as there is no matrix form of it.
+    Args:
+        values: a 2d array, rows are observations and columns are variables, NaN where missing.
+        min_periods: the fewest shared rows a pair needs to get a correlation.
+    Returns:
+        a (corr, counts, p_values) tuple of square arrays
+    """
+    from scipy import stats
+    values = np.asarray(values, dtype='float64')
+    present = ~np.isnan(values)
+    counts = pairwise_counts(present.astype('float64'))
+    corr = np.full(counts.shape, np.nan)
+    p_values = np.full(counts.shape, np.nan)
+    for left in range(values.shape[1]):
+        # a column always ranks the same as itself, like DataFrame.corr
+        if counts[left, left] >= max(min_periods, 1):
+            corr[left, left] = 1.0
+        for right in range(left + 1, values.shape[1]):
+            rows = present[:, left] & present[:, right]
+            if rows.sum() < max(min_periods, 2):
+                continue
+            tau, p_value = stats.kendalltau(values[rows, left], values[rows, right])
+            corr[left, right] = corr[right, left] = tau
+            p_values[left, right] = p_values[right, left] = p_value
+    return corr, counts, p_values
+
+
+def correlation_p_values(corr: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Works out two sided p values for Pearson or Spearman correlations from the t distribution.
+    Args:
+        corr: the correlations.
+        counts: the number of rows each correlation was worked out from.
+    Returns:
+        an array the shape of corr
+    """
+    from scipy import stats
+    degrees = counts - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_values = corr * np.sqrt(degrees / (1.0 - corr * corr))
+        p_values = 2 * stats.t.sf(np.abs(t_values), degrees)
+    p_values[degrees < 1] = np.nan
+    p_values[np.isnan(corr)] = np.nan
+    # a perfect correlation has an infinite t value
+    p_values[np.isclose(np.abs(corr), 1.0) & (degrees >= 1)] = 0.0
+    return p_values
+
+
+def correlate(data_frame: pd.DataFrame, method: str = 'pearson', min_periods: int = 1,
+              p_values: bool = False) -> dict:
+    """
+    Correlates every column of a dataframe with every other column, each pair using the
+    rows both have a value in instead of filling missing values with 0 like before.
+    e.g, correlate(reshaped_table)['corr'] for a heatmap of the indicators of a reshaped table.
+    Args:
+        data_frame: a wide dataframe, rows are observations (e.g states) and columns
+                    are variables (e.g indicators), NaN where missing.
+        method: 'pearson', 'spearman' or 'kendall'.
+        min_periods: the fewest shared rows a pair needs to get a correlation.
+        p_values: whether to work out p values as well.
+    Returns:
+        a dictionary with the 'corr' and 'counts' dataframes, and 'p_values' when asked for
+    """
+    if method not in METHODS:
+        raise ValueError(f"method has to be one of {METHODS}, not {method!r}")
+    values = data_frame.to_numpy(dtype='float64')
+    p_value_matrix = None
+    if method == 'pearson':
+        corr, counts = pearson_matrix(values, min_periods=min_periods)
+    elif method == 'spearman':
+        corr, counts = spearman_matrix(values, min_periods=min_periods)
+    else:
+        corr, counts, p_value_matrix = kendall_matrix(values, min_periods=min_periods)
+
+    columns = data_frame.columns
+    result = {'corr': pd.DataFrame(corr, index=columns, columns=columns),
+              'counts': pd.DataFrame(counts.astype('int64'), index=columns, columns=columns)}
+    if p_values:
+        if p_value_matrix is None:
+            p_value_matrix = correlation_p_values(corr, counts)
+        result['p_values'] = pd.DataFrame(p_value_matrix, index=columns, columns=columns)
+    return result
@@ -0,0 +1,260 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from dashboards.correlation.pipeline import drop_columns, pivot_blocks
+
+# the columns the rows of the table are grouped by
+INDEX_COLUMNS = ['Source', 'Period', 'Indicator', 'State']
+
+
+def column_isin(column: pd.Series, values: list, positions: np.ndarray = None) -> np.ndarray:
+    """
+    Finds the rows of a column holding any of the values. Categorical columns are
+    checked through their codes, looking the values up once instead of for every row.
+    Args:
+        column: the column to be searched.
+        values: the values to look for.
+        positions: only check the rows at these positions.
+    Returns:
+        a boolean numpy array
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = column.array.categories
+        wanted = [categories.get_loc(value) for value in values if value in categories]
+        codes = column.array.codes if positions is None else column.array.codes[positions]
+        if len(wanted) == 1:
+            return codes == wanted[0]
+        return np.isin(codes, wanted)
+    if positions is not None:
+        column = column.iloc[positions]
+    return column.isin(values).to_numpy()
+
+
+class DataFrameFormatter:
+    """
+    Selects and pivots the rows of the table by the codes of its index columns.
+    The views read the table's TensorStore instead, the formatter is kept for the
+    prep_data and compact frame benchmarks the TensorStore is compared against.
+    """
+
+    def __init__(self, data_frame: pd.DataFrame, index_columns: list = None):
+        self.data_frame = data_frame
+        if index_columns is None:
+            index_columns = INDEX_COLUMNS
+        self.index_columns = [column for column in index_columns if column in data_frame.columns]
+
+        # enumerate each index column and fold the codes of a row into one number,
+        # 0 is kept for missing values so a code is its position in the level plus one
+        self.levels = []
+        self.level_codes = []
+        row_keys = np.zeros(len(data_frame), dtype=np.int64)
+        combinations = 1
+        for column in list(self.index_columns):
+            codes, uniques = pd.factorize(data_frame[column], sort=True)
+            if combinations * (len(uniques) + 1) >= 2 ** 62:
+                # the key would overflow, the remaining columns are filtered with masks instead
+                self.index_columns = self.index_columns[:len(self.levels)]
+                break
+            combinations *= len(uniques) + 1
+            self.levels.append(pd.Index(np.asarray(uniques)))
+            self.level_codes.append({value: position + 1 for position, value in enumerate(uniques)})
+            row_keys = row_keys * (len(uniques) + 1) + (codes + 1)
+        # a key of the leading columns covers the keys from key * stride to (key + 1) * stride
+        self.strides = [int(np.prod([len(level) + 1 for level in self.levels[position + 1:]], dtype=np.int64))
+                        for position in range(len(self.levels))]
+
+        # sort the table by the index columns once so every combination of
+        # their values sits in one contiguous block of rows
+        order = np.argsort(row_keys, kind='stable')
+        self.row_keys = row_keys[order]
+        self.sorted_frame = data_frame.take(order)
+
+    def key_codes(self, key: tuple):
+        """
+        Looks up the codes of the values of the leading index columns.
+        Args:
+            key: values of the leading index columns, in the order of index_columns.
+        Returns:
+            a list of codes, or None if a value isn't in the table
+        """
+        codes = [level_codes.get(value) for value, level_codes in zip(key, self.level_codes)]
+        if None in codes:
+            return None
+        return codes
+
+    def code_range(self, codes: list) -> tuple:
+        """
+        Looks up where the block of rows whose leading index columns have the codes sits in the sorted table.
+        Args:
+            codes: codes of the leading index columns, from key_codes.
+        Returns:
+            a (start, stop) tuple of row positions
+        """
+        if not codes:
+            return 0, len(self.sorted_frame)
+        prefix = 0
+        for code, level in zip(codes, self.levels):
+            prefix = prefix * (len(level) + 1) + code
+        stride = self.strides[len(codes) - 1]
+        start, stop = np.searchsorted(self.row_keys, [prefix * stride, (prefix + 1) * stride])
+        return int(start), int(stop)
+
+    def code_block(self, codes: list) -> pd.DataFrame:
+        """
+        Looks up the block of rows in the sorted table whose leading index columns have the codes.
+        Args:
+            codes: codes of the leading index columns, from key_codes.
+        Returns:
+            a view of the sorted table
+        """
+        start, stop = self.code_range(codes)
+        return self.sorted_frame.iloc[start:stop]
+
+    def row_block(self, key: tuple) -> pd.DataFrame:
+        """
+        Looks up the block of rows in the sorted table whose leading index columns match the key.
+        e.g, key=('NHMIS', 2015) gives the rows with Source 'NHMIS' and Period 2015.
+        Args:
+            key: values of the leading index columns, in the order of index_columns.
+        Returns:
+            a view of the sorted table
+        """
+        codes = self.key_codes(key)
+        if codes is None:
+            return self.sorted_frame.iloc[0:0]
+        return self.code_block(codes)
+
+    def select_rows(self, query: dict):
+        """
+        Works out which rows match a query without copying any of them.
+        Index columns at the front of query are looked up by their row blocks,
+        any other column is checked only on the rows of those blocks.
+        Args:
+            query: maps a column to the value or list of values to keep.
+        Returns:
+            a (frame, ranges, positions) tuple, the matching rows are the ranges of
+            frame when positions is None and the rows at positions otherwise
+        """
+        key_values = []
+        for column in self.index_columns:
+            if column not in query:
+                break
+            value = query[column]
+            key_values.append(value if isinstance(value, (list, tuple, set)) else [value])
+
+        if not key_values:
+            frame = self.data_frame
+            ranges = [(0, len(frame))]
+        else:
+            frame = self.sorted_frame
+            # drop values that aren't in the table, e.g '2015' when the Period column holds 2015,
+            # a value asked for twice still only gives its rows once
+            key_codes = [list(dict.fromkeys(level_codes[value] for value in values if value in level_codes))
+                         for values, level_codes in zip(key_values, self.level_codes)]
+            ranges = [self.code_range(list(codes)) for codes in product(*key_codes)]
+            ranges = [(start, stop) for start, stop in ranges if stop > start]
+
+        mask_columns = [(column, value if isinstance(value, (list, tuple, set)) else [value])
+                        for column, value in query.items() if column not in self.index_columns[:len(key_values)]]
+        if not mask_columns:
+            return frame, ranges, None
+
+        positions = np.concatenate([np.arange(start, stop) for start, stop in ranges]) \
+            if ranges else np.empty(0, dtype=np.intp)
+        for column, values in mask_columns:
+            positions = positions[column_isin(frame[column], values, positions)]
+        return frame, ranges, positions
+
+    def select_blocks(self, query: dict, counter=None) -> list:
+        """
+        Filters the table by several columns at once using the sorted index, see select_rows.
+        e.g, query={'Source': ['NHMIS', 'IHME'], 'Period': 2015}
+        Args:
+            query: maps a column to the value or list of values to keep.
+            counter: CopyCounter the block copied by a mask is recorded in.
+        Returns:
+            a list of dataframes, views of the loaded table unless a mask was needed
+        """
+        frame, ranges, positions = self.select_rows(query)
+        if positions is None:
+            return [frame.iloc[start:stop] for start, stop in ranges]
+        if positions.size == 0:
+            return []
+        block = frame.take(positions)
+        if counter is not None:
+            counter.record('select', block.memory_usage(index=False).sum())
+        return [block]
+
+    def select(self, query: dict) -> pd.DataFrame:
+        """
+        Filters the table by several columns at once, see select_rows.
+        e.g, query={'Source': ['NHMIS', 'IHME'], 'Period': 2015}
+        Args:
+            query: maps a column to the value or list of values to keep.
+        Returns:
+            a dataframe, a view of the loaded table when a single block matches
+        """
+        frame, ranges, positions = self.select_rows(query)
+        if positions is None:
+            if len(ranges) == 1:
+                start, stop = ranges[0]
+                return frame.iloc[start:stop]
+            # one take of every block's rows instead of joining the blocks
+            positions = np.concatenate([np.arange(start, stop) for start, stop in ranges]) \
+                if ranges else np.empty(0, dtype=np.intp)
+        return frame.take(positions)
+
+    def filter_with_list(self, query_elem: str, query: list):
+        """
+        Much lik the query_table method, this method makes queries to a table
+        but for a list of queries instead of a single one.
+        e.g, data_frame=correlation_input_df,query_elem='Source', query=['NHMIS', 'IHME']. 
+        Therefore correlation_input_df[correlation_input_df['Source'].isin(['NHMIS', 'IHME'])]
+        Args: 
+            query_elem: the column in the table whose chosen value the table
+                        will be filtered by.
+            query: the value you want to filter the table with.
+        """
+        source_filter = self.select({query_elem: list(query)})
+        yield source_filter
+
+    @staticmethod
+    def query_table(query_elem: str, query, data_frame: pd.DataFrame):
+        """
+        Queries the table using the parameters passed in 
+        e.g, data_frame=correlation_input_df,query_elem='Period', query=2001. 
+        Therefore correlation_input_df[correlation_input_df['Period'] == 2001]
+        Args: 
+            query_elem: the column in the table whose chosen value the table
+                        will be filtered by.
+            query: the value you want to filter the table with.
+            data_frame: dataframe to carry out operation on.
+        """
+        query_result = data_frame[data_frame[query_elem] == query]
+        yield query_result
+
+    @staticmethod
+    def analysis_prep(analysis_table: pd.DataFrame, column_names: list):
+        """
+        Drop columns that you don't want in your analysis since they 
+        probably don't aid it.
+        Args:
+            analysis_table: the data frame you want to drop columns from 
+                        (usually on that has already been queried).
+            column_names: the column names you want to drop from the column.
+
+        """
+        yield drop_columns(analysis_table, column_names)
+
+    @staticmethod
+    def reshape_table(data_frame: pd.DataFrame, new_columns: str, new_index: str, new_values: str):
+        """
+        Reshapes the passed in dataframe/table to have a new index, new columns and new values.
+        Args:
+            data_frame: the dataframe you want to reshape.
+            new_columns: the new columns you'd want when the dataframe has been reshaped
+            new_index: the new index column you'd like the dataframe to have
+            new_values: the new values you'd like the dataframe to have
+        """
+        yield pivot_blocks([data_frame], new_index=new_index, new_columns=new_columns, new_values=new_values)
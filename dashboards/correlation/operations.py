@@ -0,0 +1,230 @@
+import pandas as pd
+from dashboards.correlation.pipeline import Pipeline
+from dashboards.correlation.correlation_cube import CorrelationCube
+from dashboards.correlation.correlation_engine import correlate
+from dashboards.correlation.rolling_correlation import PeriodTensor
+from dashboards.correlation.trendlines import TrendlineTable
+from dashboards.metrics import metrics
+from dashboards.registry import registry
+from dashboards.tensor_store import TensorStore
+
+# the table is loaded by the registry on first use, once per process, and shared with the other views
+# correlation_input_df = registry.table('data/msdat_data.xlsx', 'Sheet1')
+
+# results of the operations and the figures for dropdown combinations that were already asked for
+result_cache = registry.result_cache
+figure_cache = registry.figure_cache
+
+
+@metrics.timed()
+def prep_data(query_element: str, query_value, columns_to_drop: list,
+              source_query: list, source: str,
+              df_formatter):
+    """
+    Filters the table with a Pipeline. The views read the table's TensorStore instead,
+    this is kept for the benchmark the TensorStore is compared against.
+    Args:
+        query_element: name of the column in the dataframe that you'll use
+        to filter the dataframe.
+        query_value: the value you'll use to query the data frame
+        columns_to_drop: columns you want dropped from the table as they
+        don't aid analysis.
+        source_query: the list of sources you want to query for
+        source: the column you want to query for sources.
+        df_formatter: data_frame formatter object
+    """
+
+    # Filter table by source, query it by period and drop useless columns
+    refined_df = Pipeline(df_formatter) \
+        .select({source: source_query, query_element: query_value}) \
+        .drop(columns_to_drop) \
+        .run()
+    yield refined_df
+
+
+@result_cache.memoize
+@metrics.timed()
+def correlation_operations(query_elem: str,
+                           query_value, source_query: list, source: str,
+                           values_to_see: list, new_values: str,
+                           new_index_column: str, new_columns: str,
+                           correlation_input_df: pd.DataFrame, correlation_cube=None,
+                           copy_counter=None, method: str = 'pearson', min_periods: int = 1):
+    """
+    This function will works perfectly with the correlation input sheet
+    but hasn't been abstracted to work with the other sheets yet.
+    Args:
+        query_elem: name of the column in the dataframe that you'll use
+        to filter the dataframe.
+        query_value: the value you'll use to query the data frame
+        source_query: the list of sources you want to query for
+        source: the column you want to query for sources.
+        new_index_column: desired new index column when the table is reshaped
+        new_columns: desired new columns when the table is reshaped
+        new_values: desired new index column when the table is reshaped
+        values_to_see: values in new_column you want to filter the table with
+        correlation_input_df: the long format table, e.g registry.table().
+        correlation_cube: optional CorrelationCube built from the same table, used
+        instead of working the correlation out again when it covers the query.
+        copy_counter: optional CopyCounter the copies made of the table are recorded in.
+        method: 'pearson', 'spearman' or 'kendall', see correlation_engine.correlate.
+        min_periods: the fewest states two indicators need to share to be correlated.
+    """
+
+    if correlation_cube is not None and method == 'pearson' and len(source_query) == 1 \
+            and (source, query_elem, new_index_column, new_columns, new_values) == \
+            (correlation_cube.source, correlation_cube.period, correlation_cube.index_column,
+             correlation_cube.columns, correlation_cube.values):
+        with metrics.timer('correlation_operations.cube'):
+            corr = correlation_cube.correlation(source_query[0], query_value, values_to_see,
+                                                min_periods=min_periods)
+        yield corr
+        return
+
+    # slice the source, period and the indicators you want to see on the heatmap out of the
+    # table's tensor, summing over the sources and leaving missing values as NaN
+    store = TensorStore.of(correlation_input_df, source=source, indicator=new_columns,
+                           state=new_index_column, period=query_elem, values=new_values)
+    reshaped_table = store.pivot({source: source_query, query_elem: query_value, new_columns: values_to_see},
+                                 new_index=new_index_column, new_columns=new_columns)
+    if copy_counter is not None:
+        copy_counter.record('TensorStore.pivot', reshaped_table.memory_usage(index=False).sum())
+
+    # each pair of indicators is correlated over the states both have a value for
+    with metrics.timer(f'correlation_operations.{method}'):
+        reshaped_corr = correlate(reshaped_table, method=method, min_periods=min_periods)['corr']
+    print(reshaped_corr)
+    yield reshaped_corr
+
+
+@result_cache.memoize
+@metrics.timed()
+def rolling_correlation_operations(source_query: list, source: str, values_to_see: list,
+                                   correlation_input_df: pd.DataFrame, window: int = 5, step: int = 1,
+                                   start=None, end=None, period: str = 'Period', new_index_column: str = 'State',
+                                   new_columns: str = 'Indicator', new_values: str = 'Value',
+                                   min_periods: int = 1):
+    """
+    Correlates the indicators over ranges of periods instead of a single one, every
+    (state, period) pair in a range being an observation. The rows are read once into a
+    PeriodTensor straight from the table's tensor and each window is worked out from its running totals.
+    Args:
+        source_query: the list of sources you want to query for
+        source: the column you want to query for sources.
+        values_to_see: values in new_columns you want to correlate
+        correlation_input_df: the long format table, e.g registry.table().
+        window: the number of periods in each rolling window, e.g 5 for 5 years.
+        step: how far each window starts after the one before it.
+        start: the first period of a single range, rolling windows are used when start and end are None.
+        end: the last period of a single range.
+        period: the column with the periods.
+        new_index_column: the column whose values, with the periods, are the observations.
+        new_columns: the column whose values are correlated.
+        new_values: the column with the values.
+        min_periods: the fewest observations two indicators need to share to be correlated.
+    Returns:
+        a dictionary of (start, end) to correlation dataframe
+    """
+    store = TensorStore.of(correlation_input_df, source=source, indicator=new_columns,
+                           state=new_index_column, period=period, values=new_values)
+    tensor = PeriodTensor.from_store(store, {source: source_query, new_columns: values_to_see}, period=period,
+                                     index_column=new_index_column, columns=new_columns)
+    if start is not None and end is not None:
+        yield {(start, end): tensor.correlation(start, end, min_periods=min_periods)}
+        return
+    yield tensor.rolling(window, step, min_periods=min_periods)
+
+
+@result_cache.memoize
+@metrics.timed()
+def scatter_operations(query_elem: str, query_value, source_query: list,
+                       source: str, data_frame: pd.DataFrame, horizontal: str, vertical: str,
+                       column_name: str, copy_counter=None):
+    # slice the source, period and the two indicators being plotted out of the table's tensor,
+    # filling NaN values with 0
+    vals_to_see = [horizontal, vertical]
+    store = TensorStore.of(data_frame, source=source, indicator=column_name, state='State',
+                           period=query_elem, values='Value')
+    reshaped_table = store.pivot({source: source_query, query_elem: query_value, column_name: vals_to_see},
+                                 new_index='State', new_columns=column_name, fill_value=0)
+    if copy_counter is not None:
+        copy_counter.record('TensorStore.pivot', reshaped_table.memory_usage(index=False).sum())
+
+    # add states as a new column in the reshaped df
+    reshaped_table['State'] = reshaped_table.index
+    reshaped_table = reshaped_table.reset_index(drop=True)
+
+    print(reshaped_table)
+    yield reshaped_table
+
+
+# what the views build from the table, built by registry.warm before the first request comes in
+SHARED_OBJECTS = {'tensor_store': TensorStore.of,
+                  'correlation_cube': CorrelationCube,
+                  'trendlines': TrendlineTable}
+
+
+def get_table(sheet_name: str = None) -> pd.DataFrame:
+    """A shared sheet, the default one when None, read by the heatmap and the scatter plot through its tensor store."""
+    return registry.table(sheet_name=sheet_name)
+
+
+def get_tensor_store(sheet_name: str = None) -> TensorStore:
+    """The tensor store of a shared sheet, the default one when None, the one the operations slice."""
+    return registry.get('tensor_store', TensorStore.of, sheet_name=sheet_name)
+
+
+def get_correlation_cube(sheet_name: str = None) -> CorrelationCube:
+    """The correlation cube of a shared sheet, the default one when None."""
+    return registry.get('correlation_cube', CorrelationCube, sheet_name=sheet_name)
+
+
+def get_trendlines(sheet_name: str = None) -> TrendlineTable:
+    """The scatter plot trendlines of a shared sheet, the default one when None."""
+    return registry.get('trendlines', TrendlineTable, sheet_name=sheet_name)
+
+
+def append_rows(new_rows: pd.DataFrame, cube: CorrelationCube = None) -> list:
+    """
+    Adds rows from the data feed to the correlation cube without building it again,
+    only the (source, period) groups the rows belong to are updated. Only the Pearson
+    heatmaps of a single source, the ones the cube answers, see the new rows. The table
+    and its TensorStore aren't changed, so the Spearman and Kendall heatmaps, rolling
+    correlations, scatter plots and trendlines don't, and the rows are lost when the
+    cube is built again, e.g when the workbook is reloaded. Add them to the workbook
+    for them to reach every view and last.
+    Args:
+        new_rows: the new rows, laid out like the correlation input sheet.
+        cube: the CorrelationCube to update, the shared one when None.
+    Returns:
+        the (source, period) keys of the groups that changed
+    """
+    cube = get_correlation_cube() if cube is None else cube
+    updated = cube.append(new_rows)
+    if updated:
+        # results and figures worked out before the rows arrived are out of date
+        result_cache.clear()
+        figure_cache.clear()
+    return updated
+
+
+if __name__ == "__main__":
+    # scatter_operations(query_elem='Period',
+    #                    query_value=2017,
+    #                    source_query=['IHME'],
+    #                    source='Source',
+    #                    data_frame=get_table(),
+    #                    vertical='Maternal Mortality Ratio',
+    #                    horizontal='Infant Mortality rate',
+    #                    column_name='Indicator'
+    #                    )
+
+    correlation_operations(query_elem='Period',
+                           query_value=1990,
+                           source_query=['IHME'],
+                           source='Source',
+                           values_to_see=['Infant Mortality rate'],
+                           new_values='Value',
+                           new_columns='Indicator',
+                           new_index_column='State',
+                           correlation_input_df=get_table())
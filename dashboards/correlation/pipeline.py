@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+from dashboards.correlation.column_formatter import ColumnFormatter
+from dashboards.metrics import metrics
+
+
+class CopyCounter:
+    """
+    Counts the times rows of the table are copied into a new frame or array,
+    so it can be checked how much a request materializes.
+    """
+
+    def __init__(self):
+        self.copies = 0
+        self.bytes = 0
+        self.stages = []
+
+    def record(self, stage: str, nbytes: int):
+        """
+        Records a copy.
+        Args:
+            stage: the name of the stage that made the copy.
+            nbytes: the size of the copy in bytes.
+        """
+        self.copies += 1
+        self.bytes += int(nbytes)
+        self.stages.append(stage)
+
+    def reset(self):
+        """Sets the counts back to zero."""
+        self.copies = 0
+        self.bytes = 0
+        self.stages = []
+
+
+def drop_columns(data_frame: pd.DataFrame, column_names: list) -> pd.DataFrame:
+    """
+    Drop columns that you don't want in your analysis since they
+    probably don't aid it.
+    Args:
+        data_frame: the data frame you want to drop columns from.
+        column_names: the column names you want to drop from the table.
+    """
+    return data_frame.drop(column_names, axis=1)
+
+
+def gather_column(blocks: list, column: str) -> pd.Series:
+    """
+    Joins one column of several blocks of rows. Categorical columns that share
+    their categories are joined by their codes, without turning them into strings.
+    Args:
+        blocks: the dataframes whose column is joined.
+        column: the name of the column.
+    Returns:
+        a series
+    """
+    if not blocks:
+        return pd.Series([], dtype=object)
+    dtype = blocks[0][column].dtype
+    if isinstance(dtype, pd.CategoricalDtype) and all(block[column].dtype == dtype for block in blocks):
+        codes = np.concatenate([block[column].cat.codes.to_numpy() for block in blocks])
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype))
+    return pd.Series(np.concatenate([block[column].to_numpy(dtype=object) for block in blocks]), dtype=object)
+
+
+def pivot_blocks(blocks: list, new_index: str, new_columns: str, new_values: str,
+                 fill_value=np.nan, counter: CopyCounter = None) -> pd.DataFrame:
+    """
+    Reshapes blocks of rows to have a new index, new columns and new values, summing
+    values that land in the same cell like pivot_table(aggfunc='sum'). The blocks are
+    read in a single pass, so filtered views of the table never have to be joined first.
+    Args:
+        blocks: the dataframes (usually views of the table) to reshape together.
+        new_index: the new index column you'd like the dataframe to have
+        new_columns: the new columns you'd want when the dataframe has been reshaped
+        new_values: the new values you'd like the dataframe to have
+        fill_value: value for the cells no value lands in.
+        counter: CopyCounter the gathered rows are recorded in.
+    Returns:
+        a dataframe
+    """
+    index_values = gather_column(blocks, new_index)
+    column_values = gather_column(blocks, new_columns)
+    values = np.concatenate([block[new_values].to_numpy(dtype='float64') for block in blocks]) \
+        if blocks else np.array([], dtype='float64')
+    if counter is not None:
+        counter.record('pivot', index_values.memory_usage(index=False) + column_values.memory_usage(index=False)
+                       + values.nbytes)
+
+    # enumerate the new index and columns so every row knows the cell it lands in
+    with metrics.timer('pivot.column_formatter'):
+        index_formatter = ColumnFormatter(index_values)
+        column_formatter = ColumnFormatter(column_values)
+        rows, columns = index_formatter.encode_column(), column_formatter.encode_column()
+    shape = (len(index_formatter.labels), len(column_formatter.labels))
+
+    # rows missing their new index or column are left out like pivot_table does, the rest
+    # are summed into their cell, and cells with no value are missing rather than 0
+    keep = (rows >= 0) & (columns >= 0)
+    cells = rows[keep] * shape[1] + columns[keep]
+    values = values[keep]
+    present = ~np.isnan(values)
+    sums = np.bincount(cells, weights=np.where(present, values, 0.0), minlength=shape[0] * shape[1])
+    counts = np.bincount(cells[present], minlength=shape[0] * shape[1])
+    sums[counts == 0] = fill_value
+    sums = sums.reshape(shape)
+
+    return pd.DataFrame(sums, index=pd.Index(index_formatter.labels, name=new_index),
+                        columns=pd.Index(column_formatter.labels, name=new_columns))
+
+
+class Pipeline:
+    """
+    A chain of select, drop and pivot stages over a DataFrameFormatter's table.
+    Stages pass views along and are only carried out when run is called, a drop
+    followed by a pivot is skipped since the pivot only reads the columns it needs.
+    e.g, Pipeline(formatter).select({'Source': ['NHMIS'], 'Period': 2015}).drop(['LGA'])
+                            .pivot('State', 'Indicator', 'Value').run()
+    The views read the table's TensorStore instead, the pipeline is kept for the
+    prep_data benchmark the TensorStore is compared against.
+    """
+
+    def __init__(self, formatter, counter: CopyCounter = None):
+        """
+        Args:
+            formatter: DataFrameFormatter whose table the pipeline runs over.
+            counter: CopyCounter copies are recorded in, a new one when None.
+        """
+        self.formatter = formatter
+        self.counter = counter if counter is not None else CopyCounter()
+        self.stages = []
+
+    def select(self, query: dict):
+        """Adds a stage keeping the rows that match the query, see DataFrameFormatter.select."""
+        self.stages.append(('select', {'query': query}))
+        return self
+
+    def drop(self, column_names: list):
+        """Adds a stage dropping columns that don't aid the analysis."""
+        self.stages.append(('drop', {'column_names': list(column_names)}))
+        return self
+
+    def pivot(self, new_index: str, new_columns: str, new_values: str, fill_value=np.nan):
+        """Adds a stage reshaping the rows, see pivot_blocks. It has to be the last stage."""
+        self.stages.append(('pivot', {'new_index': new_index, 'new_columns': new_columns,
+                                       'new_values': new_values, 'fill_value': fill_value}))
+        return self
+
+    def run(self) -> pd.DataFrame:
+        """
+        Carries out the stages.
+        Returns:
+            a dataframe, a view of the table when it could be answered without copying
+        """
+        blocks = [self.formatter.data_frame]
+        dropped = []
+        for position, (stage, options) in enumerate(self.stages):
+            if stage == 'select':
+                with metrics.timer('pipeline.select') as timer:
+                    blocks = timer.observe(self.formatter.select_blocks(options['query'], counter=self.counter))
+            elif stage == 'drop':
+                dropped.extend(options['column_names'])
+            elif stage == 'pivot':
+                if position != len(self.stages) - 1:
+                    raise ValueError("pivot has to be the last stage of a pipeline")
+                with metrics.timer('pipeline.pivot') as timer:
+                    return timer.observe(pivot_blocks(blocks, counter=self.counter, **options))
+
+        if not blocks:
+            blocks = [self.formatter.data_frame.iloc[0:0]]
+        if len(blocks) == 1 and not dropped:
+            return blocks[0]
+        result = pd.concat(blocks) if len(blocks) > 1 else blocks[0]
+        if dropped:
+            with metrics.timer('pipeline.drop') as timer:
+                result = timer.observe(drop_columns(result, dropped))
+        self.counter.record('run', result.memory_usage(index=False).sum())
+        return result
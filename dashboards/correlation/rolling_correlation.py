@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from dashboards.correlation.correlation_engine import pearson_from_sums
+
+
+class PeriodTensor:
+    """
+    Holds a table as a Period x State x Indicator tensor together with the running totals
+    of the sums every pair of indicators needs, so the correlation over any range of
+    periods is a difference of two totals instead of a new pass over the rows.
+    The (state, period) pairs in a range are the observations each pair of indicators
+    is correlated over, using the ones both have a value for.
+    e.g, PeriodTensor(rows).rolling(window=5) for 5 year windows sliding across the periods
+    """
+
+    def __init__(self, data_frame: pd.DataFrame, period: str = 'Period', index_column: str = 'State',
+                 columns: str = 'Indicator', values: str = 'Value'):
+        """
+        Args:
+            data_frame: the long format rows, e.g the rows of one source.
+            period: the column with the periods.
+            index_column: the column whose values, with the periods, are the observations.
+            columns: the column whose values are correlated against each other.
+            values: the column with the values, values landing in the same cell are summed.
+        """
+        self.columns = columns
+        data_frame = data_frame.dropna(subset=[values])
+        period_codes, periods = pd.factorize(data_frame[period], sort=True)
+        index_codes, index_labels = pd.factorize(data_frame[index_column], sort=True)
+        column_codes, column_labels = pd.factorize(data_frame[columns], sort=True)
+        self.periods = np.asarray(periods, dtype='int64')
+        self.index_labels = pd.Index(np.asarray(index_labels), name=index_column)
+        self.labels = pd.Index(np.asarray(column_labels), name=columns)
+
+        # sum the values into their cells, cells no value lands in are missing
+        shape = (len(self.periods), len(self.index_labels), len(self.labels))
+        cells = np.ravel_multi_index((period_codes, index_codes, column_codes), shape)
+        size = int(np.prod(shape))
+        tensor = np.bincount(cells, weights=data_frame[values].to_numpy(dtype='float64'),
+                             minlength=size).astype('float64')
+        present = np.bincount(cells, minlength=size) > 0
+        tensor[~present] = np.nan
+        self.tensor = tensor.reshape(shape)
+        self._build_totals(present.reshape(shape))
+
+    @classmethod
+    def from_store(cls, store, query: dict, period: str = 'Period', index_column: str = 'State',
+                   columns: str = 'Indicator'):
+        """
+        Makes the tensor of the cells of a TensorStore matching a query, without going through the rows.
+        e.g, PeriodTensor.from_store(store, {'Source': ['IHME'], 'Indicator': indicators})
+        Args:
+            store: the TensorStore of the table.
+            query: dictionary of dimension to a label or a list of labels, see TensorStore.select.
+            period: the dimension with the periods.
+            index_column: the dimension whose labels, with the periods, are the observations.
+            columns: the dimension whose labels are correlated against each other.
+        Returns:
+            a PeriodTensor
+        """
+        values, present, (periods, index_labels, labels) = store.aggregate(
+            query, [period, index_column, columns], require_value=True)
+        tensor = cls.__new__(cls)
+        tensor.columns = columns
+        tensor.periods = np.asarray(periods, dtype='int64')
+        tensor.index_labels = index_labels
+        tensor.labels = labels
+        tensor.tensor = values
+        tensor._build_totals(present)
+        return tensor
+
+    def _build_totals(self, present: np.ndarray):
+        """Works out the running totals of the sums of every pair of indicators, see __init__."""
+        shape = self.tensor.shape
+        # center every indicator on its own mean so the totals don't lose precision
+        mask = present.astype('float64')
+        centered = np.where(present, self.tensor - np.nanmean(self.tensor, axis=(0, 1)), 0.0) \
+            if self.tensor.size else np.zeros(shape)
+        transposed = centered.transpose(0, 2, 1)
+
+        # the sums of each period, then running totals of them with a zero in front
+        per_period = {'counts': mask.transpose(0, 2, 1) @ mask,
+                      'sums': transposed @ mask,
+                      'squares': (transposed * transposed) @ mask,
+                      'products': transposed @ centered}
+        self.totals = {}
+        for name, sums in per_period.items():
+            totals = np.zeros((shape[0] + 1, shape[2], shape[2]))
+            np.cumsum(sums, axis=0, out=totals[1:])
+            self.totals[name] = totals
+
+    def _bounds(self, start, end) -> tuple:
+        """Gives the positions in the totals of the first and one past the last period from start to end."""
+        return int(np.searchsorted(self.periods, start, side='left')), \
+            int(np.searchsorted(self.periods, end, side='right'))
+
+    def _matrices(self, bounds: list, min_periods: int = 1):
+        """
+        Works out the correlation and count matrices of several ranges of periods at once.
+        Args:
+            bounds: (first, one past the last) positions of every range, see _bounds.
+            min_periods: the fewest shared observations a pair needs to get a correlation.
+        Returns:
+            a (corr, counts) tuple of arrays with a matrix per range
+        """
+        first, last = np.array(bounds, dtype=np.intp).reshape(-1, 2).T
+        window = {name: totals[last] - totals[first] for name, totals in self.totals.items()}
+        corr = np.stack([pearson_from_sums(window['counts'][position], window['sums'][position],
+                                           window['squares'][position], window['products'][position],
+                                           min_periods=min_periods)
+                         for position in range(len(first))]) if len(first) else window['counts']
+        return corr, window['counts']
+
+    def correlation(self, start, end, min_periods: int = 1) -> pd.DataFrame:
+        """
+        Gives the correlation matrix over the periods from start to end, both included.
+        Args:
+            start: the first period e.g 2010.
+            end: the last period e.g 2015.
+            min_periods: the fewest shared observations a pair needs to get a correlation.
+        Returns:
+            a dataframe
+        """
+        corr, _ = self._matrices([self._bounds(start, end)], min_periods=min_periods)
+        return pd.DataFrame(corr[0], index=self.labels, columns=self.labels)
+
+    def windows(self, window: int, step: int = 1) -> list:
+        """
+        Lists the (start, end) periods of windows of a number of periods sliding across the table,
+        e.g windows(5) for 1990 to 2020 gives (1990, 1994), (1991, 1995) ... (2016, 2020).
+        Args:
+            window: the number of periods in a window, counted in period values e.g years.
+            step: how far each window starts after the one before it.
+        Returns:
+            a list of tuples
+        """
+        if len(self.periods) == 0:
+            return []
+        first, last = int(self.periods[0]), int(self.periods[-1])
+        starts = range(first, max(last - window + 1, first) + 1, step)
+        return [(start, start + window - 1) for start in starts]
+
+    def frames(self, window: int, step: int = 1, min_periods: int = 1):
+        """
+        Works out the correlation matrix of every rolling window in one go, e.g as
+        the frames of an animated heatmap.
+        Args:
+            window: the number of periods in a window.
+            step: how far each window starts after the one before it.
+            min_periods: the fewest shared observations a pair needs to get a correlation.
+        Returns:
+            a (windows, corr, counts) tuple, corr and counts have a matrix per window
+        """
+        windows = self.windows(window, step)
+        corr, counts = self._matrices([self._bounds(start, end) for start, end in windows],
+                                      min_periods=min_periods)
+        return windows, corr, counts
+
+    def rolling(self, window: int, step: int = 1, min_periods: int = 1) -> dict:
+        """
+        Gives the correlation matrix of every rolling window.
+        Args:
+            window: the number of periods in a window.
+            step: how far each window starts after the one before it.
+            min_periods: the fewest shared observations a pair needs to get a correlation.
+        Returns:
+            a dictionary of (start, end) to dataframe
+        """
+        windows, corr, _ = self.frames(window, step, min_periods=min_periods)
+        return {bounds: pd.DataFrame(matrix, index=self.labels, columns=self.labels)
+                for bounds, matrix in zip(windows, corr)}
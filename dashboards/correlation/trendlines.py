@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from dashboards.tensor_store import TensorStore
+
+
+class TrendlineTable:
+    """
+    Holds the ordinary least squares line of every indicator against every other
+    indicator for each (source, period) pair in the table, so the scatter plot can
+    draw its trendline without fitting statsmodels OLS on every request.
+    The lines are fit on the table scatter_operations reshapes, states with no value
+    for an indicator count as 0 like they do there.
+    """
+
+    def __init__(self, data_frame: pd.DataFrame, source: str = 'Source', period: str = 'Period',
+                 index_column: str = 'State', columns: str = 'Indicator', values: str = 'Value'):
+        """
+        Args:
+            data_frame: the long format table, e.g correlation_input_df.
+            source: the column with the data sources.
+            period: the column with the periods.
+            index_column: the column whose values are the points of the scatter plot.
+            columns: the column whose values are plotted against each other.
+            values: the column with the values.
+        """
+        self.groups = {}
+        store = TensorStore.of(data_frame, source=source, indicator=columns, state=index_column,
+                               period=period, values=values)
+        sources, periods = np.nonzero(store.has_row.any(axis=(1, 2)))
+        for source_value, period_value in zip(store.labels[source][sources].tolist(),
+                                              store.labels[period][periods].tolist()):
+            self.groups[(source_value, period_value)] = self.build_group(
+                store, {source: source_value, period: period_value}, index_column, columns)
+
+    @staticmethod
+    def build_group(store: TensorStore, query: dict, index_column: str, columns: str) -> dict:
+        """
+        Works out the sums the line of every pair of columns needs for one (source, period) pair.
+        Args:
+            store: the TensorStore of the table.
+            query: the source and period of the pair, e.g {'Source': 'IHME', 'Period': 2015}.
+            index_column: the dimension whose labels are the points.
+            columns: the dimension whose labels are plotted against each other.
+        Returns:
+            a dictionary with the column positions and the sums
+        """
+        # a missing value counts as 0, the same as the fill scatter_operations uses
+        table, has_row, (_, labels) = store.aggregate(query, [index_column, columns], fill_value=0.0)
+        has_row = has_row.astype('float64')
+        return {
+            'positions': {label: position for position, label in enumerate(labels)},
+            # states with a row for either of a pair are the points of its scatter plot
+            'points': has_row.sum(axis=0)[:, None] + has_row.sum(axis=0)[None, :] - has_row.T @ has_row,
+            'sums': table.sum(axis=0),
+            'products': table.T @ table,
+        }
+
+    def trendline(self, source_value, period_value, horizontal, vertical):
+        """
+        Gives the least squares line of vertical against horizontal.
+        Args:
+            source_value: the source to look up.
+            period_value: the period to look up.
+            horizontal: the indicator on the x axis.
+            vertical: the indicator on the y axis.
+        Returns:
+            a (slope, intercept) tuple, None when the line can't be fit
+        """
+        group = self.groups.get((source_value, period_value))
+        if group is None or horizontal not in group['positions'] or vertical not in group['positions']:
+            return None
+        x, y = group['positions'][horizontal], group['positions'][vertical]
+        points = group['points'][x, y]
+        sum_x, sum_y = group['sums'][x], group['sums'][y]
+        spread = points * group['products'][x, x] - sum_x * sum_x
+        if points < 2 or spread <= 1e-12 * points * group['products'][x, x]:
+            return None
+        slope = (points * group['products'][x, y] - sum_x * sum_y) / spread
+        return slope, (sum_y - slope * sum_x) / points
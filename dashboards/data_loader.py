@@ -0,0 +1,606 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = ".cache"
+
+# namespaces of the parts of an xlsx file the sheet names are read from
+WORKBOOK_NAMESPACES = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+                       "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships"}
+
+# frames already loaded in this process, keyed on (workbook path, sheet, fingerprint)
+_loaded_frames = {}
+
+# fingerprints worked out in this process, keyed on the file path, with the stat they were worked out at
+_fingerprints = {}
+
+# frames given a fingerprint by tag_frame, keyed on id, with a weak reference to tell a reused id apart
+_tagged_frames = {}
+
+# functions called with (workbook path, sheet) when a sheet is loaded again after its file changed
+_reload_listeners = []
+
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    Fingerprints a file from its modification time, size and content hash
+    so a cache built from it can be reused until the file changes. The file is
+    only hashed again when its modification time or size has changed since the
+    last time it was fingerprinted in this process.
+    Args:
+        file_path: path to the file to be fingerprinted.
+    Returns:
+        a hex string
+    """
+    file_stat = os.stat(file_path)
+    path = os.path.abspath(file_path)
+    stat_key = (file_stat.st_mtime_ns, file_stat.st_size)
+    known = _fingerprints.get(path)
+    if known is not None and known[0] == stat_key:
+        return known[1]
+
+    file_hash = hashlib.sha1(f"{file_stat.st_mtime_ns}:{file_stat.st_size}".encode())
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            file_hash.update(block)
+    fingerprint = file_hash.hexdigest()[:16]
+    _fingerprints[path] = (stat_key, fingerprint)
+    return fingerprint
+
+
+def tag_frame(data_frame: pd.DataFrame, fingerprint: str) -> pd.DataFrame:
+    """
+    Gives a frame the fingerprint it is cached under, e.g the one load_sheet gives every sheet.
+    Only this object has it, pandas copies attrs onto the frames made from it, e.g by filtering,
+    head, drop or concat, so the fingerprint isn't read from attrs, see loaded_fingerprint.
+    Args:
+        data_frame: the frame, which isn't to be changed in place afterwards.
+        fingerprint: the fingerprint of the data in it.
+    Returns:
+        the frame
+    """
+    data_frame.attrs["fingerprint"] = fingerprint
+    frame_id = id(data_frame)
+    _tagged_frames[frame_id] = (weakref.ref(data_frame, lambda _: _tagged_frames.pop(frame_id, None)),
+                                fingerprint)
+    return data_frame
+
+
+def loaded_fingerprint(data_frame: pd.DataFrame):
+    """The fingerprint tag_frame gave this very frame, None for any other frame, including ones made from it."""
+    entry = _tagged_frames.get(id(data_frame))
+    if entry is not None and entry[0]() is data_frame:
+        return entry[1]
+    return None
+
+
+def frame_fingerprint(data_frame: pd.DataFrame) -> str:
+    """
+    Fingerprints the data in a frame, for keying what is worked out from it. The fingerprint
+    tag_frame gave it when there is one, otherwise a hash of its columns and rows, so a
+    filtered or edited frame made from a loaded sheet isn't mistaken for the sheet.
+    Args:
+        data_frame: the frame to be fingerprinted.
+    Returns:
+        a hex string
+    """
+    fingerprint = loaded_fingerprint(data_frame)
+    if fingerprint is not None:
+        return fingerprint
+    content_hash = hashlib.sha1(repr([(str(column), str(dtype))
+                                      for column, dtype in data_frame.dtypes.items()]).encode())
+    content_hash.update(pd.util.hash_pandas_object(data_frame, index=True).to_numpy().tobytes())
+    return "content-" + content_hash.hexdigest()[:16]
+
+
+def cache_path(workbook_path: str, sheet_name: str, fingerprint: str, cache_dir: str = None) -> str:
+    """
+    Works out the directory the columnar cache of a workbook sheet lives in.
+    Args:
+        workbook_path: path to the excel workbook.
+        sheet_name: the sheet in the workbook that is cached.
+        fingerprint: fingerprint of the workbook from file_fingerprint.
+        cache_dir: directory to keep caches in, defaults to a .cache folder next to the workbook.
+    Returns:
+        a directory path
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(workbook_path)), CACHE_DIR_NAME)
+    workbook_name = os.path.splitext(os.path.basename(workbook_path))[0]
+    sheet_slug = re.sub(r"[^0-9A-Za-z]+", "_", sheet_name).strip("_")
+    return os.path.join(cache_dir, f"{workbook_name}-{sheet_slug}-{fingerprint}")
+
+
+def write_cache(data_frame: pd.DataFrame, directory: str):
+    """
+    Writes a dataframe to disk as one .npy file per column so it can be memory mapped later.
+    Text columns are stored as integer codes plus a file of labels.
+    Args:
+        data_frame: the dataframe to be cached.
+        directory: the directory the cache is written to.
+    """
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    # write into a temporary directory and rename it so other workers never see a half written cache
+    temp_directory = tempfile.mkdtemp(dir=parent)
+    columns = []
+    for position, column in enumerate(data_frame.columns):
+        values = data_frame[column]
+        if pd.api.types.is_numeric_dtype(values):
+            np.save(os.path.join(temp_directory, f"{position}.npy"), values.to_numpy())
+            columns.append({"name": column, "kind": "numeric"})
+        else:
+            # sorted labels let the codes be read back as categories in order
+            codes, labels = pd.factorize(values, sort=True)
+            np.save(os.path.join(temp_directory, f"{position}.codes.npy"), codes.astype(np.int32))
+            np.save(os.path.join(temp_directory, f"{position}.labels.npy"), np.asarray(labels, dtype=str))
+            columns.append({"name": column, "kind": "text"})
+
+    with open(os.path.join(temp_directory, "meta.json"), "w") as meta_file:
+        json.dump({"columns": columns, "rows": len(data_frame)}, meta_file)
+
+    try:
+        os.replace(temp_directory, directory)
+    except OSError:
+        # another worker finished writing the same cache first
+        shutil.rmtree(temp_directory, ignore_errors=True)
+
+
+def read_cache(directory: str, categorical: bool = False) -> pd.DataFrame:
+    """
+    Reads a cache written by write_cache back into a dataframe. Numeric columns
+    are memory mapped so processes reading the same cache share its pages.
+    Args:
+        directory: the directory the cache was written to.
+        categorical: give text columns back as categoricals built straight from the
+                     stored codes instead of columns of python strings.
+    Returns:
+        a dataframe
+    """
+    with open(os.path.join(directory, "meta.json")) as meta_file:
+        meta = json.load(meta_file)
+
+    data = {}
+    for position, column in enumerate(meta["columns"]):
+        if column["kind"] == "numeric":
+            values = np.load(os.path.join(directory, f"{position}.npy"), mmap_mode="r")
+            data[column["name"]] = values.view(np.ndarray)
+        else:
+            codes = np.load(os.path.join(directory, f"{position}.codes.npy"))
+            labels = np.load(os.path.join(directory, f"{position}.labels.npy")).astype(object)
+            if categorical:
+                # caches written before the labels were sorted get their codes put in label order
+                order = np.argsort(labels, kind="stable")
+                if (order != np.arange(len(order))).any():
+                    rank = np.empty_like(order)
+                    rank[order] = np.arange(len(order))
+                    codes = np.where(codes >= 0, rank[codes], -1)
+                    labels = labels[order]
+                data[column["name"]] = pd.Categorical.from_codes(codes, categories=labels)
+                continue
+            # factorize marks missing values with -1
+            values = np.append(labels, np.nan)[codes]
+            data[column["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def compact_frame(data_frame: pd.DataFrame, float_dtype: str = "float32") -> pd.DataFrame:
+    """
+    Shrinks a dataframe so it takes less memory and filters on it compare numbers,
+    text columns become categoricals with sorted categories (one dictionary of
+    labels per column and a small integer code per row), integer columns take
+    the smallest integer type their values fit in and float columns become float32.
+    Args:
+        data_frame: the dataframe to be compacted, e.g the correlation input sheet.
+        float_dtype: the dtype of the float columns.
+    Returns:
+        a dataframe, columns that are already compact are not copied
+    """
+    data = {}
+    for column in data_frame.columns:
+        values = data_frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            data[column] = values
+        elif pd.api.types.is_bool_dtype(values):
+            data[column] = values
+        elif pd.api.types.is_integer_dtype(values):
+            data[column] = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_float_dtype(values):
+            data[column] = values.astype(float_dtype, copy=False)
+        else:
+            data[column] = values.astype("category")
+    compacted = pd.DataFrame(data, copy=False)
+    compacted.attrs.update(data_frame.attrs)
+    return compacted
+
+
+def widen_frame(data_frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Undoes compact_frame for code that needs 64 bit numbers and columns of python strings.
+    Args:
+        data_frame: the dataframe to be widened.
+    Returns:
+        a dataframe
+    """
+    data = {}
+    for column in data_frame.columns:
+        values = data_frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            data[column] = values.astype(object)
+        elif pd.api.types.is_bool_dtype(values):
+            data[column] = values
+        elif pd.api.types.is_integer_dtype(values):
+            data[column] = values.astype("int64", copy=False)
+        elif pd.api.types.is_float_dtype(values):
+            data[column] = values.astype("float64", copy=False)
+        else:
+            data[column] = values
+    widened = pd.DataFrame(data, copy=False)
+    widened.attrs.update(data_frame.attrs)
+    return widened
+
+
+def add_reload_listener(listener):
+    """
+    Registers a function to be called when a sheet is reloaded because its
+    workbook changed, e.g to clear results worked out from the old data.
+    Args:
+        listener: function taking the workbook path and the sheet name.
+    """
+    _reload_listeners.append(listener)
+
+
+def list_sheets(workbook_path: str, include_hidden: bool = False) -> list:
+    """
+    Lists the sheets of a workbook in the order excel shows them. The names of an xlsx
+    workbook are read from the xl/workbook.xml entry of its zip file, without parsing
+    any cells, other workbooks are opened with pandas.
+    Args:
+        workbook_path: path to the excel workbook.
+        include_hidden: list hidden sheets too.
+    Returns:
+        a list of sheet names
+    """
+    if not zipfile.is_zipfile(workbook_path):
+        return pd.ExcelFile(workbook_path).sheet_names
+    with zipfile.ZipFile(workbook_path) as workbook_zip:
+        workbook_xml = ElementTree.fromstring(workbook_zip.read("xl/workbook.xml"))
+    sheets = workbook_xml.findall("main:sheets/main:sheet", WORKBOOK_NAMESPACES)
+    return [sheet.get("name") for sheet in sheets
+            if include_hidden or sheet.get("state", "visible") == "visible"]
+
+
+def build_sheet_cache(workbook_path: str, sheet_name: str, fingerprint: str = None,
+                      cache_dir: str = None) -> str:
+    """
+    Parses a sheet and writes its columnar cache, unless the cache is already there.
+    Args:
+        workbook_path: path to the excel workbook.
+        sheet_name: the sheet in the workbook to cache.
+        fingerprint: fingerprint of the workbook, worked out when None.
+        cache_dir: directory to keep caches in, defaults to a .cache folder next to the workbook.
+    Returns:
+        the directory of the cache
+    """
+    if fingerprint is None:
+        fingerprint = file_fingerprint(workbook_path)
+    directory = cache_path(workbook_path, sheet_name, fingerprint, cache_dir)
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        # the cache is always written compact, it is widened on the way out when asked to
+        data_frame = compact_frame(pd.read_excel(workbook_path, sheet_name))
+        write_cache(data_frame, directory)
+    return directory
+
+
+def load_sheets(workbook_path: str = "data/sample_data.xlsx", sheet_names: list = None,
+                cache_dir: str = None, compact: bool = True, workers: int = None) -> dict:
+    """
+    Loads several sheets of a workbook, parsing the sheets that have no columnar cache yet
+    in a pool of processes, one sheet per process, then reading every sheet from its cache.
+    e.g, load_sheets('data/sample_data.xlsx', ['Correlation Input Sheet', 'Data'])
+    Args:
+        workbook_path: path to the excel workbook.
+        sheet_names: the sheets to load, every visible sheet when None.
+        cache_dir: directory to keep caches in, defaults to a .cache folder next to the workbook.
+        compact: give the sheets back compact, see load_sheet.
+        workers: number of processes parsing sheets, defaults to the number of cores.
+                 With 1 the sheets are parsed one after the other in this process.
+    Returns:
+        a dictionary of sheet name to dataframe
+    """
+    if sheet_names is None:
+        sheet_names = list_sheets(workbook_path)
+    fingerprint = file_fingerprint(workbook_path)
+    missing = [sheet_name for sheet_name in sheet_names
+               if not os.path.exists(os.path.join(cache_path(workbook_path, sheet_name, fingerprint, cache_dir),
+                                                  "meta.json"))]
+    workers = min(workers or os.cpu_count() or 1, len(missing))
+    if workers > 1:
+        # parsing is pure python, so sheets are parsed in processes rather than threads
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(build_sheet_cache, [workbook_path] * len(missing), missing,
+                              [fingerprint] * len(missing), [cache_dir] * len(missing)))
+    return {sheet_name: load_sheet(workbook_path, sheet_name, cache_dir, compact) for sheet_name in sheet_names}
+
+
+def load_sheet(workbook_path: str = "data/sample_data.xlsx",
+               sheet_name: str = "Correlation Input Sheet", cache_dir: str = None,
+               compact: bool = True, filters: dict = None, partitioned: bool = False) -> pd.DataFrame:
+    """
+    Loads a sheet from an excel workbook, parsing the workbook only the first time
+    and reading the columnar cache built from it on every later start.
+    Every caller in a process gets the same dataframe back, tagged with the
+    fingerprint of the workbook, see tag_frame.
+    With filters only the matching rows are loaded, checked while the sheet is read,
+    so a workbook too big for memory never has to be loaded whole. These dataframes
+    are loaded again on every call and aren't tagged.
+    e.g, load_sheet('data/msdat_data.xlsx', 'Sheet1', filters={'Source': ['NHMIS'], 'Period': 2021})
+    Args:
+        workbook_path: path to the excel workbook, or a csv or parquet file when filtered.
+        sheet_name: the sheet in the workbook to load.
+        cache_dir: directory to keep caches in, defaults to a .cache folder next to the workbook.
+        compact: give the sheet back as compact_frame makes it, with categorical text
+                 columns, small integers and float32 values, instead of the dtypes
+                 read_excel gives.
+        filters: dictionary of column name to the value, or list of values, to keep,
+                 e.g the Source, Period and Indicator of a query. The whole sheet when None.
+        partitioned: with filters, partition the sheet on disk by Source and Period the
+                     first time, see partition_sheet, and read only the partitions the
+                     filters pick instead of scanning the whole sheet on every call.
+    Returns:
+        a dataframe
+    """
+    fingerprint = file_fingerprint(workbook_path)
+    if filters is not None:
+        if partitioned:
+            partition_dir = partition_sheet(workbook_path, sheet_name, output_dir=cache_path(
+                workbook_path, sheet_name, fingerprint, cache_dir) + "-partitions")
+            data_frame = read_partitions(partition_dir, filters)
+        else:
+            data_frame = stream_sheet(workbook_path, sheet_name, filters)
+        return compact_frame(data_frame) if compact else widen_frame(data_frame)
+
+    key = (os.path.abspath(workbook_path), sheet_name, fingerprint, compact)
+    if key in _loaded_frames:
+        return _loaded_frames[key]
+
+    directory = build_sheet_cache(workbook_path, sheet_name, fingerprint, cache_dir)
+    data_frame = read_cache(directory, categorical=compact)
+    data_frame = compact_frame(data_frame) if compact else widen_frame(data_frame)
+    tag_frame(data_frame, fingerprint)
+
+    # forget frames loaded from an older version of the workbook and let listeners know
+    stale_keys = [loaded_key for loaded_key in _loaded_frames
+                  if loaded_key[:2] == key[:2] and loaded_key[2] != fingerprint]
+    for stale_key in stale_keys:
+        del _loaded_frames[stale_key]
+    _loaded_frames[key] = data_frame
+    if stale_keys:
+        for listener in _reload_listeners:
+            listener(workbook_path, sheet_name)
+    return data_frame
+
+
+def iter_sheet_chunks(workbook_path: str, sheet_name: str = "Correlation Input Sheet",
+                      chunk_rows: int = 50_000):
+    """
+    Reads a sheet a chunk of rows at a time so the whole sheet never has to be in memory.
+    Excel workbooks are read with openpyxl in read only mode, csv files with pandas
+    and parquet files a row group at a time with pyarrow.
+    Args:
+        workbook_path: path to the excel workbook, csv or parquet file.
+        sheet_name: the sheet in the workbook to read, not used for csv and parquet files.
+        chunk_rows: the number of rows in each chunk.
+    Returns:
+        a generator of dataframes
+    """
+    extension = os.path.splitext(workbook_path)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(workbook_path, chunksize=chunk_rows)
+        return
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(workbook_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        chunk = []
+        for row in rows:
+            # read only sheets can report empty rows past the end of the data
+            if all(value is None for value in row):
+                continue
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                yield chunk_frame(chunk, header)
+                chunk = []
+        if chunk:
+            yield chunk_frame(chunk, header)
+    finally:
+        workbook.close()
+
+
+def chunk_frame(rows: list, header: tuple) -> pd.DataFrame:
+    """
+    Turns rows read from a sheet into a dataframe with the dtypes read_excel would give them.
+    Args:
+        rows: tuples of cell values.
+        header: the column names.
+    Returns:
+        a dataframe
+    """
+    data_frame = pd.DataFrame.from_records(rows, columns=header).infer_objects()
+    for column in data_frame.columns:
+        values = data_frame[column]
+        # numbers saved as text are read as numbers, like read_excel does
+        if values.dtype == object:
+            try:
+                values = pd.to_numeric(values)
+            except (ValueError, TypeError):
+                continue
+            data_frame[column] = values
+        # excel stores every number as a float, read_excel gives whole numbers back as integers
+        if values.dtype.kind == "f" and values.notna().all() and (values % 1 == 0).all():
+            data_frame[column] = values.astype("int64")
+    return data_frame
+
+
+def row_mask(data_frame: pd.DataFrame, filters: dict) -> np.ndarray:
+    """
+    Finds the rows of a dataframe that match every filter.
+    e.g, filters={'Source': ['NHMIS', 'IHME'], 'Period': 2015}
+    Args:
+        data_frame: the dataframe to be filtered.
+        filters: dictionary of column name to the value, or list of values, to keep.
+    Returns:
+        a boolean numpy array
+    """
+    mask = np.ones(len(data_frame), dtype=bool)
+    for column, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        mask &= data_frame[column].isin(values).to_numpy()
+    return mask
+
+
+def stream_sheet(workbook_path: str, sheet_name: str = "Correlation Input Sheet",
+                 filters: dict = None, columns: list = None, chunk_rows: int = 50_000) -> pd.DataFrame:
+    """
+    Loads only the rows of a sheet that match the filters, e.g the Source, Period and
+    Indicator a request asks for, checking them while the sheet is read so the most
+    memory used is the matching rows plus one chunk instead of the whole sheet.
+    Args:
+        workbook_path: path to the excel workbook, csv or parquet file.
+        sheet_name: the sheet in the workbook to load.
+        filters: dictionary of column name to the value, or list of values, to keep.
+                 Every row is kept when None.
+        columns: the columns to keep, all of them when None.
+        chunk_rows: the number of rows read at a time.
+    Returns:
+        a dataframe
+    """
+    matches = []
+    header = None
+    for chunk in iter_sheet_chunks(workbook_path, sheet_name, chunk_rows):
+        header = chunk.columns
+        if filters:
+            chunk = chunk[row_mask(chunk, filters)]
+        if columns is not None:
+            chunk = chunk[columns]
+        if len(chunk):
+            matches.append(chunk)
+    if not matches:
+        return pd.DataFrame(columns=columns if columns is not None else header)
+    return pd.concat(matches, ignore_index=True)
+
+
+def partition_sheet(workbook_path: str, sheet_name: str = "Correlation Input Sheet",
+                    partition_columns: tuple = ("Source", "Period"), output_dir: str = None,
+                    chunk_rows: int = 50_000) -> str:
+    """
+    Splits a sheet on disk into one partition per combination of the partition columns,
+    reading it a chunk at a time. Each chunk's rows for a partition are written with
+    write_cache, so a partition is a list of parts that can be memory mapped. The
+    partitions only show up in output_dir once all of them and the manifest are written.
+    Args:
+        workbook_path: path to the excel workbook, csv or parquet file.
+        sheet_name: the sheet in the workbook to partition.
+        partition_columns: the columns the rows are partitioned by.
+        output_dir: directory the partitions are written to, defaults to a folder
+                    named after the workbook, sheet and fingerprint in the .cache folder.
+        chunk_rows: the number of rows read at a time.
+    Returns:
+        the directory the partitions were written to
+    """
+    partition_columns = list(partition_columns)
+    if output_dir is None:
+        output_dir = cache_path(workbook_path, sheet_name, file_fingerprint(workbook_path)) + "-partitions"
+    if os.path.exists(os.path.join(output_dir, "manifest.json")):
+        return output_dir
+
+    parent = os.path.dirname(os.path.abspath(output_dir))
+    os.makedirs(parent, exist_ok=True)
+    # write into a temporary directory and rename it once the manifest is in, so a run that
+    # crashes part way never leaves partitions behind that look finished
+    temp_directory = tempfile.mkdtemp(dir=parent)
+    try:
+        partitions = {}
+        part_number = 0
+        header = []
+        for chunk in iter_sheet_chunks(workbook_path, sheet_name, chunk_rows):
+            header = [str(column) for column in chunk.columns]
+            for values, rows in chunk.groupby(partition_columns, sort=False):
+                values = values if isinstance(values, tuple) else (values,)
+                # numpy scalars are turned into python ones so the manifest can be written as json
+                values = tuple(value.item() if isinstance(value, np.generic) else value for value in values)
+                part = f"part-{part_number:06d}"
+                write_cache(rows.reset_index(drop=True), os.path.join(temp_directory, part))
+                partitions.setdefault(values, []).append(part)
+                part_number += 1
+
+        with open(os.path.join(temp_directory, "manifest.json"), "w") as manifest_file:
+            json.dump({"columns": partition_columns, "header": header,
+                       "partitions": [{"values": list(values), "parts": parts}
+                                      for values, parts in partitions.items()]}, manifest_file)
+    except BaseException:
+        shutil.rmtree(temp_directory, ignore_errors=True)
+        raise
+
+    if os.path.isdir(output_dir) and not os.path.exists(os.path.join(output_dir, "manifest.json")):
+        # left behind by a run from before partitions were written this way
+        shutil.rmtree(output_dir, ignore_errors=True)
+    try:
+        os.replace(temp_directory, output_dir)
+    except OSError:
+        # another worker finished partitioning the same sheet first
+        shutil.rmtree(temp_directory, ignore_errors=True)
+    return output_dir
+
+
+def read_partitions(partition_dir: str, filters: dict = None) -> pd.DataFrame:
+    """
+    Loads the rows of a partitioned sheet that match the filters. Filters on the
+    partition columns pick the partitions to read, any other filter is checked on their rows.
+    Args:
+        partition_dir: the directory partition_sheet wrote to.
+        filters: dictionary of column name to the value, or list of values, to keep.
+    Returns:
+        a dataframe
+    """
+    with open(os.path.join(partition_dir, "manifest.json")) as manifest_file:
+        manifest = json.load(manifest_file)
+    filters = filters or {}
+    partition_filters = {column: value for column, value in filters.items() if column in manifest["columns"]}
+    row_filters = {column: value for column, value in filters.items() if column not in manifest["columns"]}
+
+    matches = []
+    for partition in manifest["partitions"]:
+        values = dict(zip(manifest["columns"], partition["values"]))
+        wanted = all(values[column] in (value if isinstance(value, (list, tuple, set)) else [value])
+                     for column, value in partition_filters.items())
+        if not wanted:
+            continue
+        for part in partition["parts"]:
+            rows = read_cache(os.path.join(partition_dir, part))
+            if row_filters:
+                rows = rows[row_mask(rows, row_filters)]
+            matches.append(rows)
+    if not matches:
+        # manifests written before the header was kept in them give no columns
+        return pd.DataFrame(columns=manifest.get("header", []))
+    return pd.concat(matches, ignore_index=True)
@@ -0,0 +1,105 @@
+import functools
+import json
+
+import numpy as np
+from dashboards.result_cache import ResultCache
+
+# trace attributes holding the plotted numbers, sent rounded
+ARRAY_KEYS = ('x', 'y', 'z', 'customdata')
+
+
+def plain_array(values, digits: int = 7):
+    """
+    Turns numbers into a json list rounded to a number of significant digits, so a float
+    is written as e.g 0.4821753 instead of the 17 digits of a float64. Typed arrays would be
+    smaller still, but the plotly.js of the pinned dash can't read them.
+    Args:
+        values: the numbers, anything numpy can make an array of.
+        digits: the significant digits floats are kept to, 7 is about what float32 holds.
+    Returns:
+        a (nested for 2d values) list with None for missing values, or the values
+        as they were when they aren't numbers
+    """
+    array = np.asarray(values)
+    if array.dtype.kind not in 'fiu' or array.ndim == 0 or array.size == 0:
+        return values
+    if array.dtype.kind in 'iu':
+        return array.tolist()
+    # NaN isn't valid json, plotly.js reads null as a gap
+    rounded = [None if value != value else float(f"{value:.{digits}g}") for value in array.ravel().tolist()]
+    if array.ndim == 1:
+        return rounded
+    return np.array(rounded, dtype=object).reshape(array.shape).tolist()
+
+
+def compact_figure(figure, digits: int = 7) -> dict:
+    """
+    Turns a figure into a plain dictionary with the numbers of its traces rounded, see plain_array.
+    Args:
+        figure: a plotly figure or a figure dictionary.
+        digits: the significant digits floats are kept to.
+    Returns:
+        a dictionary
+    """
+    figure = figure.to_dict() if hasattr(figure, 'to_dict') else dict(figure)
+    data = []
+    for trace in figure.get('data', []):
+        trace = dict(trace)
+        for key in ARRAY_KEYS:
+            if key in trace and not isinstance(trace[key], dict):
+                trace[key] = plain_array(trace[key], digits=digits)
+        data.append(trace)
+    if data:
+        figure['data'] = data
+    return figure
+
+
+def json_default(value):
+    """Lets json.dumps write the numpy values a figure dictionary can still hold."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} can't be written as json")
+
+
+class FigureCache(ResultCache):
+    """
+    Keeps the figures the Dash callbacks make as compact json, keyed on the callback
+    inputs, so a combination of dropdowns that was already seen is answered without
+    running the operations or plotly express again.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = None, digits: int = 7):
+        """
+        Args:
+            max_size: the most figures kept before the least recently used is evicted.
+            ttl: seconds a figure is kept for, figures never expire when None.
+            digits: the significant digits the numbers of the figures are sent with.
+        """
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.digits = digits
+
+    def memoize(self, func):
+        """
+        Decorates a callback so the figures it returns are stored in this cache as json.
+        Args:
+            func: the callback to be decorated.
+        """
+        @functools.wraps(func)
+        def serialized(*args, **kwargs):
+            return json.dumps(compact_figure(func(*args, **kwargs), digits=self.digits), default=json_default)
+
+        cached = super().memoize(serialized)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return json.loads(cached(*args, **kwargs))
+
+        wrapper.cache = self
+        return wrapper
+
+    def nbytes(self) -> int:
+        """The size of the stored figures' json."""
+        with self._lock:
+            return sum(len(entry[1]) for entry in self._results.values())
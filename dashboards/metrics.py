@@ -0,0 +1,280 @@
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# upper bounds in seconds of the buckets the durations of a stage are counted in
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+PREFIX = "dashboards"
+
+
+def result_size(result) -> tuple:
+    """
+    Works out how many rows a stage produced and how big they are.
+    Args:
+        result: what the stage returned or yielded, e.g a dataframe.
+    Returns:
+        a (rows, nbytes) tuple, (None, None) for results that aren't tables
+    """
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(index=True, deep=False).sum())
+    if isinstance(result, pd.Series):
+        return len(result), int(result.memory_usage(index=True, deep=False))
+    if isinstance(result, np.ndarray):
+        return (len(result) if result.ndim else 1), int(result.nbytes)
+    if isinstance(result, (list, tuple)) and result and all(isinstance(item, (pd.DataFrame, pd.Series))
+                                                            for item in result):
+        sizes = [result_size(item) for item in result]
+        return sum(rows for rows, _ in sizes), sum(nbytes for _, nbytes in sizes)
+    return None, None
+
+
+def escape_label(value: str) -> str:
+    """Escapes a label value for the Prometheus text format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class StageTimer:
+    """
+    The measurements of one run of a stage, handed out by MetricsRegistry.timer
+    so the stage can report the rows it made while it runs.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.rows = None
+        self.nbytes = None
+
+    def observe(self, result):
+        """
+        Counts the rows and bytes of what the stage produced.
+        Args:
+            result: a dataframe, series, array or list of them.
+        Returns:
+            the result, so it can be wrapped around a return value
+        """
+        rows, nbytes = result_size(result)
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+            self.nbytes = (self.nbytes or 0) + nbytes
+        return result
+
+
+class MetricsRegistry:
+    """
+    Durations, row counts and bytes of the stages of the operations, e.g filtering,
+    pivoting, correlating and fitting, so it can be seen where a slow request spends
+    its time. Off unless enabled, when the timers cost a check of a flag.
+    Exported as Prometheus text or json, see the /metrics route of the app.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False):
+        """
+        Args:
+            enabled: whether the timers record anything.
+            trace_memory: whether the bytes allocated by each stage are traced with tracemalloc,
+                          which slows everything down, so it's only worth it while profiling.
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self._stages = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+        if enabled:
+            self.enable(trace_memory)
+
+    def enable(self, trace_memory: bool = False):
+        """
+        Starts recording.
+        Args:
+            trace_memory: whether the bytes allocated by each stage are traced too.
+        """
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        """Stops recording, what was recorded is kept."""
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def add_collector(self, name: str, collector):
+        """
+        Adds values read when the metrics are exported, e.g the stats of a cache.
+        Args:
+            name: prefix of the values, e.g 'result_cache'.
+            collector: function returning a dictionary of value name to number.
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def record(self, stage: str, seconds: float, rows: int = None, nbytes: int = None,
+               allocated: int = None, failed: bool = False):
+        """
+        Records a run of a stage.
+        Args:
+            stage: the name of the stage, e.g 'correlation_operations.correlate'.
+            seconds: how long the run took.
+            rows: the rows it produced, if known.
+            nbytes: the bytes of what it produced, if known.
+            allocated: the bytes it allocated, if traced.
+            failed: whether it raised.
+        """
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {'count': 0, 'errors': 0, 'seconds_total': 0.0,
+                                               'seconds_max': 0.0, 'rows_total': 0, 'output_bytes_total': 0,
+                                               'allocated_bytes_total': 0, 'buckets': [0] * len(BUCKETS)}
+            entry['count'] += 1
+            entry['errors'] += int(failed)
+            entry['seconds_total'] += seconds
+            entry['seconds_max'] = max(entry['seconds_max'], seconds)
+            entry['rows_total'] += rows or 0
+            entry['output_bytes_total'] += nbytes or 0
+            entry['allocated_bytes_total'] += allocated or 0
+            for position, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry['buckets'][position] += 1
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        """
+        Times the code in a with block as a stage.
+        e.g, with metrics.timer('pivot') as stage:
+                 stage.observe(pivot_blocks(...))
+        Args:
+            stage: the name of the stage.
+        """
+        timer = StageTimer(stage)
+        if not self.enabled:
+            yield timer
+            return
+
+        trace_memory = self.trace_memory and tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if trace_memory else None
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield timer
+        except Exception:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            # the bytes still held when the stage ends, e.g the frames it made
+            allocated = max(tracemalloc.get_traced_memory()[0] - memory_before, 0) if trace_memory else None
+            self.record(stage, seconds, timer.rows, timer.nbytes, allocated, failed)
+
+    def timed(self, stage: str = None):
+        """
+        Decorates a function so every call is timed as a stage, counting the rows of the
+        dataframes it returns. Functions that yield are timed until they are exhausted.
+        Args:
+            stage: the name of the stage, the function's name when None.
+        """
+        def decorator(func):
+            name = stage or func.__qualname__
+
+            if inspect.isgeneratorfunction(func):
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        yield from func(*args, **kwargs)
+                        return
+                    with self.timer(name) as timer:
+                        for item in func(*args, **kwargs):
+                            yield timer.observe(item)
+            else:
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return func(*args, **kwargs)
+                    with self.timer(name) as timer:
+                        return timer.observe(func(*args, **kwargs))
+
+            return wrapper
+        return decorator
+
+    def gauges(self) -> dict:
+        """Reads the values of the collectors, e.g {'result_cache_hits': 10}."""
+        with self._lock:
+            collectors = dict(self._collectors)
+        values = {}
+        for name, collector in collectors.items():
+            for key, value in collector().items():
+                if isinstance(value, (int, float)):
+                    values[f"{name}_{key}"] = value
+        return values
+
+    def snapshot(self) -> dict:
+        """
+        Gives everything recorded so far.
+        Returns:
+            a dictionary with the stages, keyed by name, and the values of the collectors
+        """
+        with self._lock:
+            stages = {name: dict(entry, buckets=dict(zip(BUCKETS, entry['buckets'])))
+                      for name, entry in self._stages.items()}
+        return {'enabled': self.enabled, 'trace_memory': self.trace_memory,
+                'stages': stages, 'gauges': self.gauges()}
+
+    def to_json(self) -> str:
+        """The snapshot as json, with the bucket bounds as strings."""
+        snapshot = self.snapshot()
+        for entry in snapshot['stages'].values():
+            entry['buckets'] = {str(bound): count for bound, count in entry['buckets'].items()}
+        return json.dumps(snapshot)
+
+    def to_prometheus(self) -> str:
+        """
+        The snapshot in the Prometheus text format, the durations as a histogram per stage.
+        Returns:
+            the text served by /metrics
+        """
+        snapshot = self.snapshot()
+        lines = [f"# HELP {PREFIX}_stage_seconds Time spent in each stage of the operations.",
+                 f"# TYPE {PREFIX}_stage_seconds histogram"]
+        for stage, entry in snapshot['stages'].items():
+            label = f'stage="{escape_label(stage)}"'
+            for bound, count in entry['buckets'].items():
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{{label},le="+Inf"}} {entry["count"]}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{{label}}} {entry["seconds_total"]:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{{label}}} {entry["count"]}')
+
+        counters = [('errors', 'Runs of each stage that raised.'),
+                    ('rows_total', 'Rows produced by each stage.'),
+                    ('output_bytes_total', 'Bytes of the rows produced by each stage.'),
+                    ('allocated_bytes_total', 'Bytes allocated by each stage, when memory is traced.')]
+        for key, help_text in counters:
+            name = f"{PREFIX}_stage_{key if key.endswith('_total') else key + '_total'}"
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+            for stage, entry in snapshot['stages'].items():
+                lines.append(f'{name}{{stage="{escape_label(stage)}"}} {entry[key]}')
+
+        for key, value in snapshot['gauges'].items():
+            lines.extend([f"# TYPE {PREFIX}_{key} gauge", f"{PREFIX}_{key} {value}"])
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Forgets what was recorded."""
+        with self._lock:
+            self._stages.clear()
+
+
+# the registry the operations record into, turned on with DASHBOARDS_METRICS=1 (or =memory to
+# trace allocations too) or python -m dashboards --metrics
+metrics = MetricsRegistry(enabled=os.environ.get('DASHBOARDS_METRICS', '0') not in ('', '0'),
+                          trace_memory=os.environ.get('DASHBOARDS_METRICS') == 'memory')
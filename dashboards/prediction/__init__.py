@@ -0,0 +1 @@
+"""Forecasting the series of the input sheet with ARIMA models."""
@@ -0,0 +1,196 @@
+import contextlib
+import io
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from dashboards.prediction.batch_forecast import MIN_DATA_POINTS, series_tasks
+from dashboards.prediction.predictive_model_functions import arima_value_generator
+from dashboards.prediction.stationarity import differencing_order
+
+MODELS = ('persistence', 'regression', 'arima')
+
+REPORT_COLUMNS = ['Indicator', 'State', 'Source', 'model', 'points', 'train', 'test', 'order',
+                  'rmse', 'mae', 'mape', 'r2', 'seconds', 'status', 'error']
+
+
+def forecast_metrics(actual, predicted) -> dict:
+    """
+    Scores one step ahead forecasts against what was observed.
+    Args:
+        actual: the observed values.
+        predicted: the forecasts of them.
+    Returns:
+        a dictionary with the rmse, mae, mape (as a fraction, like sklearn's) and r2
+    """
+    actual = np.asarray(actual, dtype='float64')
+    errors = actual - np.asarray(predicted, dtype='float64')
+    total = np.sum((actual - actual.mean()) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mape = np.mean(np.abs(errors) / np.maximum(np.abs(actual), np.finfo('float64').eps))
+    return {'rmse': float(np.sqrt(np.mean(errors ** 2))), 'mae': float(np.mean(np.abs(errors))),
+            'mape': float(mape), 'r2': float(1 - np.sum(errors ** 2) / total) if total > 0 else np.nan}
+
+
+def persistence_predictions(values: np.ndarray, train_size: int) -> np.ndarray:
+    """
+    Walk forward forecasts of the persistence model, every value forecast as the one before it.
+    Args:
+        values: the values of the series, in period order.
+        train_size: the number of values before the first forecast.
+    Returns:
+        the forecasts of values[train_size:]
+    """
+    return np.asarray(values[train_size - 1:-1], dtype='float64')
+
+
+def regression_predictions(values: np.ndarray, train_size: int, lags: int = 1) -> np.ndarray:
+    """
+    Walk forward forecasts of a linear regression of every value on the lags before it,
+    refit on an expanding window at every step. The normal equations are updated with the
+    newest row instead of being worked out from the whole window again.
+    Args:
+        values: the values of the series, in period order.
+        train_size: the number of values before the first forecast.
+        lags: the number of earlier values each value is regressed on.
+    Returns:
+        the forecasts of values[train_size:]
+    """
+    values = np.asarray(values, dtype='float64')
+    # a row per value after the first lags, an intercept and the lags before it, the latest first
+    features = np.column_stack([np.ones(len(values) - lags)]
+                               + [values[lags - lag:len(values) - lag] for lag in range(1, lags + 1)])
+    targets = values[lags:]
+
+    train_rows = train_size - lags
+    gram = features[:train_rows].T @ features[:train_rows]
+    moments = features[:train_rows].T @ targets[:train_rows]
+    predictions = np.empty(len(values) - train_size)
+    for step, row in enumerate(range(train_rows, len(targets))):
+        # lstsq copes with a window too short or too flat for the lags to be told apart
+        coefficients = np.linalg.lstsq(gram, moments, rcond=None)[0]
+        predictions[step] = features[row] @ coefficients
+        gram += np.outer(features[row], features[row])
+        moments += features[row] * targets[row]
+    return predictions
+
+
+def arima_predictions(values: np.ndarray, train_size: int, order: tuple = None):
+    """
+    Walk forward forecasts of an ARIMA model. The order is found with arima_value_generator
+    on the training values only, the model is fit once and each observation is then added to
+    its state space with extend, so the model is never fit again from scratch.
+    Args:
+        values: the values of the series, in period order.
+        train_size: the number of values before the first forecast.
+        order: the (p, d, q) order, searched for when None.
+    Returns:
+        a (forecasts of values[train_size:], order) tuple
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    values = np.asarray(values, dtype='float64')
+    train = values[:train_size]
+    if order is None:
+        # at most two differences, like auto_arima, short windows run out of values past that
+        d, _ = differencing_order(train, max_d=2)
+        order = tuple(arima_value_generator(train, d=d, trace=False).get_params()['order'])
+
+    model_fit = ARIMA(train, order=order).fit()
+    predictions = np.empty(len(values) - train_size)
+    for step, observed in enumerate(values[train_size:]):
+        predictions[step] = model_fit.forecast(1)[0]
+        model_fit = model_fit.extend([observed])
+    return predictions, order
+
+
+def backtest_task(task: tuple) -> list:
+    """
+    Backtests the models on one series. Failures are reported in the rows instead of
+    raised so one series can't stop the whole backtest.
+    Args:
+        task: a (key, periods, values, train_ratio, models) tuple, see backtest.
+    Returns:
+        a list of dictionaries, a row of the report per model
+    """
+    key, periods, values, train_ratio, models = task
+    indicator, state, source, _ = key
+    # the series in period order with gaps filled by preceding values, like series_frame does
+    values = pd.Series(np.asarray(values, dtype='float64')[np.argsort(periods, kind='stable')]) \
+        .fillna(method='ffill').dropna().to_numpy()
+    train_size = int(len(values) * train_ratio)
+
+    rows = []
+    for model in models:
+        row = {'Indicator': indicator, 'State': state, 'Source': source, 'model': model,
+               'points': len(values), 'train': train_size, 'test': len(values) - train_size,
+               'order': None, 'seconds': 0.0, 'status': 'ok', 'error': None}
+        rows.append(row)
+        if len(values) < MIN_DATA_POINTS or not 2 <= train_size < len(values):
+            row.update(status='skipped', error=f'fewer than {MIN_DATA_POINTS} data points or no values to test')
+            continue
+
+        start = time.perf_counter()
+        try:
+            # keep the print outs and convergence warnings of the fits out of the backtest log
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                if model == 'persistence':
+                    predictions = persistence_predictions(values, train_size)
+                elif model == 'regression':
+                    predictions = regression_predictions(values, train_size)
+                elif model == 'arima':
+                    predictions, row['order'] = arima_predictions(values, train_size)
+                else:
+                    raise ValueError(f"model has to be one of {MODELS}, not {model!r}")
+            row.update(forecast_metrics(values[train_size:], predictions))
+        except Exception as error:
+            row.update(status='failed', error=f'{type(error).__name__}: {error}')
+        row['seconds'] = time.perf_counter() - start
+    return rows
+
+
+def backtest(dataframe: pd.DataFrame, train_ratio: float = 0.7, models: tuple = MODELS,
+             workers: int = None, chunksize: int = 4, **columns) -> pd.DataFrame:
+    """
+    Runs an expanding window walk forward backtest of every (indicator, state, source) series
+    in the table across a pool of processes. Each series is split at train_ratio and every
+    value after the split is forecast one step ahead from all the values before it.
+    e.g, backtest(load_sheet('data/msdat_data.xlsx', 'Sheet1'), models=('persistence', 'arima'))
+    Args:
+        dataframe: the dataframe to be backtested, e.g registry.table().
+        train_ratio: the share of each series used before the first forecast.
+        models: the models to backtest, from MODELS.
+        workers: number of worker processes, defaults to the number of cores.
+                 With 1 the series are backtested in this process.
+        chunksize: number of series sent to a worker at a time.
+        columns: column names passed on to series_tasks.
+    Returns:
+        a dataframe with a row per series and model, with its scores, timing and status
+    """
+    tasks = [(key, periods, values, train_ratio, tuple(models))
+             for key, periods, values, _ in series_tasks(dataframe, forecast_years=[], **columns)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        results = [backtest_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(backtest_task, tasks, chunksize=chunksize))
+    return pd.DataFrame([row for rows in results for row in rows], columns=REPORT_COLUMNS)
+
+
+if __name__ == "__main__":
+    from dashboards.data_loader import load_sheet
+
+    correlation_input_df = load_sheet("data/msdat_data.xlsx", "Sheet1")
+    start_time = time.perf_counter()
+    report_df = backtest(correlation_input_df)
+    print(f"Backtested {report_df['Indicator'].size} series and models in {time.perf_counter() - start_time:.2f}s")
+    print(report_df.groupby(['model', 'status']).size())
+    print(report_df[report_df['status'] == 'ok'].groupby('model')[['rmse', 'mae', 'mape', 'r2', 'seconds']].median())
+    report_df.to_csv("data/backtest.csv", index=False)
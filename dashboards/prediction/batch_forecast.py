@@ -0,0 +1,166 @@
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from dashboards.data_loader import frame_fingerprint
+from dashboards.prediction.predictive_model_functions import arima_forecast_years
+from dashboards.prediction.model_cache import ForecastModelCache
+from dashboards.prediction.stationarity import StationarityCache
+from dashboards.tensor_store import TensorStore
+
+# the fewest data points sheet_splitter accepts for a forecast
+MIN_DATA_POINTS = 15
+
+OUTPUT_COLUMNS = ['Indicator', 'Period', 'State', 'LGA', 'Source', 'Value']
+
+# model cache of the worker process, set up by init_worker
+_model_cache = None
+
+
+def init_worker(cache_dir: str, differencing_orders: dict = None):
+    """
+    Sets up the model cache of a worker process.
+    Args:
+        cache_dir: directory the file of ARIMA orders is kept in.
+        differencing_orders: the differencing order of every series, see StationarityCache.orders,
+                             so the worker's fits don't run the adfuller tests again.
+    """
+    global _model_cache
+    _model_cache = ForecastModelCache(cache_dir)
+    if differencing_orders:
+        _model_cache.stationarity.update(differencing_orders)
+
+
+def series_tasks(dataframe: pd.DataFrame, forecast_years: list, indicator_column: str = 'Indicator',
+                 state_column: str = 'State', source_column: str = 'Source',
+                 period_column: str = 'Period', values_column: str = 'Value') -> list:
+    """
+    Splits the table into one forecasting task per (indicator, state, source) series. Each series
+    has a value per period in period order, the mean of the rows of a period (e.g one per LGA),
+    read off the table's TensorStore like prediction_operation reads it, so both fit the same
+    series, at the level the pooled forecaster's series_matrix puts it at.
+    Args:
+        dataframe: the dataframe to be forecast, e.g registry.table().
+        forecast_years: the years to forecast for every series.
+        indicator_column: the name of the column with the indicators.
+        state_column: the name of the column with the states.
+        source_column: the name of the column with the data sources.
+        period_column: the column with time e.g years.
+        values_column: the column with the values to be used in prediction.
+    Returns:
+        a list of (key, periods, values, forecast_years) tuples
+    """
+    fingerprint = frame_fingerprint(dataframe)
+    store = TensorStore.of(dataframe, source=source_column, indicator=indicator_column, state=state_column,
+                           period=period_column, values=values_column)
+    periods = store.labels[period_column].to_numpy()
+    tasks = []
+    # in (indicator, state, source) order, like grouping the rows by them
+    for indicator, state, source in zip(*np.nonzero(store.has_row.any(axis=3).transpose(1, 2, 0))):
+        present = store.has_row[source, indicator, state]
+        key = (store.labels[indicator_column][indicator], store.labels[state_column][state],
+               store.labels[source_column][source], fingerprint)
+        tasks.append((key, periods[present], store.means((source, indicator, state))[present], list(forecast_years)))
+    return tasks
+
+
+def forecast_task(task: tuple) -> dict:
+    """
+    Forecasts one series, the same way prediction_operation does. Failures are
+    reported in the result instead of raised so one series can't stop the batch.
+    Args:
+        task: a (key, periods, values, forecast_years) tuple from series_tasks.
+    Returns:
+        a dictionary with the forecast rows and a report on the series
+    """
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = ForecastModelCache()
+
+    key, periods, values, forecast_years = task
+    indicator, state, source, _ = key
+    report = {'Indicator': indicator, 'State': state, 'Source': source,
+              'points': len(values), 'seconds': 0.0, 'status': 'ok', 'error': None}
+    rows = pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    start = time.perf_counter()
+    if len(values) < MIN_DATA_POINTS:
+        report.update(status='skipped', error=f'fewer than {MIN_DATA_POINTS} data points')
+        return {'rows': rows, 'report': report}
+    try:
+        # keep the print outs of auto_arima and the forecast out of the batch log
+        with contextlib.redirect_stdout(io.StringIO()):
+            series_df = pd.DataFrame({'Value': values},
+                                     index=pd.to_datetime(pd.Series(periods), format='%Y'))
+            # the model is fit on the series in period order, whatever order the rows were in
+            series_df = series_df.sort_index().fillna(method='ffill')
+            model_fit, last_year = _model_cache.get(key) or _model_cache.fit(key, series_df['Value'])
+            predicted_years, predicted_values = arima_forecast_years(model_fit=model_fit, last_year=last_year,
+                                                                     series_forecast=series_df['Value'],
+                                                                     years=forecast_years)
+            rows = pd.DataFrame({'Indicator': indicator, 'Period': predicted_years, 'State': state,
+                                 'LGA': 'All', 'Source': source, 'Value': predicted_values},
+                                columns=OUTPUT_COLUMNS)
+    except Exception as error:
+        report.update(status='failed', error=f'{type(error).__name__}: {error}')
+    report['seconds'] = time.perf_counter() - start
+    return {'rows': rows, 'report': report}
+
+
+def batch_forecast(dataframe: pd.DataFrame, forecast_years: list, workers: int = None,
+                   chunksize: int = 1, cache_dir: str = "data/.cache", **columns):
+    """
+    Forecasts every (indicator, state, source) series in the table across a pool of processes.
+    Args:
+        dataframe: the dataframe to be forecast, e.g registry.table().
+        forecast_years: the years to forecast for every series.
+        workers: number of worker processes, defaults to the number of cores.
+                 With 1 the series are forecast in this process.
+        chunksize: number of series sent to a worker at a time.
+        cache_dir: directory the file of ARIMA orders is kept in.
+        columns: column names passed on to series_tasks.
+    Returns:
+        a (forecasts, report) tuple of dataframes, the forecasts in the same
+        layout as the input sheet and a row per series with its timing and status
+    """
+    tasks = series_tasks(dataframe, forecast_years, **columns)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # the differencing order of every series that can be forecast is worked out once, here, and handed
+    # to every worker, so the stepwise search of each fit starts from it
+    stationarity = StationarityCache()
+    stationarity.analyse_tasks([task for task in tasks if len(task[2]) >= MIN_DATA_POINTS])
+    differencing_orders = stationarity.orders()
+
+    if workers == 1:
+        init_worker(cache_dir, differencing_orders)
+        results = [forecast_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(cache_dir, differencing_orders)) as executor:
+            results = list(executor.map(forecast_task, tasks, chunksize=chunksize))
+
+    forecasts = [result['rows'] for result in results if not result['rows'].empty]
+    if forecasts:
+        forecasts = pd.concat(forecasts, ignore_index=True)
+    else:
+        forecasts = pd.DataFrame(columns=OUTPUT_COLUMNS)
+    report = pd.DataFrame([result['report'] for result in results])
+    return forecasts, report
+
+
+if __name__ == "__main__":
+    from dashboards.data_loader import load_sheet
+
+    correlation_input_df = load_sheet("data/sample_data.xlsx", "Correlation Input Sheet")
+    start_time = time.perf_counter()
+    forecast_df, report_df = batch_forecast(correlation_input_df, forecast_years=list(range(2018, 2027)))
+    print(f"Forecast {len(report_df)} series in {time.perf_counter() - start_time:.2f}s")
+    print(report_df['status'].value_counts())
+    print(report_df[report_df['status'] == 'failed'])
+    forecast_df.to_csv("data/forecasts.csv", index=False)
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import pandas as pd
+from dashboards.data_loader import load_sheet
+from dashboards.prediction.pooled_forecast import PooledForecaster, fill_forward, lag_matrix, series_matrix
+
+
+def series_to_supervised(data: pd.Series, n_shift: int, dropnan: bool = True) -> pd.DataFrame:
+    """
+    Makes the lags of a series the way the forecasting notebook does, shifting and
+    joining a dataframe per lag.
+    Args:
+        data: a time series.
+        n_shift: the number of lags.
+        dropnan: drop the rows with NaN values.
+    Returns:
+        a dataframe with a column per lag and the values
+    """
+    df = pd.DataFrame(data)
+    cols = [df.shift(i) for i in range(1, n_shift + 1)]
+    names = [f"Value-{i}" for i in range(1, n_shift + 1)] + ["Value"]
+    final_supervised_data = pd.concat([pd.concat(cols, axis=1), data], axis=1)
+    final_supervised_data.columns = names
+    if dropnan:
+        final_supervised_data = final_supervised_data.dropna()
+    return final_supervised_data
+
+
+def per_series_fits(matrix: np.ndarray, lags: int) -> int:
+    """
+    Builds the lags and fits a linear regression for each series on its own, like the
+    notebook does for one series at a time.
+    Args:
+        matrix: a row per series and a column per year, see series_matrix.
+        lags: the number of lags.
+    Returns:
+        the number of series a model was fit for
+    """
+    fitted = 0
+    for row in matrix:
+        supervised = series_to_supervised(pd.Series(row), lags)
+        if len(supervised) > lags:
+            design = np.column_stack([np.ones(len(supervised)), supervised.iloc[:, :lags].to_numpy()])
+            np.linalg.lstsq(design, supervised['Value'].to_numpy(), rcond=None)
+            fitted += 1
+    return fitted
+
+
+def run(workbook_path: str = "data/msdat_data.xlsx", sheet_name: str = "Sheet1", lags: int = 3,
+        synthetic_series: int = 20000):
+    """
+    Times building the lag features of every series and fitting forecasters on them,
+    per series with shift and concat and at once with lag_matrix and PooledForecaster.
+    Args:
+        workbook_path: path to the excel workbook.
+        sheet_name: the sheet in the workbook to benchmark with.
+        lags: the number of lags.
+        synthetic_series: the number of random walks the pooled forecaster is also timed on.
+    Returns:
+        a dataframe of timings in seconds
+    """
+    dataframe = load_sheet(workbook_path, sheet_name)
+    keys, years, matrix = series_matrix(dataframe)
+    filled = fill_forward(matrix)
+    timings = {}
+
+    start = time.perf_counter()
+    for row in filled:
+        series_to_supervised(pd.Series(row), lags)
+    timings['series_to_supervised (per series)'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lag_matrix(filled, lags)
+    timings['lag_matrix (every series)'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fitted = per_series_fits(filled, lags)
+    timings[f'linear fit per series ({fitted} series)'] = time.perf_counter() - start
+
+    for model in ('linear', 'gradient_boosting'):
+        start = time.perf_counter()
+        PooledForecaster(keys, years, matrix, model=model, lags=lags).forecast(int(years.max()) + 10)
+        timings[f'PooledForecaster {model} ({len(keys)} series)'] = time.perf_counter() - start
+
+    # random walks with missing years, to see how the pooled fit grows with the number of series
+    rng = np.random.default_rng(0)
+    walks = np.cumsum(rng.normal(size=(synthetic_series, 40)), axis=1) + 100
+    walks[rng.random(walks.shape) < 0.1] = np.nan
+    walk_keys = pd.DataFrame({'Indicator': np.arange(synthetic_series).astype(str), 'State': 'All', 'Source': 'synthetic'})
+    start = time.perf_counter()
+    PooledForecaster(walk_keys, np.arange(1980, 2020), walks, model='linear', lags=lags).forecast(2030)
+    timings[f'PooledForecaster linear ({synthetic_series} synthetic series)'] = time.perf_counter() - start
+
+    return pd.DataFrame({'seconds': list(timings.values())}, index=list(timings))
+
+
+if __name__ == "__main__":
+    print(run())
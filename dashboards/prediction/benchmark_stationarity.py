@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.stattools import adfuller
+from dashboards.data_loader import load_sheet
+from dashboards.prediction.batch_forecast import series_tasks
+from dashboards.prediction.predictive_model_functions import differencer, is_stationary
+from dashboards.prediction.stationarity import StationarityCache
+
+
+def dataframe_differencing(dataframe: pd.DataFrame) -> list:
+    """
+    Works out the differencing order of every series the way prediction_operation used to,
+    running adfuller on a dataframe and adding a column to it for every difference.
+    The series are the ones StationarityCache.analyse_all tests, so the orders can be compared.
+    Args:
+        dataframe: the dataframe with the series.
+    Returns:
+        a list with the differencing order of each series, None where adfuller failed
+    """
+    orders = []
+    for _, periods, values, _ in series_tasks(dataframe, []):
+        series_df = pd.DataFrame({'Value': values}, index=pd.Index(periods, name='Period')).fillna(method='ffill')
+        try:
+            p_val = adfuller(series_df['Value'])[1]
+            d = 0
+            if not is_stationary(p_val):
+                differenced_df = pd.concat([item for item in differencer(series_df.copy(), 'Value', p_val)])
+                d = len(differenced_df.columns) - 1
+            orders.append(d)
+        except (ValueError, np.linalg.LinAlgError):
+            orders.append(None)
+    return orders
+
+
+def run(workbook_path: str = "data/msdat_data.xlsx", sheet_name: str = "Sheet1"):
+    """
+    Times working out the differencing order of every series in a sheet with
+    dataframe columns, with StationarityCache and with StationarityCache once it is filled.
+    Args:
+        workbook_path: path to the excel workbook.
+        sheet_name: the sheet in the workbook to benchmark with.
+    Returns:
+        a dataframe of timings in seconds
+    """
+    dataframe = load_sheet(workbook_path, sheet_name)
+
+    start = time.perf_counter()
+    dataframe_orders = dataframe_differencing(dataframe)
+    dataframe_time = time.perf_counter() - start
+
+    stationarity_cache = StationarityCache()
+    start = time.perf_counter()
+    table = stationarity_cache.analyse_all(dataframe)
+    first_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stationarity_cache.analyse_all(dataframe)
+    cached_time = time.perf_counter() - start
+
+    same_orders = [order == d for order, d in zip(dataframe_orders, table['d'].where(table['d'].notna(), None))]
+    print(f"{len(table)} series, {table['d'].notna().sum()} tested, "
+          f"differencing orders agree for {sum(same_orders)}")
+    return pd.DataFrame({'seconds': [dataframe_time, first_time, cached_time]},
+                        index=['dataframe differencer', 'StationarityCache', 'StationarityCache (cached)'])
+
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,77 @@
+import contextlib
+import tempfile
+
+from dashboards.prediction import operations
+from dashboards.benchmark_tools import main, SERIES
+from dashboards.prediction.forecast_store import ForecastStore
+from dashboards.prediction.model_cache import ForecastModelCache
+from dashboards.prediction.predictive_model_functions import filter_df
+
+BASELINE_PATH = "data/benchmarks/prediction_baseline.json"
+
+COLUMNS = {'indicator_column': 'Indicator', 'state_column': 'State', 'source_column': 'Source'}
+QUERY = {'indicator_query': SERIES[0], 'state_query': SERIES[1], 'source_query': SERIES[2]}
+FORECAST_YEARS = [2020, 2021, 2022, 2023, 2024]
+
+
+def filter_df_case(data_frame):
+    return lambda: filter_df(data_frame, **COLUMNS, **QUERY)
+
+
+def prediction_call(data_frame):
+    # __wrapped__ skips the result cache so every run does the work
+    return list(operations.prediction_operation.__wrapped__(
+        dataframe=data_frame, columns_to_drop=['Indicator', 'State', 'LGA', 'Source'],
+        period_column='Period', values_column='Value', forecast_years=FORECAST_YEARS,
+        **COLUMNS, **QUERY))
+
+
+@contextlib.contextmanager
+def swapped_caches(model_cache: ForecastModelCache, forecast_store: ForecastStore):
+    """
+    Makes prediction_operation use other caches while the with block runs, putting
+    the ones of the operations module back afterwards.
+    Args:
+        model_cache: the model cache to use.
+        forecast_store: the forecast store to use.
+    """
+    saved = operations.model_cache, operations.forecast_store
+    operations.model_cache, operations.forecast_store = model_cache, forecast_store
+    try:
+        yield
+    finally:
+        operations.model_cache, operations.forecast_store = saved
+
+
+def prediction_cold_case(data_frame):
+    def predict():
+        # a new model cache with no saved orders, so the series is searched for and fit every run
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                swapped_caches(ForecastModelCache(cache_dir), ForecastStore()):
+            prediction_call(data_frame)
+    return predict
+
+
+def prediction_warm_case(data_frame):
+    # the directory is removed once the case is done with and collected, or when the run ends
+    cache_dir = tempfile.TemporaryDirectory()
+    model_cache = ForecastModelCache(cache_dir.name)
+    with swapped_caches(model_cache, ForecastStore()):
+        prediction_call(data_frame)
+
+    def predict():
+        # the model is already fit, only the forecast and the rows for plotting are made
+        with swapped_caches(model_cache, ForecastStore()):
+            prediction_call(data_frame)
+    predict.cache_dir = cache_dir
+    return predict
+
+
+CASES = {
+    'filter_df': filter_df_case,
+    'prediction_operation (cold)': prediction_cold_case,
+    'prediction_operation (warm)': prediction_warm_case,
+}
+
+if __name__ == "__main__":
+    main(CASES, BASELINE_PATH)
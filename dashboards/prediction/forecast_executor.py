@@ -0,0 +1,180 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+# the job the current worker thread is running, so operations can report their progress
+_current_job = threading.local()
+
+
+def report_progress(stage: str, fraction: float = None):
+    """
+    Records how far the job running in this thread has got, does nothing outside a job.
+    e.g, report_progress('fitting the model', 0.3)
+    Args:
+        stage: a short description of what the job is doing.
+        fraction: how much of the job is done, from 0 to 1.
+    """
+    job = getattr(_current_job, 'job', None)
+    if job is not None:
+        job.stage = stage
+        if fraction is not None:
+            job.fraction = fraction
+
+
+class ForecastJob:
+    """A forecast submitted to a ForecastExecutor and the requests waiting for it."""
+
+    def __init__(self, job_id: int, key):
+        self.id = job_id
+        self.key = key
+        self.future = None
+        self.stage = 'queued'
+        self.fraction = 0.0
+        self.requests = 1
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+
+    @property
+    def state(self) -> str:
+        """'queued', 'running', 'cancelled', 'failed' or 'done'."""
+        if self.future.cancelled():
+            return 'cancelled'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def status(self) -> dict:
+        """Gives the state, stage, progress and seconds since it was submitted."""
+        end = self.finished if self.finished is not None else time.monotonic()
+        return {'id': self.id, 'state': self.state, 'stage': self.stage,
+                'progress': 1.0 if self.state == 'done' else self.fraction,
+                'elapsed': end - self.submitted}
+
+
+class ForecastExecutor:
+    """
+    Runs forecasts on a pool of worker threads so a long auto_arima search doesn't block
+    the thread serving a Dash request. Identical forecasts that are already queued or
+    running are shared instead of being submitted again, and a request can give up a job
+    it no longer wants, e.g when the slider was moved, which cancels it if nobody else
+    is waiting for it and it hasn't started. Threads are used rather than processes so
+    the jobs share the model cache and forecast store of the app.
+    """
+
+    def __init__(self, max_workers: int = 4, max_age: float = 10 * 60):
+        """
+        Args:
+            max_workers: the most forecasts run at once.
+            max_age: seconds a finished job is kept for if its result is never fetched.
+        """
+        self.max_age = max_age
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast')
+        self._jobs = {}
+        self._in_flight = {}
+        self._ids = itertools.count(1)
+        # cancelling a future runs its done callback, which takes the lock, in the same thread
+        self._lock = threading.RLock()
+
+    def submit(self, key, func, *args, supersedes: int = None, **kwargs) -> int:
+        """
+        Submits a forecast, or joins the identical one already in flight.
+        Args:
+            key: hashable key that is the same for identical forecasts, e.g the callback inputs.
+            func: the function doing the forecast.
+            args: positional arguments for func.
+            supersedes: id of a job the caller no longer wants.
+            kwargs: keyword arguments for func.
+        Returns:
+            the id of the job
+        """
+        with self._lock:
+            self._prune()
+            if supersedes is not None:
+                self._release(supersedes)
+            job = self._in_flight.get(key)
+            if job is not None:
+                job.requests += 1
+                return job.id
+            job = ForecastJob(next(self._ids), key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            job.future = self._pool.submit(self._run, job, func, args, kwargs)
+        job.future.add_done_callback(lambda future: self._finish(job))
+        return job.id
+
+    @staticmethod
+    def _run(job: ForecastJob, func, args, kwargs):
+        job.started = time.monotonic()
+        job.stage = 'running'
+        _current_job.job = job
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_job.job = None
+
+    def _finish(self, job: ForecastJob):
+        with self._lock:
+            job.finished = time.monotonic()
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    def _release(self, job_id: int):
+        """Takes a request off a job, cancelling the job if it was the last one and it hasn't started."""
+        job = self._jobs.get(job_id)
+        if job is None or job.future.done():
+            return
+        job.requests -= 1
+        if job.requests <= 0 and job.future.cancel():
+            self._jobs.pop(job_id, None)
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    def _prune(self):
+        """Forgets finished jobs older than max_age whose results were never fetched."""
+        now = time.monotonic()
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and now - job.finished > self.max_age]:
+            del self._jobs[job_id]
+
+    def cancel(self, job_id: int):
+        """Gives up a job, see submit."""
+        with self._lock:
+            self._release(job_id)
+
+    def status(self, job_id: int) -> dict:
+        """
+        Gives the status of a job, see ForecastJob.status.
+        Args:
+            job_id: the id submit gave.
+        Returns:
+            a dictionary, with the state 'unknown' for a job that was cancelled or forgotten
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return {'id': job_id, 'state': 'unknown', 'stage': None, 'progress': 0.0, 'elapsed': 0.0}
+        return job.status()
+
+    def result(self, job_id: int, timeout: float = None):
+        """
+        Gives the result of a job, waiting for it when it hasn't finished, and forgets the job.
+        Args:
+            job_id: the id submit gave.
+            timeout: the most seconds to wait.
+        Returns:
+            what func returned, raising what it raised
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise CancelledError(f"job {job_id} was cancelled or has been forgotten")
+        result = job.future.result(timeout=timeout)
+        with self._lock:
+            job.requests -= 1
+            if job.requests <= 0:
+                self._jobs.pop(job_id, None)
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker threads, cancelling the jobs that haven't started."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,144 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class SeriesBuffer:
+    """
+    Growable year and value arrays holding the forecasts of one series.
+    The arrays double in size when they fill up so appending a year doesn't
+    copy everything that was forecast before it.
+    """
+
+    def __init__(self, capacity: int = 8):
+        self.years = np.empty(capacity, dtype='int64')
+        self.values = np.empty(capacity, dtype='float64')
+        self.size = 0
+
+    def append(self, years, values):
+        """
+        Adds forecasts to the end of the buffer.
+        Args:
+            years: the years that were forecast.
+            values: the forecast value of each year.
+        """
+        years = np.asarray(years, dtype='int64')
+        values = np.asarray(values, dtype='float64')
+        needed = self.size + len(years)
+        if needed > len(self.years):
+            capacity = max(needed, 2 * len(self.years))
+            self.years = np.resize(self.years, capacity)
+            self.values = np.resize(self.values, capacity)
+        self.years[self.size:needed] = years
+        self.values[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        """Gives (years, values) views of the filled part of the buffer."""
+        return self.years[:self.size], self.values[:self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return self.years.nbytes + self.values.nbytes
+
+
+class ForecastStore:
+    """
+    Holds the forecasts of every series apart from the sheet they were made from,
+    so forecasting never grows or changes the loaded sheet. The forecasts are
+    only joined with the history of a series when rows for plotting are asked for.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def append(self, key: tuple, years, values):
+        """
+        Stores forecasts of a series, years that are already stored are left as they are.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            years: the years that were forecast.
+            values: the forecast value of each year.
+        """
+        with self._lock:
+            buffer = self._series.setdefault(key, SeriesBuffer())
+            stored_years, _ = buffer.view()
+            new = ~np.isin(np.asarray(years, dtype='int64'), stored_years)
+            if new.any():
+                buffer.append(np.asarray(years)[new], np.asarray(values)[new])
+
+    def missing_years(self, key: tuple, years: list) -> list:
+        """
+        Gives the years that haven't been forecast for a series yet.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            years: the years wanted.
+        Returns:
+            a list of years
+        """
+        # append can swap the buffer's arrays for bigger ones from another thread
+        with self._lock:
+            buffer = self._series.get(key)
+            if buffer is None:
+                return list(years)
+            stored_years = set(buffer.view()[0].tolist())
+        return [year for year in years if year not in stored_years]
+
+    def predictions(self, key: tuple, years: list = None):
+        """
+        Gives the stored forecasts of a series.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            years: the years wanted, all the stored years when None.
+        Returns:
+            a (years, values) tuple of arrays in the order the years were forecast
+        """
+        with self._lock:
+            buffer = self._series.get(key)
+            if buffer is None:
+                return np.empty(0, dtype='int64'), np.empty(0, dtype='float64')
+            stored_years, values = buffer.view()
+            if years is None:
+                return stored_years.copy(), values.copy()
+            wanted = np.isin(stored_years, np.asarray(list(years), dtype='int64'))
+            return stored_years[wanted], values[wanted]
+
+    def rows(self, key: tuple, years: list = None, indicator_column: str = 'Indicator',
+             period_column: str = 'Period', state_column: str = 'State', lga_column: str = 'LGA',
+             source_column: str = 'Source', values_column: str = 'Value') -> pd.DataFrame:
+        """
+        Gives the stored forecasts of a series as rows laid out like the input sheet,
+        ready to be put after the rows of its history.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            years: the years wanted, all the stored years when None.
+            indicator_column: the name of the column with the indicators.
+            period_column: the column with time e.g years.
+            state_column: the name of the column with the states.
+            lga_column: the name of the column with the LGAs, forecasts are for 'All' of them.
+            source_column: the name of the column with the data sources.
+            values_column: the column with the forecast values.
+        Returns:
+            a dataframe
+        """
+        indicator, state, source = key[:3]
+        forecast_years, values = self.predictions(key, years)
+        return pd.DataFrame({indicator_column: indicator, period_column: forecast_years,
+                             state_column: state, lga_column: 'All',
+                             source_column: source, values_column: values})
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the stored forecasts."""
+        with self._lock:
+            return sum(buffer.nbytes for buffer in self._series.values())
+
+    def __len__(self):
+        return len(self._series)
+
+    def clear(self, *args):
+        """Drops the stored forecasts, e.g when the sheet they were made from is reloaded."""
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,136 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboards.metrics import metrics
+from dashboards.prediction.predictive_model_functions import arima_value_generator
+from dashboards.prediction.stationarity import StationarityCache
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: str):
+    """
+    Holds an exclusive lock on a file while the with block runs, so processes, e.g the
+    workers of batch_forecast and backtest, take turns at a read, merge and write.
+    Args:
+        lock_path: path of the lock file, made when it doesn't exist.
+    """
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class ForecastModelCache:
+    """
+    Keeps a fitted ARIMA model per series so a forecast only has to be fit once.
+    The orders found by auto_arima are also saved to disk so other workers, and
+    the app after a restart, can skip the stepwise search.
+    """
+
+    def __init__(self, cache_dir: str = "data/.cache"):
+        """
+        Args:
+            cache_dir: directory the file of ARIMA orders is kept in.
+        """
+        self.orders_path = os.path.join(cache_dir, "arima_orders.json")
+        self._models = {}
+        self._lock = threading.Lock()
+        self.stationarity = StationarityCache()
+        self._orders = self.read_orders()
+
+    @staticmethod
+    def series_key(key: tuple) -> str:
+        """Turns a (indicator, state, source, fingerprint) key into the string it is saved under."""
+        return "|".join(str(item) for item in key)
+
+    def read_orders(self) -> dict:
+        """Reads the ARIMA orders saved to disk."""
+        try:
+            with open(self.orders_path) as orders_file:
+                return json.load(orders_file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_order(self, key: tuple, order: tuple):
+        """
+        Saves an ARIMA order to disk along with the orders other workers have saved.
+        The file is read and replaced under a lock shared by every process, so orders
+        saved by two workers at the same time are both kept.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            order: the (p, d, q) order found for the series.
+        """
+        with self._lock, file_lock(self.orders_path + ".lock"):
+            self._orders = {**self._orders, **self.read_orders(), self.series_key(key): list(order)}
+            # write to a temporary file and rename it so readers never see a half written file
+            file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.orders_path))
+            with os.fdopen(file_descriptor, "w") as orders_file:
+                json.dump(self._orders, orders_file)
+            os.replace(temp_path, self.orders_path)
+
+    def get(self, key: tuple):
+        """
+        Looks up the fitted model of a series.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+        Returns:
+            a (model_fit, last_year) tuple or None if the series hasn't been fit yet
+        """
+        return self._models.get(key)
+
+    @metrics.timed()
+    def fit(self, key: tuple, series_forecast: pd.Series):
+        """
+        Fits an ARIMA model to a series, using the saved order when there is one.
+        Otherwise the series is differenced until it is stationary and the
+        differencing order is handed to the auto_arima stepwise search.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            series_forecast: the column to be used for forecasting, indexed by datetime.
+        Returns:
+            a (model_fit, last_year) tuple
+        """
+        order = self._orders.get(self.series_key(key))
+        if order is None:
+            d, _ = self.stationarity.analyse(key, series_forecast.to_numpy())
+            # the model is fit on the rows that are left once the series has been differenced
+            series_forecast = series_forecast.iloc[d:]
+            order = arima_value_generator(series_forecast, d=d).get_params()['order']
+            self.save_order(key, order)
+        else:
+            series_forecast = series_forecast.iloc[order[1]:]
+
+        history = series_forecast.values.astype('float32')
+
+        # statsmodels is imported on the first fit instead of when the dashboard starts
+        from statsmodels.tsa.arima.model import ARIMA
+        model_fit = ARIMA(history, order=tuple(order)).fit()
+        entry = (model_fit, int(np.max(series_forecast.index.year)))
+        with self._lock:
+            self._models[key] = entry
+        return entry
+
+    def clear(self, *args):
+        """Drops the fitted models, e.g when the sheet they were fit on is reloaded."""
+        with self._lock:
+            self._models.clear()
+        self.stationarity.clear()
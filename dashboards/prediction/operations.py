@@ -0,0 +1,145 @@
+import pandas as pd
+from dashboards.prediction.predictive_model_functions import arima_forecast_years, can_be_forecast, series_frame
+from dashboards.data_loader import add_reload_listener, frame_fingerprint
+from dashboards.prediction.model_cache import ForecastModelCache
+from dashboards.prediction.forecast_store import ForecastStore
+from dashboards.prediction.forecast_executor import ForecastExecutor, report_progress
+from dashboards.prediction.pooled_forecast import PooledForecaster
+from dashboards.metrics import metrics
+from dashboards.registry import registry
+from dashboards.tensor_store import TensorStore
+
+# the table is loaded by the registry on first use, once per process, and shared with the other views
+# forecasts and figures for dropdown and slider combinations that were already asked for
+result_cache = registry.result_cache
+figure_cache = registry.figure_cache
+
+# fitted ARIMA models, one per (indicator, state, source) series
+model_cache = ForecastModelCache("data/.cache")
+add_reload_listener(model_cache.clear)
+
+# forecasts made so far, kept apart from the table
+forecast_store = ForecastStore()
+add_reload_listener(forecast_store.clear)
+
+# forecasts asked for by the dashboard run here, off the threads serving requests
+forecast_executor = ForecastExecutor(max_workers=4)
+
+
+@result_cache.memoize
+@metrics.timed()
+def pooled_forecaster(dataframe: pd.DataFrame, model: str, indicator_column: str = 'Indicator',
+                      state_column: str = 'State', source_column: str = 'Source',
+                      period_column: str = 'Period', values_column: str = 'Value') -> PooledForecaster:
+    """
+    Fits one regression on every series of the table, the first time a series of it is
+    forecast with the model, see PooledForecaster.
+    Args:
+        dataframe: the dataframe with every series.
+        model: the regressor, one of pooled_forecast.MODELS.
+        indicator_column: the name of the column with the indicators.
+        state_column: the name of the column with the states.
+        source_column: the name of the column with the data sources.
+        period_column: the column with the years.
+        values_column: the column with the values.
+    Returns:
+        a PooledForecaster
+    """
+    return PooledForecaster.from_table(dataframe, model=model,
+                                       columns={'indicator_column': indicator_column, 'state_column': state_column,
+                                                'source_column': source_column, 'period_column': period_column,
+                                                'values_column': values_column})
+
+
+@result_cache.memoize
+@metrics.timed()
+def prediction_operation(dataframe: pd.DataFrame, indicator_column: str,
+                         indicator_query: str, state_column: str, state_query: str,
+                         source_column: str, source_query: str, columns_to_drop: list,
+                         period_column: str, values_column: str, forecast_years: list,
+                         model: str = 'arima'):
+    """
+    Args:
+         dataframe: the dataframe to be worked on.
+         indicator_column: the name of the column with the indicators.
+         indicator_query: the indicator to filter the indicator_column by.
+         state_column: the name of the column with the states.
+         state_query: the state to filter the state_column by.
+         source_column: the name of the column with the data sources.
+         source_query: the source to filter the source_column by.
+         columns_to_drop: list of columns to be dropped for the operation to work.
+         period_column: the column with time e.g years, months.
+         values_column: the column with the values to be used in prediction.
+         forecast_years: the list of the years you want a forecast for
+         model: 'arima' to fit a model to the series, or a model from pooled_forecast.MODELS
+                to read the forecast off one regression fit on every series of the table.
+
+    Returns:
+        a generator
+    """
+    # read the series off the table's tensor instead of filtering the rows, then get it ready for forecasting
+    store = TensorStore.of(dataframe, source=source_column, indicator=indicator_column, state=state_column,
+                           period=period_column, values=values_column)
+    with metrics.timer('prediction_operation.filter') as timer:
+        series_df = timer.observe(store.series_rows(source_query, indicator_query, state_query))
+    # checks if the series could be found and is long enough
+    if not can_be_forecast(len(series_df), indicator_column, indicator_query, state_column, state_query,
+                           source_column, source_query):
+        return
+    correlation_df = series_frame(series_df, columns_to_drop, period_column)
+
+    # the series is fit once and every forecast year is read off the same model,
+    # the forecasts are kept in the forecast store so the sheet is never changed
+    model_key = (indicator_query, state_query, source_query, frame_fingerprint(dataframe))
+    if model != 'arima':
+        model_key += (model,)
+    # years up to the last one of the series are history, they are never forecast or stored
+    last_year = int(series_df[period_column].max())
+    missing_years = forecast_store.missing_years(model_key, [year for year in forecast_years if year > last_year])
+    if missing_years and model != 'arima':
+        report_progress('fitting the model', 0.2)
+        forecaster = pooled_forecaster(dataframe, model, indicator_column=indicator_column,
+                                       state_column=state_column, source_column=source_column,
+                                       period_column=period_column, values_column=values_column)
+        report_progress('forecasting', 0.8)
+        with metrics.timer('prediction_operation.forecast'):
+            predicted_years, predicted_values = forecaster.forecast_series(model_key, missing_years)
+        forecast_store.append(model_key, predicted_years, predicted_values)
+    elif missing_years:
+        cached_model = model_cache.get(model_key)
+        if cached_model is None:
+            report_progress('fitting the model', 0.2)
+            cached_model = model_cache.fit(model_key, correlation_df[values_column])
+        model_fit, model_last_year = cached_model
+
+        report_progress('forecasting', 0.8)
+
+        with metrics.timer('prediction_operation.forecast'):
+            predicted_years, predicted_values = arima_forecast_years(model_fit=model_fit, last_year=model_last_year,
+                                                                     series_forecast=correlation_df[values_column],
+                                                                     years=missing_years)
+        forecast_store.append(model_key, predicted_years, predicted_values)
+
+    # put the forecasts after the rows of the series and drop useless columns from them
+    forecast_rows = forecast_store.rows(model_key, forecast_years, indicator_column=indicator_column,
+                                        period_column=period_column, state_column=state_column,
+                                        source_column=source_column, values_column=values_column)
+    final_filtered_df = series_frame(pd.concat([series_df, forecast_rows], ignore_index=True),
+                                     columns_to_drop, period_column)
+
+    yield final_filtered_df
+
+
+if __name__ == "__main__":
+    for forecast_df in prediction_operation(dataframe=registry.table(),
+                                            indicator_column='Indicator',
+                                            indicator_query='Infant Mortality rate',
+                                            state_column='State',
+                                            state_query='Abia',
+                                            source_column='Source',
+                                            source_query='NHIS',
+                                            columns_to_drop=['Indicator', 'State', 'LGA', 'Source'],
+                                            period_column='Period',
+                                            values_column='Value',
+                                            forecast_years=[2017, 2018]):
+        print(forecast_df.tail())
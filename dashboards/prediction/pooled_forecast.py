@@ -0,0 +1,279 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+MODELS = ('linear', 'gradient_boosting', 'xgboost')
+
+
+def series_matrix(dataframe: pd.DataFrame, indicator_column: str = 'Indicator', state_column: str = 'State',
+                  source_column: str = 'Source', period_column: str = 'Period', values_column: str = 'Value'):
+    """
+    Lays every (indicator, state, source) series of the table out as a row of one 2d array,
+    with a column per year from the first year in the table to the last. Values of a year
+    with several rows, e.g one per LGA, are averaged and years without a value are NaN.
+    Args:
+        dataframe: the long format table, e.g registry.table().
+        indicator_column: the name of the column with the indicators.
+        state_column: the name of the column with the states.
+        source_column: the name of the column with the data sources.
+        period_column: the column with the years.
+        values_column: the column with the values.
+    Returns:
+        a (keys, years, matrix) tuple, keys being a dataframe with the indicator, state and
+        source of each row of the matrix and years the year of each column
+    """
+    grouped = dataframe.groupby([indicator_column, state_column, source_column], observed=True, sort=True)
+    series = grouped.ngroup().to_numpy()
+    keys = grouped.size().index.to_frame(index=False)
+
+    periods = dataframe[period_column].to_numpy().astype('int64')
+    years = np.arange(periods.min(), periods.max() + 1) if len(periods) else np.empty(0, dtype='int64')
+    cells = series * len(years) + (periods - years[0] if len(years) else periods)
+
+    values = dataframe[values_column].to_numpy(dtype='float64')
+    present = ~np.isnan(values)
+    size = len(keys) * len(years)
+    sums = np.bincount(cells[present], weights=values[present], minlength=size)
+    counts = np.bincount(cells[present], minlength=size)
+    with np.errstate(invalid='ignore'):
+        matrix = (sums / counts).reshape(len(keys), len(years))
+    return keys, years, matrix
+
+
+def last_observed(matrix: np.ndarray) -> np.ndarray:
+    """The column of the last value of each row, -1 for rows without any."""
+    present = ~np.isnan(matrix)
+    last = matrix.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    return np.where(present.any(axis=1), last, -1)
+
+
+def fill_forward(matrix: np.ndarray) -> np.ndarray:
+    """
+    Fills the gaps in every row with the value before them, like fillna(method='ffill')
+    on each series, but only up to the last value of a row so its future stays NaN.
+    Args:
+        matrix: a 2d array, a row per series.
+    Returns:
+        a new array
+    """
+    present = ~np.isnan(matrix)
+    columns = np.arange(matrix.shape[1])
+    # the column of the latest value at or before each cell
+    source = np.maximum.accumulate(np.where(present, columns, 0), axis=1)
+    filled = np.take_along_axis(matrix, source, axis=1)
+    filled[columns > last_observed(matrix)[:, None]] = np.nan
+    return filled
+
+
+def lag_matrix(matrix: np.ndarray, lags: int):
+    """
+    Builds the lag features of every series at once from views of a padded 2d array,
+    instead of shifting and joining a dataframe per series like series_to_supervised.
+    Args:
+        matrix: a 2d array, a row per series and a column per period, NaN where missing.
+        lags: the number of earlier values each value is predicted from.
+    Returns:
+        a (features, targets, rows, columns) tuple for the windows with no missing values,
+        features having the lags of each target with the latest first, and rows and
+        columns locating each target in matrix
+    """
+    if matrix.shape[1] <= lags:
+        return np.empty((0, lags)), np.empty(0), np.empty(0, dtype='int64'), np.empty(0, dtype='int64')
+    # every window of lags + 1 periods of every series, without copying the matrix
+    windows = sliding_window_view(matrix, lags + 1, axis=1)
+    complete = ~np.isnan(windows).any(axis=2)
+    rows, starts = np.nonzero(complete)
+    chosen = windows[rows, starts]
+    return chosen[:, -2::-1], chosen[:, -1], rows, starts + lags
+
+
+def series_scales(matrix: np.ndarray) -> np.ndarray:
+    """
+    The mean absolute value of each series, so series measured on different scales,
+    e.g percentages and rates per 100,000, can be learnt from together.
+    Args:
+        matrix: a 2d array, a row per series, NaN where missing.
+    Returns:
+        an array with the scale of each row, 1 for rows without a value or only zeros
+    """
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=1)
+    sums = np.where(present, np.abs(matrix), 0.0).sum(axis=1)
+    scales = np.divide(sums, counts, out=np.ones(len(matrix)), where=counts > 0)
+    return np.where(scales > 0, scales, 1.0)
+
+
+def make_regressor(model: str, **params):
+    """
+    Makes the regressor a PooledForecaster fits, importing the library it comes from.
+    Args:
+        model: one of MODELS.
+        params: keyword arguments for the regressor.
+    Returns:
+        an object with fit(features, targets) and predict(features)
+    """
+    if model == 'linear':
+        return LeastSquares()
+    if model == 'gradient_boosting':
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        return HistGradientBoostingRegressor(**params)
+    if model == 'xgboost':
+        from xgboost import XGBRegressor
+        return XGBRegressor(objective='reg:squarederror', **params)
+    raise ValueError(f"model has to be one of {MODELS}, not {model!r}")
+
+
+class LeastSquares:
+    """A linear regression with an intercept, fit with numpy so it needs no other library."""
+
+    def __init__(self):
+        self.coefficients = None
+
+    @staticmethod
+    def design(features: np.ndarray) -> np.ndarray:
+        return np.column_stack([np.ones(len(features)), features])
+
+    def fit(self, features: np.ndarray, targets: np.ndarray):
+        self.coefficients = np.linalg.lstsq(self.design(features), targets, rcond=None)[0]
+        return self
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.design(features) @ self.coefficients
+
+
+class PooledForecaster:
+    """
+    One regression fit on the lags of every (indicator, state, source) series at once,
+    forecasting all of them together, as an alternative to fitting an ARIMA model per
+    series. Each series is divided by its scale so they can share a model, and years
+    further ahead are forecast from the forecasts of the years before them.
+    e.g, PooledForecaster.from_table(registry.table(), model='linear').forecast_table([2025])
+    """
+
+    def __init__(self, keys: pd.DataFrame, years: np.ndarray, matrix: np.ndarray,
+                 model: str = 'linear', lags: int = 3, **params):
+        """
+        Args:
+            keys: the indicator, state and source of each row of matrix, see series_matrix.
+            years: the year of each column of matrix.
+            matrix: a row per series and a column per year, NaN where missing.
+            model: the regressor, one of MODELS.
+            lags: the number of earlier years each year is predicted from.
+            params: keyword arguments for the regressor.
+        """
+        self.keys = keys
+        self.years = np.asarray(years, dtype='int64')
+        self.model = model
+        self.lags = lags
+        self.scales = series_scales(matrix)
+        self.last = last_observed(matrix)
+        # the history of every series, divided by its scale, with gaps filled
+        self.history = fill_forward(matrix) / self.scales[:, None]
+        self._rows = {tuple(key): row for row, key in enumerate(keys.itertuples(index=False, name=None))}
+        self._forecasts = self.history
+        # the columns of _forecasts every series has been forecast up to
+        self._forecast_columns = 0
+        self._lock = threading.Lock()
+
+        features, targets, _, _ = lag_matrix(self.history, lags)
+        self.regressor = make_regressor(model, **params)
+        if len(targets):
+            self.regressor.fit(features, targets)
+        self.training_rows = len(targets)
+
+    @classmethod
+    def from_table(cls, dataframe: pd.DataFrame, model: str = 'linear', lags: int = 3,
+                   columns: dict = None, **params):
+        """
+        Fits a forecaster on every series of a long format table.
+        Args:
+            dataframe: the table, e.g registry.table().
+            model: the regressor, one of MODELS.
+            lags: the number of earlier years each year is predicted from.
+            columns: column names passed on to series_matrix, e.g {'values_column': 'Value'}.
+            params: keyword arguments for the regressor.
+        Returns:
+            a PooledForecaster
+        """
+        keys, years, matrix = series_matrix(dataframe, **(columns or {}))
+        return cls(keys, years, matrix, model=model, lags=lags, **params)
+
+    def forecast(self, until_year: int) -> np.ndarray:
+        """
+        Forecasts every series from the year after its last value up to a year, one
+        predict call per year for all the series that need it.
+        Args:
+            until_year: the last year to forecast.
+        Returns:
+            a 2d array like the history, with a column per year up to until_year and
+            the forecasts after the last value of each series, in the units of the table
+        """
+        with self._lock:
+            width = max(until_year - self.years[0] + 1, self._forecasts.shape[1]) if len(self.years) else 0
+            if self.training_rows and width > self._forecast_columns:
+                forecasts = np.hstack([self._forecasts,
+                                       np.full((len(self._forecasts), width - self._forecasts.shape[1]), np.nan)])
+                for column in range(max(self.lags, self._forecast_columns), width):
+                    # the lags of every series with the latest first, observed or already forecast
+                    features = forecasts[:, column - self.lags:column][:, ::-1]
+                    ready = (column > self.last) & ~np.isnan(features).any(axis=1)
+                    if ready.any():
+                        forecasts[ready, column] = self.regressor.predict(features[ready])
+                self._forecasts = forecasts
+                self._forecast_columns = width
+            return self._forecasts * self.scales[:, None]
+
+    def forecast_series(self, key: tuple, years: list):
+        """
+        Gives the forecasts of one series, like arima_forecast_years does for an ARIMA model.
+        Args:
+            key: the (indicator, state, source) of the series.
+            years: the years wanted, years up to the last value of the series are left out.
+        Returns:
+            a (years, values) tuple of arrays
+        """
+        row = self._rows.get(tuple(key[:3]))
+        if row is None or not years:
+            return np.empty(0, dtype='int64'), np.empty(0, dtype='float64')
+        last_year = self.years[0] + self.last[row]
+        years = np.array(sorted(year for year in set(years) if year > last_year), dtype='int64')
+        if not len(years):
+            return years, np.empty(0, dtype='float64')
+        values = self.forecast(int(years.max()))[row, years - self.years[0]]
+        found = ~np.isnan(values)
+        return years[found], values[found]
+
+    def forecast_table(self, years: list, indicator_column: str = 'Indicator', period_column: str = 'Period',
+                       state_column: str = 'State', lga_column: str = 'LGA', source_column: str = 'Source',
+                       values_column: str = 'Value') -> pd.DataFrame:
+        """
+        Forecasts every series for some years in one go, like batch_forecast does one model at a time.
+        Args:
+            years: the years wanted, years up to the last value of a series are left out for it.
+            indicator_column: the name of the column with the indicators.
+            period_column: the column with time e.g years.
+            state_column: the name of the column with the states.
+            lga_column: the name of the column with the LGAs, forecasts are for 'All' of them.
+            source_column: the name of the column with the data sources.
+            values_column: the column with the forecast values.
+        Returns:
+            a dataframe laid out like the input sheet
+        """
+        years = np.array(sorted(set(years)), dtype='int64')
+        columns = [indicator_column, period_column, state_column, lga_column, source_column, values_column]
+        if not len(years) or not len(self.keys):
+            return pd.DataFrame(columns=columns)
+        values = self.forecast(int(years.max()))
+        inside = years >= self.years[0]
+        grid = np.full((len(self.keys), len(years)), np.nan)
+        grid[:, inside] = values[:, years[inside] - self.years[0]]
+        # only the years after the last value of each series are forecasts
+        grid[years[None, :] <= (self.years[0] + self.last)[:, None]] = np.nan
+        rows, positions = np.nonzero(~np.isnan(grid))
+        keys = self.keys.iloc[rows]
+        return pd.DataFrame({indicator_column: keys.iloc[:, 0].to_numpy(), period_column: years[positions],
+                             state_column: keys.iloc[:, 1].to_numpy(), lga_column: 'All',
+                             source_column: keys.iloc[:, 2].to_numpy(), values_column: grid[rows, positions]},
+                            columns=columns)
@@ -0,0 +1,336 @@
+import numpy as np
+import pandas as pd
+from dashboards.metrics import metrics
+
+
+def is_stationary(p_val):
+    """
+    checks if the p_value to determine if the data is stationary.
+    Args:
+        p_val: the p_value to be checked.
+    Returns:
+        boolean
+
+    """
+    if p_val > 0.05:
+        return False
+    else:
+        return True
+
+
+@metrics.timed()
+def differencer(df, values_column, p_val):
+    """
+    Differences the data until it becomes stationary.
+    Args:
+        df: the dataframe to be differenced.
+        values_column: the column that has the initial values used for the adfuller test
+        p_val: the p_value gotten from the first adfuller test
+
+    """
+    differencing_num = 0
+
+    # run while the data is not stationary
+    while not is_stationary(p_val):
+        differencing_num += 1
+
+        # Moving the data by first difference.
+        if differencing_num < 2:
+            df[f'{differencing_num}difference'] = df[values_column] - df[values_column].shift(1)
+
+        # Move the data by any other difference
+        else:
+            df[f'{differencing_num}difference'] = df[f'{differencing_num - 1}difference'] - df[
+                f'{differencing_num - 1}difference'].shift(1)
+            # print(f"completed shift {differencing_num}")
+
+        from statsmodels.tsa.stattools import adfuller
+        p_val = adfuller(df[f'{differencing_num}difference'].dropna())[1]
+
+        # check if data has now become stationary
+        if is_stationary(p_val):
+            yield df
+
+
+@metrics.timed()
+def arima_value_generator(values: pd.Series,
+                        #   start_p, start_q, max_p, max_q,
+                        # m=12, start_P=0, seasonal=False, D=None,
+                          d=None,
+                          trace=True,
+                          error_action='ignore', suppress_warnings=True,
+                          stepwise=True):
+    """
+    A function that makes a forecast using a auto_arima to get the best
+    p, d and q values to use in the ARIMA model
+    Args:
+        values: Column to be used for prediction
+        start_p: starting autoregressor
+        start_q: starting moving average
+        max_p: max autoregressor
+        max_q: max moving average
+        m:
+        d: differencing term-int, found by the search when None
+        start_P:
+        seasonal: if data is seasonal
+        D:
+        trace:
+        error_action:
+        suppress_warnings:
+        stepwise:
+
+    """
+    # pmdarima takes seconds to import, so it's only imported once a model is fit
+    from pmdarima import auto_arima
+    stepwise_fit = auto_arima(values,
+                              d=d,
+                              trace=trace,
+                              error_action=error_action,
+                              suppress_warnings=suppress_warnings,
+                              stepwise=stepwise)
+    return stepwise_fit
+
+
+def arima_forecast_years(model_fit, last_year, series_forecast, years):
+    """
+    A function that forecasts several years with one call to an already fitted ARIMA model
+    Args:
+        model_fit: fitted ARIMA model whose history ends at last_year
+        last_year: the last year of the history the model was fit on
+        series_forecast: the column used for forecasting-pandas.Series, to check
+                         which years already have values
+        years: years being forecast
+    Returns:
+        a (years, values) tuple of arrays with the forecast of each year that
+        doesn't have a value yet, for a ForecastStore or to build rows from
+    """
+    existing_years = series_forecast.index.year
+    years = [year for year in years if year > last_year]
+    if years:
+        y_hats = np.asarray(model_fit.forecast(steps=max(years) - last_year))
+
+    forecast_years = []
+    forecast_values = []
+    for year in years:
+        if year not in existing_years:
+            y_hat = y_hats[year - last_year - 1]
+            print('For Year %d --> Predicted = %.3f' % (year, y_hat))
+            forecast_years.append(year)
+            forecast_values.append(y_hat)
+        else:
+            print(f"\nThe value for the year {year} you are trying to predict already exists\n")
+    return np.array(forecast_years, dtype='int64'), np.array(forecast_values, dtype='float64')
+
+
+def sheet_splitter(example_sheet, query_column, query):
+    """
+    a function that checks if a query is present in an example sheet,
+    splits the example sheet based on the provided query in the query_column and then,
+    outputs a CSV file and determines whether time series forecasts,
+    can be performed on the split data. Expects at least 15 data points,
+    to pass check
+
+    Args:
+    example_sheet: dataframe to be filtered-pandas dataframe
+    query_column: the column the query should be searched in-string
+    query: what will be used to filter the passed in dataframe-string.
+
+    Return:
+    result_df-dataFrame
+    """
+
+    # Declare the query conditional
+    query_conditional = column_matches(example_sheet[query_column], query)
+
+    result_df = example_sheet[query_conditional]
+
+    # Determine how many data points are suitable for data forecasting
+    if len(result_df) >= 15:
+        print(f"{query_column} : {query}, with length: {len(result_df)} can be forecast")
+        yield result_df
+
+    else:
+        print(f"""{query_column} : {query} with length: {len(result_df)}, cannot be forecast, choose another indicator or check spelling""")
+        return None
+
+
+def is_empty(output):
+    """
+    Checks that the list passed in is not empty.
+    Args:
+        output: the list to be evaluated.
+
+    """
+    if not output:
+        return True
+    return False
+
+
+def generator_reader(generated_list):
+    """
+    Reads the generated list and produces a df.
+    Args:
+        generated_list:
+
+    """
+    resulting_df = [item for item in generated_list]
+
+    # if resulting_df:
+    resulting_df = pd.concat(resulting_df)
+    return resulting_df
+    # else:
+        # print("\nThe query has no results\n")
+
+
+@metrics.timed()
+def filter_df(dataframe: pd.DataFrame, indicator_column: str,
+              indicator_query: str, state_column: str, state_query: str,
+              source_column: str, source_query: str):
+    """
+    Filters the dataframe by preferred source, indicator and state.
+    Args:
+        dataframe: dataframe to be filtered.
+        indicator_column: the name of the column with the indicators.
+        indicator_query: the indicator to filter the indicator_column by.
+        state_column: the name of the column with the states.
+        state_query: the state to filter the state_column by.
+        source_column: the name of the column with the data sources.
+        source_query: the source to filter the source_column by.
+    Returns:
+        a list with the rows of the series as a dataframe, empty when the series isn't in the dataframe.
+    """
+    rows = series_rows(dataframe, indicator_column, indicator_query, state_column, state_query,
+                       source_column, source_query)
+    if rows is None:
+        return []
+    return [rows]
+
+
+def column_matches(column: pd.Series, query) -> np.ndarray:
+    """
+    Finds the rows of a column equal to the query. Categorical columns are compared
+    by their codes, so the query is looked up once instead of compared with every row.
+    Args:
+        column: the column to be searched.
+        query: the value to look for.
+    Returns:
+        a boolean numpy array
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = column.array.categories
+        if query not in categories:
+            return np.zeros(len(column), dtype=bool)
+        return column.array.codes == categories.get_loc(query)
+    return column.to_numpy() == query
+
+
+def series_rows(dataframe: pd.DataFrame, indicator_column: str,
+                indicator_query: str, state_column: str, state_query: str,
+                source_column: str, source_query: str):
+    """
+    Picks the rows of one (indicator, state, source) series with a single mask over
+    the dataframe, instead of copying the rows left after each column is filtered.
+    Expects at least 15 data points, like sheet_splitter.
+    Args:
+        dataframe: dataframe to be filtered.
+        indicator_column: the name of the column with the indicators.
+        indicator_query: the indicator to filter the indicator_column by.
+        state_column: the name of the column with the states.
+        state_query: the state to filter the state_column by.
+        source_column: the name of the column with the data sources.
+        source_query: the source to filter the source_column by.
+    Returns:
+        a dataframe, or None if the series can't be forecast
+    """
+    query_conditional = column_matches(dataframe[source_column], source_query) \
+        & column_matches(dataframe[indicator_column], indicator_query) \
+        & column_matches(dataframe[state_column], state_query)
+    points = int(query_conditional.sum())
+    if can_be_forecast(points, indicator_column, indicator_query, state_column, state_query,
+                       source_column, source_query):
+        return dataframe[query_conditional]
+    return None
+
+
+def can_be_forecast(points: int, indicator_column: str, indicator_query: str, state_column: str,
+                    state_query: str, source_column: str, source_query: str) -> bool:
+    """
+    Checks a series has the 15 data points a forecast needs, printing whether it does.
+    Args:
+        points: the number of rows of the series.
+        indicator_column: the name of the column with the indicators.
+        indicator_query: the indicator of the series.
+        state_column: the name of the column with the states.
+        state_query: the state of the series.
+        source_column: the name of the column with the data sources.
+        source_query: the source of the series.
+    Returns:
+        a boolean
+    """
+    if points >= 15:
+        print(f"{indicator_column} : {indicator_query}, {state_column} : {state_query}, "
+              f"{source_column} : {source_query}, with length: {points} can be forecast")
+        return True
+    print(f"""{indicator_column} : {indicator_query}, {state_column} : {state_query}, {source_column} : {source_query} with length: {points}, cannot be forecast, choose another indicator or check spelling""")
+    return False
+
+
+def series_frame(rows: pd.DataFrame, columns_to_drop: list, period_column: str) -> pd.DataFrame:
+    """
+    Turns the rows of a series into the frame a forecast is made from, dropping the
+    columns that won't help prediction, indexing it by the Period column as datetime
+    objects and filling nan values with preceding values.
+    Args:
+        rows: the rows of the series, e.g from series_rows.
+        columns_to_drop: columns to be dropped from the rows.
+        period_column: the column with time e.g years.
+    Returns:
+        a dataframe
+    """
+    kept_columns = [column for column in rows.columns
+                    if column not in columns_to_drop and column != period_column]
+    index = pd.DatetimeIndex(pd.to_datetime(rows[period_column].to_numpy(), format='%Y'),
+                             name=period_column)
+    series_df = pd.DataFrame({column: rows[column].to_numpy() for column in kept_columns}, index=index)
+    # fill nan values with preceeding values
+    return series_df.fillna(method='ffill')
+
+
+def column_dropper(data_frame: pd.DataFrame, drop_cols):
+    """
+    Drops columns passed in from the dataframe passed in.
+    Args:
+        data_frame: data frame columns are to be dropped from.
+        drop_cols: colums to be dropped from the dataframe.
+    Returns:
+        a generator
+    """
+    yield data_frame.drop(drop_cols, axis=1)
+
+
+def date_time_converter(column):
+    """
+    Converts a column to a pandas date time object (not a regular date time object)
+    Args:
+        column: column to be converted.
+    Returns:
+        a generator
+
+    """
+    return pd.to_datetime(column, format='%Y')
+
+
+def index_setter(df, new_index_column):
+    """
+    Reset the index of the dataframe and fill nan values after reset
+    Args:
+        df: the dataframe to be reset.
+        new_index_column:  the new index column after the reset.
+    Returns:
+        a generator
+    """
+    df = df.set_index(new_index_column, drop=True, append=False, inplace=False,
+                      verify_integrity=False)
+    # fill nan values with preceeding values
+    yield df.fillna(method='ffill')
+
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboards.metrics import metrics
+from dashboards.prediction.predictive_model_functions import is_stationary
+
+
+@metrics.timed()
+def differencing_order(values, max_d: int = None):
+    """
+    Works out how many times a series has to be differenced to become stationary,
+    differencing a numpy array instead of adding a column to a dataframe every round.
+    Args:
+        values: the values of the series, in period order.
+        max_d: the most differences to try, no limit when None (adfuller raises
+               once the series gets too short, just like differencer).
+    Returns:
+        a (d, p_values) tuple with the p value of the adfuller test after each round
+    """
+    from statsmodels.tsa.stattools import adfuller
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    p_values = [adfuller(values)[1]]
+    d = 0
+    while not is_stationary(p_values[-1]) and (max_d is None or d < max_d):
+        d += 1
+        values = np.diff(values)
+        p_values.append(adfuller(values)[1])
+    return d, p_values
+
+
+class StationarityCache:
+    """
+    Remembers the differencing order of every series it has analysed so the
+    adfuller tests only run once per series.
+    """
+
+    def __init__(self):
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def analyse(self, key: tuple, values):
+        """
+        Gives the differencing order of a series, working it out the first time only.
+        Args:
+            key: the (indicator, state, source, fingerprint) key of the series.
+            values: the values of the series, in period order.
+        Returns:
+            a (d, p_values) tuple
+        """
+        result = self._orders.get(key)
+        if result is None:
+            result = differencing_order(values)
+            with self._lock:
+                self._orders[key] = result
+        return result
+
+    def analyse_tasks(self, tasks: list, indicator_column: str = 'Indicator', state_column: str = 'State',
+                      source_column: str = 'Source') -> pd.DataFrame:
+        """
+        Works out the differencing order of the series of forecasting tasks, filling the gaps in each
+        with the value before them like the forecasts do, so the order is the one fit would work out.
+        Series adfuller can't test, e.g ones with too few points, get a d of None and the error.
+        Args:
+            tasks: (key, periods, values, forecast_years) tuples from batch_forecast.series_tasks.
+            indicator_column: the name given to the indicator column of the result.
+            state_column: the name given to the state column of the result.
+            source_column: the name given to the source column of the result.
+        Returns:
+            a dataframe with a row per series
+        """
+        rows = []
+        for key, _, values, _ in tasks:
+            indicator, state, source, _ = key
+            row = {indicator_column: indicator, state_column: state, source_column: source,
+                   'points': len(values), 'd': None, 'p_values': None, 'error': None}
+            try:
+                row['d'], row['p_values'] = self.analyse(key, pd.Series(values).fillna(method='ffill').to_numpy())
+            except (ValueError, np.linalg.LinAlgError) as error:
+                row['error'] = f'{type(error).__name__}: {error}'
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def analyse_all(self, dataframe: pd.DataFrame, indicator_column: str = 'Indicator',
+                    state_column: str = 'State', source_column: str = 'Source',
+                    period_column: str = 'Period', values_column: str = 'Value') -> pd.DataFrame:
+        """
+        Works out the differencing order of every (indicator, state, source) series in the table,
+        each read the way prediction_operation and batch_forecast read it, a value per period
+        in period order, and keyed like they key it, so their fits find the order here.
+        Args:
+            dataframe: the dataframe with the series, e.g registry.table().
+            indicator_column: the name of the column with the indicators.
+            state_column: the name of the column with the states.
+            source_column: the name of the column with the data sources.
+            period_column: the column with the periods.
+            values_column: the column with the values to be tested.
+        Returns:
+            a dataframe with a row per series, see analyse_tasks
+        """
+        # batch_forecast imports the model cache, which imports this module
+        from dashboards.prediction.batch_forecast import series_tasks
+        tasks = series_tasks(dataframe, [], indicator_column=indicator_column, state_column=state_column,
+                             source_column=source_column, period_column=period_column, values_column=values_column)
+        return self.analyse_tasks(tasks, indicator_column, state_column, source_column)
+
+    def orders(self) -> dict:
+        """A copy of the differencing orders worked out so far, keyed on series, to hand to another cache."""
+        with self._lock:
+            return dict(self._orders)
+
+    def update(self, orders: dict):
+        """Takes in differencing orders worked out elsewhere, e.g by the process handing out batch forecasts."""
+        with self._lock:
+            self._orders.update(orders)
+
+    def clear(self, *args):
+        """Drops the stored differencing orders, e.g when the sheet is reloaded."""
+        with self._lock:
+            self._orders.clear()
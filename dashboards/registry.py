@@ -0,0 +1,146 @@
+import threading
+
+import pandas as pd
+from dashboards.data_loader import load_sheet, load_sheets, list_sheets, add_reload_listener, loaded_fingerprint
+from dashboards.result_cache import ResultCache
+from dashboards.figure_cache import FigureCache
+from dashboards.metrics import metrics
+
+WORKBOOK_PATH = "data/sample_data.xlsx"
+SHEET_NAME = "Correlation Input Sheet"
+
+
+class DataRegistry:
+    """
+    The tables the dashboards read and everything built from them, e.g tensor stores and
+    the correlation cube, loaded or built once per process and shared by every view,
+    together with the result and figure caches the views share. Every sheet of a workbook
+    is loaded and built for on its own, so switching to another sheet leaves the ones
+    already loaded as they are.
+    e.g, registry.get('correlation_cube', CorrelationCube) for the cube of the default sheet,
+         registry.get('correlation_cube', CorrelationCube, sheet_name='Data') for another sheet
+    """
+
+    def __init__(self, workbook_path: str = WORKBOOK_PATH, sheet_name: str = SHEET_NAME):
+        """
+        Args:
+            workbook_path: path to the workbook the views read by default.
+            sheet_name: the sheet in the workbook the views read by default.
+        """
+        self.workbook_path = workbook_path
+        self.sheet_name = sheet_name
+        # results of the operations and figures for dropdown combinations that were already asked for
+        self.result_cache = ResultCache(max_size=512, ttl=60 * 60)
+        self.figure_cache = FigureCache(max_size=1024, ttl=60 * 60)
+        self._objects = {}
+        self._lock = threading.RLock()
+        self._warm_thread = None
+        add_reload_listener(self.clear)
+        metrics.add_collector('result_cache', self.result_cache.stats)
+        metrics.add_collector('figure_cache', self.figure_cache.stats)
+
+    def table(self, workbook_path: str = None, sheet_name: str = None, filters: dict = None,
+              partitioned: bool = False) -> pd.DataFrame:
+        """
+        Gives a sheet as load_sheet loads it, the same dataframe for every caller.
+        Args:
+            workbook_path: path to the workbook, the default one when None.
+            sheet_name: the sheet in the workbook, the default one when None.
+            filters: load only the rows matching them while the sheet is read, a new
+                     dataframe on every call, see load_sheet. The whole sheet when None.
+            partitioned: read the filtered rows from partitions of the sheet on disk, see load_sheet.
+        Returns:
+            a dataframe
+        """
+        if filters is not None:
+            return load_sheet(workbook_path or self.workbook_path, sheet_name or self.sheet_name,
+                              filters=filters, partitioned=partitioned)
+        # a request arriving while the sheet is being warmed waits for it instead of loading it again
+        with self._lock:
+            return load_sheet(workbook_path or self.workbook_path, sheet_name or self.sheet_name)
+
+    def sheets(self, workbook_path: str = None) -> list:
+        """
+        Lists the sheets of a workbook from its zip metadata, without loading any of them.
+        Args:
+            workbook_path: path to the workbook, the default one when None.
+        Returns:
+            a list of sheet names
+        """
+        return list_sheets(workbook_path or self.workbook_path)
+
+    def load(self, sheet_names: list = None, workbook_path: str = None, workers: int = None) -> dict:
+        """
+        Loads several sheets at once, the ones not cached yet are parsed in parallel,
+        so switching to any of them later is a read of its columnar cache at most.
+        Args:
+            sheet_names: the sheets to load, every sheet of the workbook when None.
+            workbook_path: path to the workbook, the default one when None.
+            workers: number of processes parsing sheets, see load_sheets.
+        Returns:
+            a dictionary of sheet name to dataframe
+        """
+        return load_sheets(workbook_path or self.workbook_path, sheet_names, workers=workers)
+
+    def get(self, name: str, factory, workbook_path: str = None, sheet_name: str = None):
+        """
+        Gives an object built from a sheet, building it the first time it is asked for.
+        Args:
+            name: the name the object is kept under, e.g 'correlation_cube'.
+            factory: function taking the sheet's dataframe and building the object.
+            workbook_path: path to the workbook, the default one when None.
+            sheet_name: the sheet in the workbook, the default one when None.
+        Returns:
+            what factory built
+        """
+        table = self.table(workbook_path, sheet_name)
+        key = (name, workbook_path or self.workbook_path, sheet_name or self.sheet_name,
+               loaded_fingerprint(table))
+        with self._lock:
+            if key not in self._objects:
+                self._objects[key] = factory(table)
+            return self._objects[key]
+
+    def warm(self, factories: dict = None, background: bool = True):
+        """
+        Loads the default sheet and builds objects from it ahead of the first request,
+        so the app can start serving before the workbook has been read.
+        Args:
+            factories: dictionary of name to factory, built like get builds them.
+            background: whether to load on a daemon thread and return straight away.
+        Returns:
+            the thread doing the loading, or None when it was done in this thread
+        """
+        def load():
+            self.table()
+            for name, factory in (factories or {}).items():
+                self.get(name, factory)
+
+        if not background:
+            load()
+            return None
+        with self._lock:
+            if self._warm_thread is None or not self._warm_thread.is_alive():
+                self._warm_thread = threading.Thread(target=load, name='registry-warm', daemon=True)
+                self._warm_thread.start()
+            return self._warm_thread
+
+    def wait(self, timeout: float = None):
+        """
+        Waits for the sheet being warmed in the background to finish loading.
+        Args:
+            timeout: the most seconds to wait, no limit when None.
+        """
+        thread = self._warm_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def clear(self, *args):
+        """Drops the built objects and cached results, e.g when a workbook is reloaded."""
+        with self._lock:
+            self._objects.clear()
+        self.result_cache.clear()
+        self.figure_cache.clear()
+
+
+registry = DataRegistry()
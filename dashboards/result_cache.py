@@ -0,0 +1,165 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from dashboards.data_loader import frame_fingerprint
+
+
+class UncacheableArgument(TypeError):
+    """Raised by normalize_argument for an argument that can't be told apart from another by value."""
+
+
+def normalize_argument(value):
+    """
+    Turns an argument into something hashable that is the same for equivalent queries,
+    e.g ['NHMIS', 'IHME'] and ['IHME', 'NHMIS'] both become ('IHME', 'NHMIS') and np.int64(2021) becomes 2021.
+    Tables and formatters are identified by the fingerprint of their data, see frame_fingerprint,
+    so a table filtered or copied from a loaded sheet isn't taken for the sheet. Any other
+    hashable argument is kept as it is, so it's compared by value and kept alive by the key.
+    Args:
+        value: the argument to be normalized.
+    Returns:
+        a hashable value
+    Raises:
+        UncacheableArgument: for unhashable arguments without a fingerprint, e.g an array,
+        whose id could be reused by another object once it's garbage collected.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [normalize_argument(item) for item in value]
+        try:
+            return tuple(sorted(items))
+        except TypeError:
+            return tuple(items)
+    if isinstance(value, dict):
+        return normalize_argument(list(value.items()))
+    if isinstance(value, np.generic):
+        return value.item()
+
+    data_frame = getattr(value, 'data_frame', value)
+    if isinstance(data_frame, pd.DataFrame):
+        return type(value).__name__, frame_fingerprint(data_frame)
+    try:
+        hash(value)
+    except TypeError:
+        raise UncacheableArgument(f"a {type(value).__name__} can't be used in a cache key") from None
+    return value
+
+
+class ResultCache:
+    """
+    A bounded least recently used cache for the results of the operations,
+    safe to share between the threads serving a Dash app.
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = None):
+        """
+        Args:
+            max_size: the most results kept before the least recently used is evicted.
+            ttl: seconds a result is kept for, results never expire when None.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Looks up a result.
+        Args:
+            key: the key the result was stored with.
+        Returns:
+            a (found, result) tuple
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._results[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key, result):
+        """
+        Stores a result, evicting the least recently used ones past max_size.
+        Args:
+            key: the key to store the result with.
+            result: the result to be stored.
+        """
+        with self._lock:
+            self._results[key] = (time.monotonic(), result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, *args):
+        """Drops every stored result, e.g when the sheet they came from is reloaded."""
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> dict:
+        """Gives the hit, miss and eviction counts and the number of stored results."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'size': len(self._results)}
+
+    def memoize(self, func):
+        """
+        Decorates an operation so its results are stored in this cache, keyed on
+        its normalized arguments. Works for operations that yield their result too.
+        Results are shared between callers so they must not be changed in place.
+        Calls with an argument normalize_argument can't key are run without the cache.
+        Args:
+            func: the operation to be decorated.
+        """
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (func.__qualname__,) + tuple((name, normalize_argument(value))
+                                                for name, value in bound.arguments.items())
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    key = make_key(args, kwargs)
+                except UncacheableArgument:
+                    yield from func(*args, **kwargs)
+                    return
+                found, result = self.get(key)
+                if not found:
+                    result = list(func(*args, **kwargs))
+                    self.put(key, result)
+                yield from result
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    key = make_key(args, kwargs)
+                except UncacheableArgument:
+                    return func(*args, **kwargs)
+                found, result = self.get(key)
+                if not found:
+                    result = func(*args, **kwargs)
+                    # a returned generator can only be read once, keep what it yields instead
+                    if inspect.isgenerator(result):
+                        result = list(result)
+                    self.put(key, result)
+                return result
+
+        wrapper.cache = self
+        return wrapper
@@ -0,0 +1,83 @@
+import re
+import subprocess
+import sys
+
+import pandas as pd
+
+# a line of python -X importtime output, e.g "import time:       412 |       1830 |   pandas.core"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# run in a fresh interpreter so modules this process already imported aren't left out
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+ready = time.perf_counter()
+from dashboards.registry import registry
+registry.wait()
+print(ready - start, time.perf_counter() - ready)
+"""
+
+
+def import_times(module: str = 'dashboards.app'):
+    """
+    Imports a module in a new interpreter with python -X importtime and reads how long
+    every module it pulled in took to import.
+    Args:
+        module: the module to import, e.g dashboards.app which makes the app object.
+    Returns:
+        a (imports, ready_seconds, warm_seconds) tuple, imports being a dataframe with the module,
+        its depth in the import tree and its self and cumulative import times in ms,
+        ready_seconds the time the import took and warm_seconds the time the data took
+        to finish loading in the background after that
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT.format(module=module)],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # importtime indents a module by two spaces for every level below the top one
+            rows.append({'module': name, 'depth': (len(indent) - 1) // 2,
+                         'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    ready_seconds, warm_seconds = (float(value) for value in completed.stdout.split()[-2:])
+    return pd.DataFrame(rows, columns=['module', 'depth', 'self_ms', 'cumulative_ms']), ready_seconds, warm_seconds
+
+
+def startup_report(module: str = 'dashboards.app', top: int = 15) -> str:
+    """
+    Makes a report of where the time to start the app goes, the import time of each
+    package and the slowest modules, like reading python -X importtime by hand.
+    e.g, python -m dashboards --startup-report
+    Args:
+        module: the module to import, e.g dashboards.app which makes the app object.
+        top: the number of packages and modules to list.
+    Returns:
+        the report as a string
+    """
+    imports, ready_seconds, warm_seconds = import_times(module)
+    imports['package'] = imports['module'].str.split('.').str[0]
+    packages = imports.groupby('package')['self_ms'].agg(['sum', 'count']) \
+        .rename(columns={'sum': 'import_ms', 'count': 'modules'}) \
+        .sort_values('import_ms', ascending=False).head(top)
+    slowest = imports.sort_values('cumulative_ms', ascending=False).head(top)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        return "\n".join([
+            f"{module} ready in {ready_seconds:.3f}s, {len(imports)} modules imported",
+            f"data warmed in the background {warm_seconds:.3f}s later",
+            "",
+            "import time by package:",
+            packages.round(1).to_string(),
+            "",
+            "slowest imports, with the modules they imported:",
+            slowest[['module', 'depth', 'self_ms', 'cumulative_ms']].round(1).to_string(index=False),
+        ])
+
+
+if __name__ == "__main__":
+    print(startup_report(sys.argv[1] if len(sys.argv) > 1 else 'dashboards.app'))
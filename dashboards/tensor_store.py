@@ -0,0 +1,256 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboards.data_loader import add_reload_listener, loaded_fingerprint
+from dashboards.metrics import metrics
+
+# stores already built in this process, keyed on (fingerprint, columns)
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def is_label(value) -> bool:
+    """Whether a query value is a single label rather than a list of them."""
+    return not isinstance(value, (list, tuple, set, frozenset, np.ndarray, pd.Index))
+
+
+class TensorStore:
+    """
+    Holds the long format table as a dense float32 tensor indexed by [Source, Indicator, State, Period],
+    built once, so a heatmap, scatter plot or forecast reads a slice of it instead of filtering and
+    pivoting the rows again. Values of rows landing in the same cell, e.g one per LGA, are summed
+    like pivot_table(aggfunc='sum'), cells without a value are NaN and marked in a validity mask.
+    The number of values in each cell is kept too, so a forecast can read the mean of a period, see means.
+    e.g, store.cross_section('IHME', 2015) is tensor[source, :, :, period], a view of the
+    indicators by states of a year, and store.series('IHME', 'Infant Mortality rate', 'Abia')
+    is tensor[source, indicator, state, :]
+    """
+
+    def __init__(self, data_frame: pd.DataFrame, source: str = 'Source', indicator: str = 'Indicator',
+                 state: str = 'State', period: str = 'Period', values: str = 'Value'):
+        """
+        Args:
+            data_frame: the long format table, e.g registry.table().
+            source: the column with the data sources.
+            indicator: the column with the indicators.
+            state: the column with the states.
+            period: the column with the periods.
+            values: the column with the values.
+        """
+        self.dimensions = (source, indicator, state, period)
+        self.values = values
+        self.fingerprint = loaded_fingerprint(data_frame)
+
+        codes = []
+        self.labels = {}
+        for dimension in self.dimensions:
+            dimension_codes, labels = pd.factorize(data_frame[dimension], sort=True)
+            codes.append(dimension_codes)
+            self.labels[dimension] = pd.Index(np.asarray(labels), name=dimension)
+        shape = tuple(len(self.labels[dimension]) for dimension in self.dimensions)
+        size = int(np.prod(shape))
+
+        cells = np.ravel_multi_index(codes, shape) if len(data_frame) else np.empty(0, dtype=np.intp)
+        values = data_frame[self.values].to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+        sums = np.bincount(cells[valid], weights=values[valid], minlength=size)
+        # a row whose value is missing still puts its state and indicator in a pivot, like pivot_blocks
+        self.has_row = (np.bincount(cells, minlength=size) > 0).reshape(shape)
+        counts = np.bincount(cells[valid], minlength=size)
+        self.mask = (counts > 0).reshape(shape)
+        self.counts = counts.astype(np.min_scalar_type(int(counts.max(initial=0)))).reshape(shape)
+        self.tensor = np.where(self.mask.ravel(), sums, np.nan).astype(np.float32).reshape(shape)
+
+    @classmethod
+    def of(cls, data_frame: pd.DataFrame, source: str = 'Source', indicator: str = 'Indicator',
+           state: str = 'State', period: str = 'Period', values: str = 'Value'):
+        """
+        Gives the store of a table, building it the first time it is asked for. Tables are
+        told apart by the fingerprint load_sheet gives them, tables without one, including the ones
+        filtered or copied from a loaded sheet, are built every time.
+        Args:
+            data_frame: the long format table, e.g registry.table().
+            source: the column with the data sources.
+            indicator: the column with the indicators.
+            state: the column with the states.
+            period: the column with the periods.
+            values: the column with the values.
+        Returns:
+            a TensorStore
+        """
+        fingerprint = loaded_fingerprint(data_frame)
+        key = (fingerprint, source, indicator, state, period, values)
+        with _stores_lock:
+            if fingerprint is None or key not in _stores:
+                with metrics.timer('TensorStore.build'):
+                    store = cls(data_frame, source, indicator, state, period, values)
+                if fingerprint is None:
+                    return store
+                _stores[key] = store
+            return _stores[key]
+
+    def position(self, dimension: str, label):
+        """The position of a label along a dimension, None when it isn't in the table."""
+        try:
+            return int(self.labels[dimension].get_loc(label))
+        except (KeyError, TypeError):
+            return None
+
+    def positions(self, dimension: str, labels) -> np.ndarray:
+        """The positions of the labels found along a dimension, in the order of the dimension."""
+        found = self.labels[dimension].get_indexer(list(labels))
+        return np.unique(found[found >= 0])
+
+    def cross_section(self, source, period) -> np.ndarray:
+        """
+        Gives the indicators by states of a source and period, a view of the tensor.
+        Returns:
+            a 2d float32 array, None when the source or period isn't in the table
+        """
+        source_position = self.position(self.dimensions[0], source)
+        period_position = self.position(self.dimensions[3], period)
+        if source_position is None or period_position is None:
+            return None
+        return self.tensor[source_position, :, :, period_position]
+
+    def series(self, source, indicator, state):
+        """
+        Gives the values of one series over every period of the table, views of the tensor.
+        Returns:
+            a (values, mask) tuple of 1d arrays, None when a label isn't in the table
+        """
+        index = tuple(self.position(dimension, label)
+                      for dimension, label in zip(self.dimensions[:3], (source, indicator, state)))
+        if None in index:
+            return None
+        return self.tensor[index], self.mask[index]
+
+    def select(self, query: dict):
+        """
+        Picks the cells matching a query, single labels by indexing (giving views) and
+        lists of labels by taking their positions.
+        Args:
+            query: dictionary of dimension to a label or a list of labels,
+                   dimensions not in it are kept whole.
+        Returns:
+            a (values, mask, has_row, dimensions, labels) tuple, dimensions being the ones left
+            and labels their labels, or None when a single label isn't in the table
+        """
+        index = []
+        for dimension in self.dimensions:
+            if dimension in query and is_label(query[dimension]):
+                position = self.position(dimension, query[dimension])
+                if position is None:
+                    return None
+                index.append(position)
+            else:
+                index.append(slice(None))
+        index = tuple(index)
+        arrays = [self.tensor[index], self.mask[index], self.has_row[index]]
+        dimensions = [dimension for dimension, position in zip(self.dimensions, index)
+                      if isinstance(position, slice)]
+        labels = [self.labels[dimension] for dimension in dimensions]
+
+        for axis, dimension in enumerate(dimensions):
+            if dimension in query:
+                positions = self.positions(dimension, query[dimension])
+                arrays = [np.take(array, positions, axis=axis) for array in arrays]
+                labels[axis] = labels[axis][positions]
+        return arrays[0], arrays[1], arrays[2], dimensions, labels
+
+    def aggregate(self, query: dict, dimensions: list, fill_value=np.nan, require_value: bool = False):
+        """
+        Picks the cells matching a query and sums them over every dimension not kept, the
+        way selecting rows and pivoting them would. Labels without a row are left out.
+        Args:
+            query: dictionary of dimension to a label or a list of labels.
+            dimensions: the dimensions to keep, in the order wanted.
+            fill_value: value of the cells no value lands in.
+            require_value: leave out labels that only have rows with missing values too.
+        Returns:
+            a (values, present, labels) tuple, values a float64 array laid out like dimensions,
+            present marking its cells with a row (a value when require_value) and labels
+            the labels of each of its dimensions
+        """
+        selected = self.select(query)
+        if selected is None:
+            shape = (0,) * len(dimensions)
+            return np.empty(shape), np.empty(shape, dtype=bool), \
+                [self.labels[dimension][:0] for dimension in dimensions]
+        values, mask, has_row, remaining, labels = selected
+
+        # sum over the dimensions that aren't kept, then lay the rest out in the order asked for
+        summed = tuple(axis for axis, dimension in enumerate(remaining) if dimension not in dimensions)
+        order = [remaining.index(dimension) for dimension in dimensions]
+        kept = [axis for axis in range(len(remaining)) if axis not in summed]
+        transpose = [kept.index(axis) for axis in order]
+        sums = np.where(mask, values, 0.0).astype('float64').sum(axis=summed).transpose(transpose)
+        valid = mask.any(axis=summed).transpose(transpose)
+        present = (valid if require_value else has_row.any(axis=summed).transpose(transpose))
+        labels = [labels[axis] for axis in order]
+
+        # keep the labels with a row in what was picked, as a pivot of the rows would
+        for axis in range(len(dimensions)):
+            other_axes = tuple(other for other in range(len(dimensions)) if other != axis)
+            keep = np.flatnonzero(present.any(axis=other_axes))
+            sums, valid, present = (np.take(array, keep, axis=axis) for array in (sums, valid, present))
+            labels[axis] = labels[axis][keep]
+        return np.where(valid, sums, fill_value), present, labels
+
+    @metrics.timed()
+    def pivot(self, query: dict, new_index: str, new_columns: str, fill_value=np.nan) -> pd.DataFrame:
+        """
+        Gives what selecting the rows matching a query and pivoting them with pivot_blocks gives,
+        e.g pivot({'Source': ['IHME'], 'Period': 2015, 'Indicator': indicators}, 'State', 'Indicator').
+        Args:
+            query: dictionary of dimension to a label or a list of labels.
+            new_index: the dimension whose labels become the index.
+            new_columns: the dimension whose labels become the columns.
+            fill_value: value of the cells no value lands in.
+        Returns:
+            a dataframe
+        """
+        values, _, (index_labels, column_labels) = self.aggregate(query, [new_index, new_columns],
+                                                                  fill_value=fill_value)
+        return pd.DataFrame(values, index=index_labels, columns=column_labels)
+
+    def means(self, index) -> np.ndarray:
+        """
+        The mean of the values landing in the cells at an index of the tensor, e.g the LGA rows
+        and the 'All' row of a period, where tensor holds their sum. Cells without a value are NaN.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.tensor[index] / self.counts[index]
+
+    def series_rows(self, source, indicator, state) -> pd.DataFrame:
+        """
+        Gives the periods of one series that have a row as rows laid out like the table,
+        in period order, without filtering the table. The value of a period is the mean of
+        its rows, e.g one per LGA, so a rate stays a rate, like series_matrix of the pooled forecaster.
+        Returns:
+            a dataframe, with no rows when a label isn't in the table
+        """
+        source_column, indicator_column, state_column, period_column = self.dimensions
+        index = tuple(self.position(dimension, label)
+                      for dimension, label in zip(self.dimensions[:3], (source, indicator, state)))
+        periods = np.flatnonzero(self.has_row[index]) if None not in index else np.empty(0, dtype=np.intp)
+        return pd.DataFrame({indicator_column: indicator,
+                             period_column: self.labels[period_column][periods].to_numpy(),
+                             state_column: state,
+                             source_column: source,
+                             self.values: self.means(index)[periods] if len(periods) else np.empty(0, np.float32)})
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the tensor, its masks and counts."""
+        return self.tensor.nbytes + self.mask.nbytes + self.has_row.nbytes + self.counts.nbytes
+
+
+def clear_stores(*args):
+    """Drops the stores built so far, e.g when a workbook is reloaded."""
+    with _stores_lock:
+        _stores.clear()
+
+
+add_reload_listener(clear_stores)
@@ -0,0 +1,4 @@
+"""
+The pages of the dashboard, each with a layout and a register_callbacks function.
+The layouts are functions so the table is only read once a page is asked for.
+"""
@@ -0,0 +1,58 @@
+from dash import html
+import pandas as pd
+
+# the columns the views read from a sheet
+TABLE_COLUMNS = ['Source', 'Period', 'Indicator', 'State', 'Value']
+
+
+def dropdown_options(data_frame: pd.DataFrame, query: str) -> list:
+    """
+    makes a list of the unique items in a specified dataframe series.
+    Args:
+        data_frame: the dataframe whose series we are getting unique values
+        query: the name of the column we are looking tpo get unique values from
+    Return:
+        a list of unique values from the column
+    """
+    options = [{'label': item, 'value': item} for item in data_frame[query].unique()]
+    return options
+
+
+def no_data_figure() -> dict:
+    """The figure shown when a query matches no data."""
+    return {
+        "layout": {
+            "xaxis": {
+                "visible": False
+            },
+            "yaxis": {
+                "visible": False
+            },
+            "annotations": [
+                {
+                    "text": "No matching data found",
+                    "xref": "paper",
+                    "yref": "paper",
+                    "showarrow": False,
+                    "font": {
+                        "size": 28
+                    }
+                }
+            ]
+        }
+    }
+
+
+def missing_columns_message(data_frame: pd.DataFrame, columns: list = TABLE_COLUMNS):
+    """
+    Makes the message shown instead of a page when the chosen sheet isn't laid out like the correlation input sheet.
+    Args:
+        data_frame: the sheet.
+        columns: the columns the page reads.
+    Returns:
+        a Dash component, None when the sheet has every column
+    """
+    missing = [column for column in columns if column not in data_frame.columns]
+    if not missing:
+        return None
+    return html.Div(f"This sheet has no {', '.join(missing)} column, choose another sheet")
@@ -0,0 +1,158 @@
+from dash import dcc, html, no_update
+from dash.dependencies import Input, Output, State
+import pandas as pd
+from dashboards.prediction.operations import prediction_operation, figure_cache, forecast_executor
+from dashboards.registry import registry
+from dashboards.views.components import dropdown_options, missing_columns_message, no_data_figure
+
+
+def layout(sheet_name: str = None):
+    """
+    Makes the forecast page, the dropdowns are filled from the table when the page is first shown.
+    Args:
+        sheet_name: the sheet chosen in the app, the default one when None.
+    Returns:
+        a Dash component
+    """
+    correlation_input_df = registry.table(sheet_name=sheet_name)
+    message = missing_columns_message(correlation_input_df)
+    if message is not None:
+        return message
+
+    source_label = html.Label(['Select a Source'],
+                              style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    source_options = dropdown_options(correlation_input_df, 'Source')
+
+    source_selector = dcc.Dropdown(id='forecast-source', options=source_options,
+                                   value=source_options[0]['value'])
+
+    state_label = html.Label(['Select a State'],
+                             style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    state_options = dropdown_options(correlation_input_df, 'State')
+
+    state_selector = dcc.Dropdown(id='forecast-state', options=state_options,
+                                  value=state_options[0]['value'])
+    indicator_label = html.Label(['Select an Indicator'],
+                                           style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    indicator_options = dropdown_options(correlation_input_df, 'Indicator')
+
+    indicator_selector = dcc.Dropdown(id='forecast-indicator', options=indicator_options,
+                                      value=indicator_options[0]['value'])
+
+    # make this a multi selectable dropdown list starting from 2018
+    year_selector = dcc.RangeSlider(id='forecast-year', min=2018, max=2026,
+                                    value=[2018, 2023],
+                                    step=1,
+                                    tooltip={'always_visible': True, 'placement': 'bottom'}
+                                    )
+
+    # ARIMA fits a model per series, the pooled models fit one regression on every series at once
+    model_selector = dcc.Dropdown(id='forecast-model', value='arima', clearable=False,
+                                  options=[{'label': 'ARIMA', 'value': 'arima'},
+                                           {'label': 'Pooled linear regression', 'value': 'linear'},
+                                           {'label': 'Pooled gradient boosting', 'value': 'gradient_boosting'}])
+
+    graph = dcc.Graph(id='forecast-graph', figure={})
+
+    # the forecast runs on forecast_executor, the page polls for it and shows how far it has got
+    progress = html.Div(id='forecast-progress')
+    job_store = dcc.Store(id='forecast-job')
+    poll = dcc.Interval(id='forecast-poll', interval=500, disabled=True)
+
+    return html.Div(children=[
+        source_label,
+        source_selector,
+        state_label,
+        state_selector,
+        indicator_label,
+        indicator_selector,
+        year_selector,
+        model_selector,
+        progress,
+        graph,
+        job_store,
+        poll
+    ])
+
+
+def submit_cb(source, state, indicator, year, model, job, sheet=None):
+    # the job of the last selection isn't wanted anymore, identical selections share one job
+    job_id = forecast_executor.submit((source, state, indicator, tuple(year), model, sheet), forecast_figure,
+                                      source, state, indicator, year, model, sheet, supersedes=job)
+    return job_id
+
+
+def poll_cb(job, n_intervals):
+    status = forecast_executor.status(job)
+    if status['state'] in ('queued', 'running'):
+        return no_update, f"{status['stage'].capitalize()}... {status['elapsed']:.0f}s", False
+    if status['state'] == 'done':
+        return forecast_executor.result(job), '', True
+    if status['state'] == 'failed':
+        try:
+            forecast_executor.result(job)
+        except Exception as error:
+            print(f"Forecast failed: {error}")
+        return no_update, 'The forecast failed', True
+    # the job was superseded by a newer selection
+    return no_update, '', True
+
+
+@figure_cache.memoize
+def forecast_figure(source, state, indicator, year, model='arima', sheet=None):
+    import plotly.express as px
+    # make a list of the year range selected so you can pass it into the prediction operation
+    years = [i + 1 for i in range(year[0] - 1, year[-1])]
+    df = prediction_operation(dataframe=registry.table(sheet_name=sheet),
+                              indicator_column='Indicator',
+                              indicator_query=indicator,
+                              state_column='State',
+                              state_query=state,
+                              source_column='Source',
+                              source_query=source,
+                              columns_to_drop=['Indicator', 'State', 'LGA', 'Source'],
+                              period_column='Period',
+                              values_column='Value',
+                              forecast_years=years,
+                              model=model
+                              )
+    df = [item for item in df]
+    if not df:
+        print("Dataframe is empty")
+        return no_data_figure()
+    else:
+        df = pd.concat(df)
+        print(df.tail())
+
+    # fig = go.Figure()
+    # return fig.add_scatter(x=df.index, y=df['Value'], mode='lines', name='Predictionss)
+
+    return px.line(df, x=df.index, y=df['Value'])
+
+
+def register_callbacks(app):
+    """
+    Adds the callbacks of the forecast page to the app.
+    Args:
+        app: the Dash app serving the page.
+    """
+    app.callback(
+        Output('forecast-job', 'data'),
+        Input('forecast-source', 'value'),
+        Input('forecast-state', 'value'),
+        Input('forecast-indicator', 'value'),
+        Input('forecast-year', 'value'),
+        Input('forecast-model', 'value'),
+        State('forecast-job', 'data'),
+        State('sheet', 'value')
+    )(submit_cb)
+    app.callback(
+        Output('forecast-graph', 'figure'),
+        Output('forecast-progress', 'children'),
+        Output('forecast-poll', 'disabled'),
+        Input('forecast-job', 'data'),
+        Input('forecast-poll', 'n_intervals')
+    )(poll_cb)
@@ -0,0 +1,123 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output, State
+from dashboards.correlation.operations import correlation_operations, get_table, get_correlation_cube, \
+    rolling_correlation_operations, figure_cache
+from dashboards.correlation.correlation_engine import METHODS
+from dashboards.registry import registry
+from dashboards.views.components import dropdown_options, missing_columns_message, no_data_figure
+import numpy as np
+import pandas as pd
+
+
+def layout(sheet_name: str = None):
+    """
+    Makes the heatmap page, the dropdowns are filled from the table when the page is first shown.
+    Args:
+        sheet_name: the sheet chosen in the app, the default one when None.
+    Returns:
+        a Dash component
+    """
+    correlation_input_df = registry.table(sheet_name=sheet_name)
+    message = missing_columns_message(correlation_input_df)
+    if message is not None:
+        return message
+    source_options = dropdown_options(correlation_input_df, 'Source')
+    # print(source_options)
+
+    source_selector = dcc.Dropdown(id='heatmap-source', options=source_options,
+                                   value=source_options[0]['value'])
+
+    year_dropdown = dcc.Dropdown(id='heatmap-year', value=2003, clearable=False,
+                                 options=dropdown_options(correlation_input_df, 'Period'))
+
+    indicator_options = dropdown_options(correlation_input_df, 'Indicator')
+    # print(indicator_options)
+
+    indicator_selector = dcc.Dropdown(id='heatmap-indicators', options=indicator_options,
+                                      multi=True, value=[indicator_options[0]['value'], indicator_options[1]['value']])
+    method_selector = dcc.Dropdown(id='heatmap-method', value='pearson', clearable=False,
+                                   options=[{'label': method.title(), 'value': method} for method in METHODS])
+    graph = dcc.Graph(id='heatmap-graph', figure={})
+
+    window_dropdown = dcc.Dropdown(id='heatmap-window', value=5, clearable=False,
+                                   options=[{'label': f"{years} year windows", 'value': years}
+                                            for years in (3, 5, 10)])
+    rolling_graph = dcc.Graph(id='heatmap-rolling-graph', figure={})
+
+    return html.Div(children=[
+        source_selector,
+        year_dropdown,
+        indicator_selector,
+        method_selector,
+        graph,
+        window_dropdown,
+        rolling_graph
+    ])
+
+
+@figure_cache.memoize
+def heatmap_cb(source, year, indicators, method, sheet=None):
+    # plotly express takes a while to import, so it's imported with the first figure instead of at startup
+    import plotly.express as px
+    data_frame = correlation_operations(query_elem='Period',
+                                        query_value=year,
+                                        new_index_column='State',
+                                        new_columns='Indicator',
+                                        new_values='Value',
+                                        values_to_see=indicators,
+                                        source_query=[source],
+                                        source='Source',
+                                        correlation_input_df=get_table(sheet),
+                                        correlation_cube=get_correlation_cube(sheet),
+                                        method=method)
+    data_frame = [item for item in data_frame]
+    print(data_frame)
+    data_frame = pd.concat(data_frame)
+    if not data_frame.empty:
+        print(data_frame)
+        return px.imshow(data_frame, color_continuous_scale='viridis')
+
+    print("Dataframe is empty")
+    return no_data_figure()
+
+
+@figure_cache.memoize
+def rolling_cb(source, indicators, window, sheet=None):
+    import plotly.express as px
+    windows = [item for item in rolling_correlation_operations(source_query=[source],
+                                                               source='Source',
+                                                               values_to_see=indicators,
+                                                               correlation_input_df=get_table(sheet),
+                                                               window=window)][0]
+    if not windows:
+        return {}
+
+    # a frame of the animation per window, labelled with its years on the slider
+    labels = list(next(iter(windows.values())).columns)
+    frames = np.stack([corr.to_numpy() for corr in windows.values()])
+    figure = px.imshow(frames, x=labels, y=labels, animation_frame=0, zmin=-1, zmax=1,
+                       color_continuous_scale='viridis')
+    for slider_step, (start, end) in zip(figure.layout.sliders[0].steps, windows):
+        slider_step.label = f"{start}-{end}"
+    return figure
+
+
+def register_callbacks(app):
+    """
+    Adds the callbacks of the heatmap page to the app.
+    Args:
+        app: the Dash app serving the page.
+    """
+    app.callback(
+        Output('heatmap-graph', 'figure'),
+        Input('heatmap-source', 'value'),
+        Input('heatmap-year', 'value'),
+        Input('heatmap-indicators', 'value'),
+        Input('heatmap-method', 'value'),
+        State('sheet', 'value'))(heatmap_cb)
+    app.callback(
+        Output('heatmap-rolling-graph', 'figure'),
+        Input('heatmap-source', 'value'),
+        Input('heatmap-indicators', 'value'),
+        Input('heatmap-window', 'value'),
+        State('sheet', 'value'))(rolling_cb)
@@ -0,0 +1,113 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output, State
+from dashboards.correlation.operations import scatter_operations, get_table, get_trendlines, figure_cache
+from dashboards.registry import registry
+from dashboards.views.components import dropdown_options, missing_columns_message, no_data_figure
+import numpy as np
+import pandas as pd
+
+
+def layout(sheet_name: str = None):
+    """
+    Makes the scatter plot page, the dropdowns are filled from the table when the page is first shown.
+    Args:
+        sheet_name: the sheet chosen in the app, the default one when None.
+    Returns:
+        a Dash component
+    """
+    correlation_input_df = registry.table(sheet_name=sheet_name)
+    message = missing_columns_message(correlation_input_df)
+    if message is not None:
+        return message
+
+    source_label = html.Label(['Select a Source'],
+                              style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    source_options = dropdown_options(correlation_input_df, 'Source')
+
+    source_selector = dcc.Dropdown(id='scatter-source', options=source_options,
+                                   value=source_options[0]['value'])
+
+    year_label = html.Label(['Select a Year'],
+                            style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    year_dropdown = dcc.Dropdown(id='scatter-year', value=2017, clearable=False,
+                                 options=dropdown_options(correlation_input_df, 'Period'))
+
+    indicator_options = dropdown_options(correlation_input_df, 'Indicator')
+
+    vertical_selector_label = html.Label(['Select Indicator for Y axis'],
+                                         style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    vertical_indicator_selector = dcc.Dropdown(id='scatter-vertical', options=indicator_options,
+                                               value=indicator_options[0]['value'])
+
+    horizontal_selector_label = html.Label(['Select Indicator for X axis'],
+                                           style={'font-weight': 'bold', "text-align": "right", "offset": 1})
+
+    horizontal_indicator_selector = dcc.Dropdown(id='scatter-horizontal', options=indicator_options,
+                                                 value=indicator_options[1]['value'])
+    graph = dcc.Graph(id='scatter-graph', figure={})
+
+    return html.Div(children=[
+        source_label,
+        source_selector,
+        year_label,
+        year_dropdown,
+        horizontal_selector_label,
+        horizontal_indicator_selector,
+        vertical_selector_label,
+        vertical_indicator_selector,
+        graph
+    ])
+
+
+@figure_cache.memoize
+def scatter_cb(source, year, vertical, horizontal, sheet=None):
+    import plotly.express as px
+    df = scatter_operations(query_elem='Period',
+                            query_value=year,
+                            source_query=[source],
+                            source='Source',
+                            data_frame=get_table(sheet),
+                            horizontal=horizontal,
+                            vertical=vertical,
+                            column_name='Indicator')
+    df = [item for item in df]
+    df = pd.concat(df)
+    # return px.imshow(df)
+    # return px.scatter(df, x=horizontal, y=vertical)
+    x = horizontal
+    y = vertical
+
+    if horizontal and vertical in df.columns:
+        # can't add size to the points since table was reshaped to have the 2 indicators that will be plotted
+        figure = px.scatter(df, x=x, y=y, color='State')
+        # the trendline is drawn from the precomputed least squares line instead of fitting OLS here
+        line = get_trendlines(sheet).trendline(source, year, horizontal, vertical)
+        if line is not None:
+            slope, intercept = line
+            ends = np.array([df[x].min(), df[x].max()], dtype='float64')
+            figure.add_scatter(x=ends, y=slope * ends + intercept, mode='lines',
+                               name='Overall Trendline', line={'color': 'black'})
+        return figure
+    # if df.empty:
+    else:
+        print("Dataframe is empty")
+        return no_data_figure()
+
+
+def register_callbacks(app):
+    """
+    Adds the callbacks of the scatter plot page to the app.
+    Args:
+        app: the Dash app serving the page.
+    """
+    app.callback(
+        Output('scatter-graph', 'figure'),
+        Input('scatter-source', 'value'),
+        Input('scatter-year', 'value'),
+        Input('scatter-vertical', 'value'),
+        Input('scatter-horizontal', 'value'),
+        State('sheet', 'value')
+    )(scatter_cb)
@@ -1,8 +1,11 @@
 import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
+from dashboards.data_loader import load_sheet
 
-xls = pd.ExcelFile("data\sample_data.xlsx")
-correlation_input_df = pd.read_excel(xls, 'Correlation Input Sheet', parse_dates=['Period'], index_col='Period')
+correlation_input_df = load_sheet("data/sample_data.xlsx", 'Correlation Input Sheet', compact=False)
+# the loaded frame is shared, so build a new one indexed by Period instead of changing it
+correlation_input_df = correlation_input_df.assign(Period=pd.to_datetime(correlation_input_df['Period'], format='%Y'))
+correlation_input_df = correlation_input_df.set_index('Period')
 
 
 def sheet_splitter(example_sheet, indicator):
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards.prediction.backtesting import (arima_predictions, backtest, forecast_metrics,
+                                               persistence_predictions, regression_predictions)
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+
+
+def test_forecast_metrics_match_sklearn():
+    rng = np.random.default_rng(0)
+    actual, predicted = rng.uniform(10, 50, 12), rng.uniform(10, 50, 12)
+    scores = forecast_metrics(actual, predicted)
+    assert scores['rmse'] == pytest.approx(np.sqrt(mean_squared_error(actual, predicted)))
+    assert scores['mae'] == pytest.approx(mean_absolute_error(actual, predicted))
+    assert scores['mape'] == pytest.approx(mean_absolute_percentage_error(actual, predicted))
+    assert scores['r2'] == pytest.approx(r2_score(actual, predicted))
+
+
+@pytest.mark.parametrize('lags', [1, 2])
+def test_regression_predictions_match_refitting_every_step(lags):
+    values = np.cumsum(np.random.default_rng(1).normal(1, 2, 25))
+    train_size = 10
+    expected = []
+    for end in range(train_size, len(values)):
+        window = values[:end]
+        features = np.column_stack([np.ones(end - lags)] + [window[lags - lag:end - lag] for lag in range(1, lags + 1)])
+        coefficients = np.linalg.lstsq(features, window[lags:], rcond=None)[0]
+        expected.append(np.r_[1.0, values[end - lags:end][::-1]] @ coefficients)
+    np.testing.assert_allclose(regression_predictions(values, train_size, lags=lags), expected, rtol=1e-8)
+
+
+def test_a_random_walk_arima_forecasts_the_last_value():
+    values = np.cumsum(np.random.default_rng(2).normal(0, 1, 20))
+    predictions, order = arima_predictions(values, 12, order=(0, 1, 0))
+    assert order == (0, 1, 0)
+    np.testing.assert_allclose(predictions, persistence_predictions(values, 12))
+
+
+def series_rows(seed: int = 3) -> pd.DataFrame:
+    """Series of several lengths, one a value short of being backtested, with a missing value."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for state, years in [('Abia', 18), ('Lagos', 15), ('Kano', 14)]:
+        frames.append(pd.DataFrame({'Indicator': 'Immunisation', 'Period': np.arange(2000, 2000 + years),
+                                    'State': state, 'LGA': 'All', 'Source': 'NHMIS',
+                                    'Value': np.cumsum(rng.normal(2, 1, years))}))
+    rows = pd.concat(frames, ignore_index=True)
+    rows.loc[4, 'Value'] = np.nan
+    return rows.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def test_backtest_reports_every_series_and_model_the_same_with_workers():
+    rows = series_rows()
+    models = ('persistence', 'regression', 'unknown')
+    report = backtest(rows, models=models, workers=1).drop(columns='seconds')
+    parallel = backtest(rows, models=models, workers=2).drop(columns='seconds')
+    pd.testing.assert_frame_equal(report, parallel)
+
+    report = report.set_index(['State', 'model'])
+    assert len(report) == 3 * len(models)
+    assert (report.loc['Kano', 'status'] == 'skipped').all()
+    assert (report.xs('unknown', level='model')['status'].drop('Kano') == 'failed').all()
+    abia = report.loc[('Abia', 'persistence')]
+    assert (abia['points'], abia['train'], abia['test'], abia['status']) == (18, 12, 6, 'ok')
+    values = rows[rows['State'] == 'Abia'].sort_values('Period')['Value'].fillna(method='ffill').to_numpy()
+    assert abia['mae'] == pytest.approx(np.mean(np.abs(np.diff(values)[11:])))
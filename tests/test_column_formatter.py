@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards.correlation.column_formatter import MISSING_CODE, ColumnFormatter
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_replace_column_values_leaves_the_column_as_it_was(dtype):
+    column = pd.Series(['Lagos', 'Abia', np.nan, 'Kano', 'Abia'], index=[10, 11, 12, 13, 14], name='State',
+                       dtype=dtype)
+    before = column.copy()
+    formatter = ColumnFormatter(column)
+
+    replaced = formatter.replace_column_values(formatter.enumerate_column())
+    expected = pd.Series([2, 0, MISSING_CODE, 1, 0], index=column.index, name='State')
+    pd.testing.assert_series_equal(replaced, expected, check_dtype=False)
+    pd.testing.assert_series_equal(column, before)
+    pd.testing.assert_series_equal(formatter.replace_column_values(), replaced)
+
+
+def test_replace_column_values_with_another_map():
+    column = pd.Series(['Lagos', 'Abia', 'Kano'])
+    replaced = ColumnFormatter(column).replace_column_values({'Abia': 'AB', 'Kano': 'KN', 'Lagos': 'LA'})
+    assert replaced.tolist() == ['LA', 'AB', 'KN']
+    assert column.tolist() == ['Lagos', 'Abia', 'Kano']
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards.correlation.correlation_accumulator import CorrelationAccumulator
+
+TOLERANCE = 1e-9
+
+
+def long_rows(rows: int = 400, seed: int = 0) -> pd.DataFrame:
+    """
+    Long format rows with several rows landing in some cells, missing values,
+    small integer values so there are ties and a constant indicator.
+    """
+    rng = np.random.default_rng(seed)
+    data_frame = pd.DataFrame({
+        'State': rng.choice([f"State {i:02d}" for i in range(20)], rows),
+        'Indicator': rng.choice([f"Indicator {i}" for i in range(6)], rows),
+        'Value': rng.integers(0, 5, rows).astype('float64'),
+    })
+    data_frame.loc[rng.random(rows) < 0.1, 'Value'] = np.nan
+    data_frame.loc[data_frame['Indicator'] == 'Indicator 5', 'Value'] = 2.0
+    return data_frame
+
+
+def reshape(rows: pd.DataFrame) -> pd.DataFrame:
+    """Sums the values of every cell like pivot_table(aggfunc='sum'), cells with no value stay missing."""
+    return rows.groupby(['State', 'Indicator'])['Value'].sum(min_count=1).unstack('Indicator')
+
+
+def assert_matches(accumulator: CorrelationAccumulator, table: pd.DataFrame, min_periods: int = 1):
+    corr, counts = accumulator.correlation(min_periods=min_periods)
+    labels = accumulator.labels
+    expected = table.reindex(columns=labels)
+    np.testing.assert_allclose(corr, expected.corr(min_periods=min_periods).to_numpy(),
+                               rtol=0, atol=TOLERANCE, equal_nan=True)
+    present = expected.notna().to_numpy(dtype='int64')
+    np.testing.assert_array_equal(counts, present.T @ present)
+
+
+@pytest.mark.parametrize('min_periods', [1, 8])
+def test_from_table_matches_pandas(min_periods):
+    table = reshape(long_rows())
+    assert_matches(CorrelationAccumulator.from_table(table), table, min_periods=min_periods)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_added_rows_match_pandas(seed):
+    rows = long_rows(seed=seed)
+    accumulator = CorrelationAccumulator()
+    accumulator.add_rows(rows)
+    assert_matches(accumulator, reshape(rows))
+
+
+def test_rows_added_to_a_table_match_pandas():
+    rows = long_rows(rows=600)
+    first, later = rows.iloc[:300], rows.iloc[300:]
+    accumulator = CorrelationAccumulator.from_table(reshape(first))
+    # the correlation is cached between adds, so ask for it part way through too
+    accumulator.add_rows(later.iloc[:150])
+    assert_matches(accumulator, reshape(rows.iloc[:450]))
+    accumulator.add_rows(later.iloc[150:])
+    assert_matches(accumulator, reshape(rows))
+
+
+def test_new_states_and_indicators_grow_the_accumulator():
+    rows = long_rows(rows=200)
+    accumulator = CorrelationAccumulator(capacity=1)
+    accumulator.add_rows(rows)
+    extra = pd.DataFrame({'State': ['New State', 'New State', 'State 00'],
+                          'Indicator': ['Indicator 0', 'New Indicator', 'New Indicator'],
+                          'Value': [1.0, 4.0, 2.5]})
+    accumulator.add_rows(extra)
+    assert 'New Indicator' in accumulator.labels
+    assert_matches(accumulator, reshape(pd.concat([rows, extra])))
+
+
+def test_missing_values_are_left_out():
+    accumulator = CorrelationAccumulator()
+    accumulator.add('Lagos', 'Infant Mortality rate', np.nan)
+    accumulator.add('Lagos', 'Infant Mortality rate', None)
+    assert len(accumulator.labels) == 0
@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboards.correlation.correlation_cube import CorrelationCube
+
+TOLERANCE = 1e-6
+
+
+def long_rows(rows: int = 1200, seed: int = 0, sources=('IHME', 'DHS'), periods=(2014, 2015)) -> pd.DataFrame:
+    """Long format rows with several rows landing in some cells, missing values and ties."""
+    rng = np.random.default_rng(seed)
+    data_frame = pd.DataFrame({
+        'Indicator': rng.choice([f"Indicator {i}" for i in range(5)], rows),
+        'Period': rng.choice(list(periods), rows),
+        'State': rng.choice([f"State {i:02d}" for i in range(15)], rows),
+        'LGA': 'All',
+        'Source': rng.choice(list(sources), rows),
+        'Value': rng.integers(0, 6, rows).astype('float64'),
+    })
+    data_frame.loc[rng.random(rows) < 0.1, 'Value'] = np.nan
+    return data_frame
+
+
+def expected_corr(rows: pd.DataFrame, source, period, labels) -> pd.DataFrame:
+    group = rows[(rows['Source'] == source) & (rows['Period'] == period)]
+    table = group.groupby(['State', 'Indicator'])['Value'].sum(min_count=1).unstack('Indicator')
+    return table.reindex(columns=labels).corr()
+
+
+def test_appended_rows_match_a_rebuilt_cube():
+    rows = long_rows()
+    new_rows = pd.concat([long_rows(rows=300, seed=1), long_rows(rows=100, seed=2, periods=(2016,))])
+    cube = CorrelationCube(rows)
+    updated = cube.append(new_rows)
+    assert set(updated) == set(map(tuple, new_rows[['Source', 'Period']].drop_duplicates().to_numpy()))
+
+    everything = pd.concat([rows, new_rows], ignore_index=True)
+    indicators = sorted(everything['Indicator'].unique())
+    for source, period in updated:
+        result = cube.correlation(source, period, indicators)
+        expected = expected_corr(everything, source, period, list(result.columns))
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+def test_reads_while_appending_see_whole_appends():
+    rows = long_rows()
+    cube = CorrelationCube(rows)
+    indicators = sorted(rows['Indicator'].unique())
+    batches = [long_rows(rows=50, seed=seed, sources=('IHME',), periods=(2014,)) for seed in range(1, 30)]
+    # every matrix a reader can see is the one after some number of whole batches
+    allowed = []
+    appended = rows
+    for batch in [None] + batches:
+        if batch is not None:
+            appended = pd.concat([appended, batch], ignore_index=True)
+        allowed.append(expected_corr(appended, 'IHME', 2014, indicators).to_numpy())
+
+    seen = []
+
+    def read():
+        for _ in range(200):
+            seen.append(cube.correlation('IHME', 2014, indicators).to_numpy())
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for batch in batches:
+        cube.append(batch)
+    reader.join()
+
+    for matrix in seen:
+        assert any(np.allclose(matrix, allowed_matrix, rtol=0, atol=TOLERANCE, equal_nan=True)
+                   for allowed_matrix in allowed)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards.correlation.correlation_engine import (correlate, masked_values, pairwise_counts, pearson_from_sums,
+                                                       sorted_groups, spearman_matrix, subset_ranks)
+
+TOLERANCE = 1e-9
+
+
+def wide_table(rows: int = 40, missing: float = 0.25, seed: int = 0) -> pd.DataFrame:
+    """
+    A reshaped table with the awkward columns a sheet has: small integer values so there are
+    ties, missing cells, a constant column, a column constant on the rows it shares with
+    another, and a column with a single value.
+    """
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame(rng.integers(0, 5, (rows, 6)).astype('float64'),
+                         columns=[f"Indicator {i}" for i in range(6)])
+    table = table.mask(rng.random(table.shape) < missing)
+    table['Continuous'] = rng.normal(50, 10, rows)
+    table['Constant'] = 3.0
+    table['Single'] = np.nan
+    table.loc[0, 'Single'] = 1.0
+    # constant on the rows where Sparse has a value
+    table['Sparse'] = np.where(np.arange(rows) < 4, np.arange(rows) * 2.0, np.nan)
+    table['Partly constant'] = np.where(np.arange(rows) < 4, 7.0, np.arange(rows, dtype='float64'))
+    return table
+
+
+def assert_frames_close(result: pd.DataFrame, expected: pd.DataFrame):
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+    assert list(result.index) == list(expected.index)
+    assert list(result.columns) == list(expected.columns)
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman', 'kendall'])
+@pytest.mark.parametrize('missing', [0.0, 0.25])
+@pytest.mark.parametrize('min_periods', [1, 10])
+def test_correlate_matches_pandas(method, missing, min_periods):
+    table = wide_table(missing=missing)
+    if not missing:
+        table = table.drop(columns=['Single', 'Sparse'])
+    result = correlate(table, method=method, min_periods=min_periods)
+    assert_frames_close(result['corr'], table.corr(method=method, min_periods=min_periods))
+
+    present = table.notna().to_numpy(dtype='int64')
+    np.testing.assert_array_equal(result['counts'].to_numpy(), present.T @ present)
+
+
+def test_correlate_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        correlate(wide_table(), method='cosine')
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_spearman_matrix_matches_pandas(seed):
+    table = wide_table(rows=25, missing=0.4, seed=seed)
+    corr, counts = spearman_matrix(table.to_numpy())
+    np.testing.assert_allclose(corr, table.corr(method='spearman').to_numpy(),
+                               rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+def test_subset_ranks_match_pandas_rank():
+    table = wide_table(rows=30, missing=0.3)
+    values = table.to_numpy()
+    present = ~np.isnan(values)
+    order, starts, ends = sorted_groups(values)
+    rng = np.random.default_rng(1)
+    rows = (rng.random(values.shape) < 0.6).astype('float64')
+
+    ranks = subset_ranks(order, starts, ends, rows)
+    for column in range(values.shape[1]):
+        kept = present[:, column] & (rows[:, column] > 0)
+        expected = pd.Series(values[kept, column]).rank(method='average').to_numpy()
+        np.testing.assert_allclose(ranks[kept, column], expected, rtol=0, atol=TOLERANCE)
+
+
+def test_subset_ranks_of_one_column_among_several_subsets():
+    table = wide_table(rows=30, missing=0.3)
+    values = table.to_numpy()
+    order, starts, ends = sorted_groups(values)
+    mask = (~np.isnan(values)).astype('float64')
+
+    ranks = subset_ranks(order[:, [0]], starts[:, [0]], ends[:, [0]], mask)
+    for other in range(values.shape[1]):
+        kept = (mask[:, 0] > 0) & (mask[:, other] > 0)
+        expected = pd.Series(values[kept, 0]).rank(method='average').to_numpy()
+        np.testing.assert_allclose(ranks[kept, other], expected, rtol=0, atol=TOLERANCE)
+
+
+def test_pearson_from_sums_matches_pandas():
+    table = wide_table(missing=0.25)
+    values, mask = masked_values(table)
+    corr = pearson_from_sums(pairwise_counts(mask), values.T @ mask, (values * values).T @ mask,
+                             values.T @ values)
+    np.testing.assert_allclose(corr, table.corr().to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+def test_pearson_from_sums_min_periods():
+    table = wide_table(missing=0.25)
+    values, mask = masked_values(table)
+    counts = pairwise_counts(mask)
+    corr = pearson_from_sums(counts, values.T @ mask, (values * values).T @ mask, values.T @ values,
+                             min_periods=30)
+    assert np.isnan(corr[counts < 30]).all()
+    np.testing.assert_allclose(corr, table.corr(min_periods=30).to_numpy(),
+                               rtol=0, atol=TOLERANCE, equal_nan=True)
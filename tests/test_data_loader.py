@@ -0,0 +1,112 @@
+import hashlib
+import os
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards import data_loader
+
+
+def test_file_fingerprint_only_hashes_again_when_the_file_changes(tmp_path):
+    path = tmp_path / "sheet.csv"
+    path.write_text("Indicator,Value\nInfant Mortality rate,71\n")
+
+    with mock.patch.object(data_loader.hashlib, 'sha1', wraps=hashlib.sha1) as sha1:
+        fingerprint = data_loader.file_fingerprint(str(path))
+        assert data_loader.file_fingerprint(str(path)) == fingerprint
+        assert sha1.call_count == 1
+
+        path.write_text("Indicator,Value\nInfant Mortality rate,72\n")
+        stat = os.stat(path)
+        # make sure the modification time moves on even on a coarse clock
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        changed = data_loader.file_fingerprint(str(path))
+        assert changed != fingerprint
+        assert sha1.call_count == 2
+
+
+def long_rows(rows: int = 600, seed: int = 0) -> pd.DataFrame:
+    """Long format rows laid out like the correlation input sheet."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Indicator': rng.choice([f"Indicator {i}" for i in range(4)], rows),
+        'Period': rng.integers(2014, 2018, rows),
+        'State': rng.choice([f"State {i:02d}" for i in range(6)], rows),
+        'LGA': 'All',
+        'Source': rng.choice(['IHME', 'DHS', 'NHMIS'], rows),
+        'Value': rng.integers(0, 100, rows).astype('float64'),
+    })
+
+
+FILTERS = [
+    {'Source': ['IHME', 'NHMIS'], 'Period': 2015},
+    {'Source': 'DHS', 'Period': [2014, 2017], 'Indicator': ['Indicator 1', 'Indicator 3']},
+    {'Indicator': 'Indicator 2'},
+    {'Source': 'MICS'},
+]
+
+
+def expected_rows(rows: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    mask = np.ones(len(rows), dtype=bool)
+    for column, value in filters.items():
+        mask &= rows[column].isin(value if isinstance(value, list) else [value]).to_numpy()
+    return rows[mask]
+
+
+def sorted_rows(data_frame: pd.DataFrame) -> pd.DataFrame:
+    return data_frame.sort_values(list(data_frame.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('partitioned', [False, True])
+@pytest.mark.parametrize('filters', FILTERS)
+def test_filtered_load_keeps_only_the_matching_rows(tmp_path, filters, partitioned):
+    rows = long_rows()
+    path = tmp_path / "sheet.csv"
+    rows.to_csv(path, index=False)
+
+    loaded = data_loader.load_sheet(str(path), cache_dir=str(tmp_path / "cache"), compact=False,
+                                    filters=filters, partitioned=partitioned)
+    expected = expected_rows(rows, filters)
+    assert list(loaded.columns) == list(rows.columns)
+    assert len(loaded) == len(expected)
+    if len(expected):
+        pd.testing.assert_frame_equal(sorted_rows(loaded), sorted_rows(expected), check_dtype=False)
+
+
+def test_streamed_workbook_rows_match_read_excel(tmp_path):
+    rows = long_rows(rows=200)
+    path = tmp_path / "sheet.xlsx"
+    rows.to_excel(path, sheet_name="Correlation Input Sheet", index=False)
+
+    filters = FILTERS[0]
+    streamed = data_loader.stream_sheet(str(path), filters=filters, chunk_rows=37)
+    expected = expected_rows(pd.read_excel(path, "Correlation Input Sheet"), filters).reset_index(drop=True)
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_partitions_from_a_crashed_run_never_show_up(tmp_path):
+    rows = long_rows()
+    path = tmp_path / "sheet.csv"
+    rows.to_csv(path, index=False)
+    output_dir = tmp_path / "partitions"
+    write_cache = data_loader.write_cache
+    calls = []
+
+    def crash_part_way(data_frame, directory):
+        calls.append(directory)
+        if len(calls) == 5:
+            raise OSError("disk full")
+        write_cache(data_frame, directory)
+
+    with mock.patch.object(data_loader, 'write_cache', side_effect=crash_part_way):
+        with pytest.raises(OSError):
+            data_loader.partition_sheet(str(path), output_dir=str(output_dir), chunk_rows=100)
+    # neither the output nor the directory the parts were written to are left behind
+    assert sorted(os.listdir(tmp_path)) == ["sheet.csv"]
+
+    # the next run starts over and writes every partition
+    data_loader.partition_sheet(str(path), output_dir=str(output_dir), chunk_rows=100)
+    assert sorted(os.listdir(tmp_path)) == ["partitions", "sheet.csv"]
+    loaded = data_loader.read_partitions(str(output_dir))
+    pd.testing.assert_frame_equal(sorted_rows(loaded), sorted_rows(rows), check_dtype=False)
@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+from dashboards.figure_cache import FigureCache, compact_figure, plain_array
+
+
+def test_plain_array_rounds_floats_and_leaves_gaps_for_missing_values():
+    assert plain_array(np.array([0.48217534196, np.nan, 1e-12 / 3])) == [0.4821753, None, 3.333333e-13]
+    assert plain_array(np.array([[1.0, np.nan], [2.0 / 3, 4.0]]), digits=3) == [[1.0, None], [0.667, 4.0]]
+    assert plain_array(np.arange(3, dtype='int16')) == [0, 1, 2]
+    assert plain_array(['Abia', 'Lagos']) == ['Abia', 'Lagos']
+
+
+class Figure:
+    """Stands in for a plotly figure, which gives its dictionary through to_dict."""
+
+    def __init__(self, figure: dict):
+        self.figure = figure
+
+    def to_dict(self):
+        return self.figure
+
+
+def test_compact_figure_rounds_the_numbers_of_every_trace():
+    figure = Figure({'data': [{'type': 'heatmap', 'z': np.array([[0.123456789, np.nan]]), 'x': ['a', 'b']},
+                              {'type': 'scatter', 'y': np.array([2.0 / 3]), 'marker': {'color': 'red'}}],
+                     'layout': {'title': {'text': 'IHME 2017'}}})
+    compacted = compact_figure(figure)
+    assert compacted['data'][0]['z'] == [[0.1234568, None]] and compacted['data'][0]['x'] == ['a', 'b']
+    assert compacted['data'][1] == {'type': 'scatter', 'y': [0.6666667], 'marker': {'color': 'red'}}
+    assert compacted['layout'] == {'title': {'text': 'IHME 2017'}}
+    json.dumps(compacted)
+
+
+def test_memoized_callback_makes_each_figure_once():
+    cache = FigureCache(max_size=2)
+    calls = []
+
+    @cache.memoize
+    def heatmap_cb(source, year):
+        calls.append((source, year))
+        return Figure({'data': [{'z': np.full((2, 2), year / 3)}], 'layout': {'title': {'text': source}}})
+
+    first = heatmap_cb('IHME', 2017)
+    assert first == {'data': [{'z': [[672.3333] * 2] * 2}], 'layout': {'title': {'text': 'IHME'}}}
+    # every caller gets its own copy, so changing one doesn't change what's cached
+    first['layout']['title']['text'] = 'changed'
+    assert heatmap_cb('IHME', np.int64(2017))['layout']['title']['text'] == 'IHME'
+    assert calls == [('IHME', 2017)]
+
+    heatmap_cb('DHS', 2017)
+    heatmap_cb('NHMIS', 2017)
+    # the least recently used figure was evicted
+    heatmap_cb('IHME', 2017)
+    assert calls == [('IHME', 2017), ('DHS', 2017), ('NHMIS', 2017), ('IHME', 2017)]
+    assert cache.stats()['size'] == 2
+    assert cache.nbytes() == sum(len(json.dumps(heatmap_cb(source, 2017))) for source in ('NHMIS', 'IHME'))
@@ -0,0 +1,116 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+from dashboards.prediction import forecast_executor
+from dashboards.prediction.forecast_executor import ForecastExecutor, report_progress
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def executor():
+    executor = ForecastExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def block_worker(executor: ForecastExecutor) -> threading.Event:
+    """Keeps the only worker busy until the event it gives is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def wait():
+        started.set()
+        release.wait(TIMEOUT)
+
+    executor.submit('blocker', wait)
+    assert started.wait(TIMEOUT)
+    return release
+
+
+def test_identical_forecasts_are_run_once(executor):
+    release = block_worker(executor)
+    calls = []
+
+    def forecast(year):
+        calls.append(year)
+        return year + 1
+
+    first = executor.submit(('Abia', 2020), forecast, 2020)
+    second = executor.submit(('Abia', 2020), forecast, 2020)
+    assert first == second
+    assert executor.status(first)['state'] == 'queued'
+    release.set()
+
+    assert executor.result(first, TIMEOUT) == executor.result(second, TIMEOUT) == 2021
+    assert calls == [2020]
+    # the job is forgotten once every request has fetched its result
+    assert executor.status(first)['state'] == 'unknown'
+
+
+def test_a_job_nobody_waits_for_is_cancelled_before_it_starts(executor):
+    release = block_worker(executor)
+    calls = []
+    shared = executor.submit('shared', calls.append, 'shared')
+    executor.submit('shared', calls.append, 'shared')
+    alone = executor.submit('alone', calls.append, 'alone')
+
+    # a slider that moved on gives up the job it asked for
+    newer = executor.submit('newer', calls.append, 'newer', supersedes=alone)
+    executor.cancel(shared)
+    assert executor.status(alone)['state'] == 'unknown'
+    assert executor.status(shared)['state'] == 'queued'
+    release.set()
+
+    with pytest.raises(CancelledError):
+        executor.result(alone, TIMEOUT)
+    executor.result(shared, TIMEOUT)
+    executor.result(newer, TIMEOUT)
+    assert calls == ['shared', 'newer']
+
+
+def test_status_shows_the_progress_the_job_reports(executor):
+    reported, release = threading.Event(), threading.Event()
+
+    def forecast():
+        report_progress('fitting the model', 0.2)
+        reported.set()
+        release.wait(TIMEOUT)
+        return 'forecast'
+
+    job_id = executor.submit('forecast', forecast)
+    assert reported.wait(TIMEOUT)
+    status = executor.status(job_id)
+    assert (status['state'], status['stage'], status['progress']) == ('running', 'fitting the model', 0.2)
+    release.set()
+    assert executor.result(job_id, TIMEOUT) == 'forecast'
+
+
+def test_failures_are_raised_to_the_request(executor):
+    job_id = executor.submit('failing', lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        executor.result(job_id, TIMEOUT)
+
+
+def test_results_never_fetched_are_forgotten_after_max_age(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(forecast_executor.time, 'monotonic', lambda: now[0])
+    executor = ForecastExecutor(max_workers=1, max_age=60)
+    try:
+        job_id = executor.submit('forecast', lambda: 'forecast')
+        job = executor._jobs[job_id]
+        job.future.result(TIMEOUT)
+        # the job is marked finished by a callback that runs after the result is set
+        for _ in range(TIMEOUT * 100):
+            if job.finished is not None:
+                break
+            threading.Event().wait(0.01)
+        assert job.finished == 100.0
+        now[0] += 30
+        executor.submit('another', lambda: None)
+        assert executor.status(job_id)['state'] == 'done'
+        now[0] += 31
+        executor.submit('yet another', lambda: None)
+        assert executor.status(job_id)['state'] == 'unknown'
+    finally:
+        executor.shutdown()
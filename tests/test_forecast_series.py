@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from dashboards.prediction.batch_forecast import series_tasks
+from dashboards.prediction.pooled_forecast import series_matrix
+from dashboards.tensor_store import TensorStore
+
+
+def lga_rows(seed: int = 0) -> pd.DataFrame:
+    """A coverage indicator with an 'All' row and LGA rows for most years, in no particular order."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for state in ['Abia', 'Lagos']:
+        for year in range(2000, 2020):
+            lgas = ['All'] + [f"LGA {i}" for i in range(rng.integers(0, 5))]
+            frames.append(pd.DataFrame({'Indicator': 'ANC Coverage', 'Period': year, 'State': state,
+                                        'LGA': lgas, 'Source': 'NHMIS',
+                                        'Value': rng.uniform(20, 60, len(lgas)).round(1)}))
+    rows = pd.concat(frames, ignore_index=True)
+    rows.loc[rng.random(len(rows)) < 0.05, 'Value'] = np.nan
+    return rows.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def test_forecast_series_average_the_rows_of_a_period():
+    rows = lga_rows()
+    series = TensorStore(rows).series_rows('NHMIS', 'ANC Coverage', 'Abia')
+    expected = rows[rows['State'] == 'Abia'].groupby('Period')['Value'].mean()
+    np.testing.assert_array_equal(series['Period'].to_numpy(), expected.index.to_numpy())
+    np.testing.assert_allclose(series['Value'].to_numpy(), expected.to_numpy(), rtol=1e-6)
+    # a rate stays a rate instead of adding up past 100
+    assert series['Value'].max() <= 60
+
+
+def test_batch_and_pooled_forecasts_read_the_same_series():
+    rows = lga_rows(seed=1)
+    keys, years, matrix = series_matrix(rows)
+    pooled = {tuple(key): matrix[position] for position, key in enumerate(keys.itertuples(index=False))}
+    tasks = series_tasks(rows, forecast_years=[2020])
+    assert len(tasks) == len(pooled)
+    for (indicator, state, source, _), periods, values, _ in tasks:
+        row = pooled[(indicator, state, source)]
+        np.testing.assert_allclose(values, row[np.searchsorted(years, periods)], rtol=1e-6)
@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboards.prediction.forecast_store import ForecastStore, SeriesBuffer
+
+KEY = ('Infant Mortality rate', 'Abia', 'NHIS', 'fingerprint')
+
+
+def test_buffer_grows_without_losing_forecasts():
+    buffer = SeriesBuffer(capacity=2)
+    for year in range(2020, 2045):
+        buffer.append([year], [year / 10])
+    years, values = buffer.view()
+    np.testing.assert_array_equal(years, np.arange(2020, 2045))
+    np.testing.assert_allclose(values, np.arange(2020, 2045) / 10)
+    assert len(buffer.years) < 2 * 25
+
+
+def test_stored_years_are_not_forecast_again():
+    store = ForecastStore()
+    store.append(KEY, [2018, 2019], [1.0, 2.0])
+    assert store.missing_years(KEY, [2017, 2018, 2020]) == [2017, 2020]
+    assert store.missing_years(KEY[:3] + ('another fingerprint',), [2018]) == [2018]
+
+    # a year that is already stored keeps the value it was first given
+    store.append(KEY, [2019, 2020], [5.0, 3.0])
+    years, values = store.predictions(KEY)
+    np.testing.assert_array_equal(years, [2018, 2019, 2020])
+    np.testing.assert_array_equal(values, [1.0, 2.0, 3.0])
+
+
+def test_rows_are_laid_out_like_the_sheet():
+    store = ForecastStore()
+    store.append(KEY, [2018, 2019, 2020], [1.0, 2.0, 3.0])
+    rows = store.rows(KEY, [2020, 2018])
+    assert list(rows.columns) == ['Indicator', 'Period', 'State', 'LGA', 'Source', 'Value']
+    assert rows['Period'].tolist() == [2018, 2020] and rows['Value'].tolist() == [1.0, 3.0]
+    assert (rows['Indicator'] == KEY[0]).all() and (rows['State'] == KEY[1]).all()
+    assert (rows['LGA'] == 'All').all() and (rows['Source'] == KEY[2]).all()
+    assert store.rows(('Indicator', 'Lagos', 'NHIS', 'fingerprint')).empty
+
+
+def test_appends_from_several_threads_are_all_kept():
+    store = ForecastStore()
+
+    def forecast(first_year):
+        for year in range(first_year, first_year + 200):
+            store.append(KEY, [year], [float(year)])
+
+    threads = [threading.Thread(target=forecast, args=(first_year,)) for first_year in range(2000, 3600, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    years, values = store.predictions(KEY)
+    np.testing.assert_array_equal(np.sort(years), np.arange(2000, 3600))
+    np.testing.assert_array_equal(years, values)
+
+
+def test_clear_drops_every_series():
+    store = ForecastStore()
+    store.append(KEY, [2018], [1.0])
+    assert len(store) == 1 and store.nbytes > 0
+    store.clear()
+    assert len(store) == 0 and store.missing_years(KEY, [2018]) == [2018]
+
+
+def test_forecasting_leaves_the_table_as_it_was(tmp_path, monkeypatch):
+    from dashboards.prediction import operations
+    from dashboards.prediction.model_cache import ForecastModelCache
+    monkeypatch.setattr(operations, 'model_cache', ForecastModelCache(str(tmp_path)))
+    monkeypatch.setattr(operations, 'forecast_store', ForecastStore())
+    rng = np.random.default_rng(0)
+    table = pd.DataFrame({'Indicator': 'Infant Mortality rate', 'Period': np.arange(1995, 2018), 'State': 'Abia',
+                          'LGA': 'All', 'Source': 'NHIS', 'Value': np.cumsum(rng.normal(-1, 1, 23)) + 90})
+    before = table.copy()
+
+    forecast = operations.prediction_operation.__wrapped__(
+        dataframe=table, indicator_column='Indicator', indicator_query='Infant Mortality rate',
+        state_column='State', state_query='Abia', source_column='Source', source_query='NHIS',
+        columns_to_drop=['Indicator', 'State', 'LGA', 'Source'], period_column='Period',
+        values_column='Value', forecast_years=[2018, 2019])
+    forecast = pd.concat(list(forecast))
+
+    assert forecast.index.year.tolist()[-2:] == [2018, 2019]
+    pd.testing.assert_frame_equal(table, before)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from dashboards.data_loader import frame_fingerprint, loaded_fingerprint, tag_frame
+from dashboards.result_cache import normalize_argument
+from dashboards.tensor_store import TensorStore
+
+
+def sheet() -> pd.DataFrame:
+    return tag_frame(pd.DataFrame({'Indicator': ['A', 'A', 'B', 'B'], 'Period': [2015, 2016, 2015, 2016],
+                                   'State': 'Abia', 'LGA': 'All', 'Source': 'IHME',
+                                   'Value': [1.0, 2.0, 3.0, 4.0]}), 'sheet-fingerprint')
+
+
+def test_frames_made_from_a_tagged_frame_are_not_taken_for_it():
+    data_frame = sheet()
+    assert loaded_fingerprint(data_frame) == frame_fingerprint(data_frame) == 'sheet-fingerprint'
+    derived = [data_frame[data_frame['Indicator'] == 'A'], data_frame.head(2), data_frame.copy(),
+               data_frame.drop(columns=['LGA']), pd.concat([data_frame, data_frame])]
+    for frame in derived:
+        # pandas copies the attrs onto them
+        assert frame.attrs.get('fingerprint') == 'sheet-fingerprint'
+        assert loaded_fingerprint(frame) is None
+        assert frame_fingerprint(frame) != 'sheet-fingerprint'
+
+
+def test_content_fingerprints_follow_the_data():
+    data_frame = sheet()
+    assert frame_fingerprint(data_frame.copy()) == frame_fingerprint(data_frame.copy())
+    edited = data_frame.copy()
+    edited.loc[0, 'Value'] = 10.0
+    assert frame_fingerprint(edited) != frame_fingerprint(data_frame.copy())
+    assert normalize_argument(edited) != normalize_argument(data_frame)
+
+
+def test_tensor_store_of_a_filtered_frame_has_only_its_rows():
+    data_frame = sheet()
+    whole = TensorStore.of(data_frame)
+    filtered = TensorStore.of(data_frame[data_frame['Indicator'] == 'A'])
+    assert TensorStore.of(data_frame) is whole
+    assert filtered is not whole
+    assert list(filtered.labels['Indicator']) == ['A']
+    np.testing.assert_array_equal(filtered.series('IHME', 'A', 'Abia')[0], [1.0, 2.0])
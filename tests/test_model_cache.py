@@ -0,0 +1,67 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from dashboards.prediction import model_cache
+from dashboards.prediction.model_cache import ForecastModelCache, file_lock
+
+
+def save_orders(cache_dir: str, worker: int, orders: int):
+    """Saves orders of series only this worker forecasts, like a batch_forecast worker does."""
+    cache = ForecastModelCache(cache_dir)
+    for series in range(orders):
+        cache.save_order(('Indicator', f"State {worker}", f"Series {series}", 'fingerprint'), (1, 0, series))
+
+
+def test_orders_saved_by_workers_at_the_same_time_are_all_kept(tmp_path):
+    workers, orders = 4, 25
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(save_orders, [str(tmp_path)] * workers, range(workers), [orders] * workers))
+
+    saved = ForecastModelCache(str(tmp_path)).read_orders()
+    assert len(saved) == workers * orders
+    assert saved[ForecastModelCache.series_key(('Indicator', 'State 3', 'Series 7', 'fingerprint'))] == [1, 0, 7]
+
+
+def test_file_lock_is_held_until_the_block_ends(tmp_path):
+    lock_path = str(tmp_path / "orders.json.lock")
+    acquired = threading.Event()
+
+    def take_lock():
+        with file_lock(lock_path):
+            acquired.set()
+
+    with file_lock(lock_path):
+        other = threading.Thread(target=take_lock)
+        other.start()
+        assert not acquired.wait(0.2)
+    other.join(5)
+    assert acquired.is_set()
+
+
+def yearly_series(years: int = 20) -> pd.Series:
+    rng = np.random.default_rng(0)
+    index = pd.to_datetime([f"{year}-01-01" for year in range(2000, 2000 + years)])
+    return pd.Series(np.cumsum(rng.normal(1, 1, years)), index=index)
+
+
+def test_a_saved_order_skips_the_search(tmp_path):
+    key = ('Indicator', 'Abia', 'NHMIS', 'fingerprint')
+    series = yearly_series()
+    cache = ForecastModelCache(str(tmp_path))
+    model_fit, last_year = cache.fit(key, series)
+    assert last_year == 2019 and cache.get(key)[0] is model_fit
+    order = cache.read_orders()[ForecastModelCache.series_key(key)]
+
+    # a worker starting later reads the order off disk instead of searching for it again
+    restarted = ForecastModelCache(str(tmp_path))
+    assert restarted.get(key) is None
+    with mock.patch.object(model_cache, 'arima_value_generator') as search:
+        refit, _ = restarted.fit(key, series)
+    search.assert_not_called()
+    assert list(refit.model.order) == order
+    # the temporary files the orders were written to are renamed over the file of orders
+    assert sorted(os.listdir(tmp_path)) == ["arima_orders.json", "arima_orders.json.lock"]
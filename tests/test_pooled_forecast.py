@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from dashboards.prediction.pooled_forecast import PooledForecaster, fill_forward, lag_matrix
+
+
+def gappy_matrix(seed: int = 0) -> np.ndarray:
+    """Series with gaps, missing first and last years, and a series without any value."""
+    rng = np.random.default_rng(seed)
+    matrix = rng.uniform(0, 100, (8, 15))
+    matrix[rng.random(matrix.shape) < 0.25] = np.nan
+    matrix[0, :3] = np.nan
+    matrix[1, -4:] = np.nan
+    matrix[2] = np.nan
+    return matrix
+
+
+def test_fill_forward_matches_pandas_up_to_the_last_value():
+    matrix = gappy_matrix()
+    expected = pd.DataFrame(matrix).T.fillna(method='ffill').T.to_numpy()
+    for row in range(len(matrix)):
+        # the years after the last value of a series are left for the forecasts
+        observed = np.flatnonzero(~np.isnan(matrix[row]))
+        expected[row, observed[-1] + 1 if len(observed) else 0:] = np.nan
+    np.testing.assert_array_equal(fill_forward(matrix), expected)
+
+
+def test_lag_matrix_matches_shifting_each_series():
+    matrix = gappy_matrix(seed=1)
+    lags = 3
+    features, targets, rows, columns = lag_matrix(matrix, lags)
+
+    expected = []
+    for row in range(len(matrix)):
+        series = pd.Series(matrix[row])
+        # series_to_supervised's layout, the latest lag first
+        shifted = pd.concat([series.shift(lag) for lag in range(1, lags + 1)] + [series], axis=1).dropna()
+        expected.extend((row, column, *values) for column, values in zip(shifted.index, shifted.to_numpy()))
+    expected = np.array(expected)
+
+    np.testing.assert_array_equal(rows, expected[:, 0])
+    np.testing.assert_array_equal(columns, expected[:, 1])
+    np.testing.assert_array_equal(features, expected[:, 2:2 + lags])
+    np.testing.assert_array_equal(targets, expected[:, -1])
+    np.testing.assert_array_equal(matrix[rows, columns], targets)
+
+
+def test_lag_matrix_of_series_shorter_than_the_lags_is_empty():
+    features, targets, rows, columns = lag_matrix(np.ones((4, 3)), 3)
+    assert features.shape == (0, 3) and len(targets) == len(rows) == len(columns) == 0
+
+
+def autoregressive_rows(years: int = 20) -> pd.DataFrame:
+    """Series following the same recursion, x = 0.6 * x[-1] + 0.3 * x[-2], on different scales."""
+    frames = []
+    for state, (first, second) in [('Abia', (1.0, 2.0)), ('Lagos', (300.0, 250.0)), ('Kano', (40.0, 45.0))]:
+        values = [first, second]
+        while len(values) < years:
+            values.append(0.6 * values[-1] + 0.3 * values[-2])
+        # Kano's series ends earlier, so its last years have to be forecast too
+        last = years - 3 if state == 'Kano' else years
+        frames.append(pd.DataFrame({'Indicator': 'Immunisation', 'Period': np.arange(2000, 2000 + last),
+                                    'State': state, 'LGA': 'All', 'Source': 'NHMIS', 'Value': values[:last]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def continued(values: list, steps: int) -> list:
+    values = list(values)
+    for _ in range(steps):
+        values.append(0.6 * values[-1] + 0.3 * values[-2])
+    return values[-steps:]
+
+
+def test_linear_forecasts_continue_the_recursion():
+    rows = autoregressive_rows()
+    forecaster = PooledForecaster.from_table(rows, model='linear', lags=2)
+
+    years, values = forecaster.forecast_series(('Immunisation', 'Kano', 'NHMIS'), [2015, 2018, 2019, 2021])
+    kano = rows[rows['State'] == 'Kano']['Value'].tolist()
+    np.testing.assert_array_equal(years, [2018, 2019, 2021])
+    np.testing.assert_allclose(values, np.array(continued(kano, 5))[[1, 2, 4]], rtol=1e-6)
+
+    table = forecaster.forecast_table([2019, 2020])
+    lagos = rows[rows['State'] == 'Lagos']['Value'].tolist()
+    assert sorted(map(tuple, table[['State', 'Period']].to_numpy().tolist())) == \
+        [('Abia', 2020), ('Kano', 2019), ('Kano', 2020), ('Lagos', 2020)]
+    lagos_2020 = table[(table['State'] == 'Lagos') & (table['Period'] == 2020)]['Value'].item()
+    np.testing.assert_allclose(lagos_2020, continued(lagos, 1)[0], rtol=1e-6)
+    assert forecaster.forecast_series(('Immunisation', 'Oyo', 'NHMIS'), [2020])[0].size == 0
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards import result_cache as result_cache_module
+from dashboards.result_cache import ResultCache, UncacheableArgument, normalize_argument
+
+
+def test_equivalent_arguments_normalize_the_same():
+    assert normalize_argument(['NHMIS', 'IHME']) == normalize_argument(['IHME', 'NHMIS'])
+    assert normalize_argument({'b': 1, 'a': 2}) == normalize_argument({'a': 2, 'b': 1})
+    assert normalize_argument(np.int64(2021)) == 2021
+    assert normalize_argument([np.float64(0.5)]) == (0.5,)
+
+
+def test_hashable_objects_are_keyed_by_value():
+    class Counter:
+        pass
+
+    counter = Counter()
+    # the key holds the object itself, so its id can't be handed to another object while it's cached
+    assert normalize_argument(counter) is counter
+
+
+def test_unhashable_arguments_without_a_fingerprint_cant_be_keyed():
+    with pytest.raises(UncacheableArgument):
+        normalize_argument(np.arange(3))
+    with pytest.raises(UncacheableArgument):
+        normalize_argument([pd.Series([1, 2])])
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ResultCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)
+    cache.put('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1) and cache.get('c') == (True, 3)
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'evictions': 1, 'size': 2}
+
+
+def test_results_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache_module.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.put('a', 1)
+    now[0] += 9
+    assert cache.get('a') == (True, 1)
+    now[0] += 2
+    assert cache.get('a') == (False, None)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_memoized_function_runs_once_per_query():
+    cache = ResultCache()
+    calls = []
+
+    @cache.memoize
+    def operation(year, sources):
+        calls.append(year)
+        return year, sorted(sources)
+
+    assert operation(2021, ['IHME', 'NHMIS']) == operation(np.int64(2021), ['NHMIS', 'IHME'])
+    assert calls == [2021]
+    operation(2020, ['IHME'])
+    assert calls == [2021, 2020]
+
+
+def test_memoized_generators_can_be_read_again():
+    cache = ResultCache()
+    calls = []
+
+    @cache.memoize
+    def operation(year):
+        calls.append(year)
+        yield year
+        yield year + 1
+
+    assert list(operation(2020)) == [2020, 2021]
+    assert list(operation(2020)) == [2020, 2021]
+    assert calls == [2020]
+
+    @cache.memoize
+    def returns_generator(year):
+        calls.append(year)
+        return (value for value in (year, year + 1))
+
+    assert list(returns_generator(2000)) == list(returns_generator(2000)) == [2000, 2001]
+    assert calls == [2020, 2000]
+
+
+def test_uncacheable_calls_run_without_the_cache():
+    cache = ResultCache()
+    calls = []
+
+    @cache.memoize
+    def total(values):
+        calls.append(1)
+        return float(np.sum(values))
+
+    assert total(np.arange(3)) == total(np.arange(3)) == 3.0
+    assert len(calls) == 2
+    assert cache.stats()['size'] == 0
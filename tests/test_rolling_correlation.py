@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards.correlation.rolling_correlation import PeriodTensor
+from dashboards.tensor_store import TensorStore
+
+TOLERANCE = 1e-9
+
+
+def long_rows(rows: int = 1500, seed: int = 0) -> pd.DataFrame:
+    """
+    Long format rows over 12 periods with several rows landing in some cells, missing
+    values, small integer values so there are ties and a constant indicator.
+    """
+    rng = np.random.default_rng(seed)
+    data_frame = pd.DataFrame({
+        'Indicator': rng.choice([f"Indicator {i}" for i in range(5)], rows),
+        'Period': rng.integers(2000, 2012, rows),
+        'State': rng.choice([f"State {i:02d}" for i in range(15)], rows),
+        'Source': rng.choice(['IHME', 'DHS'], rows),
+        'Value': rng.integers(0, 6, rows).astype('float64'),
+    })
+    data_frame.loc[rng.random(rows) < 0.1, 'Value'] = np.nan
+    data_frame.loc[data_frame['Indicator'] == 'Indicator 4', 'Value'] = 1.0
+    return data_frame
+
+
+def pooled_corr(rows: pd.DataFrame, start: int, end: int, labels, min_periods: int = 1) -> pd.DataFrame:
+    """DataFrame.corr over the (period, state) observations of the periods from start to end."""
+    window = rows[rows['Period'].between(start, end)]
+    table = window.groupby(['Period', 'State', 'Indicator'])['Value'].sum(min_count=1).unstack('Indicator')
+    return table.reindex(columns=labels).corr(min_periods=min_periods)
+
+
+@pytest.mark.parametrize('bounds', [(2000, 2011), (2003, 2007), (2005, 2005), (1990, 1995)])
+@pytest.mark.parametrize('min_periods', [1, 20])
+def test_correlation_matches_pooled_pandas(bounds, min_periods):
+    rows = long_rows()
+    tensor = PeriodTensor(rows)
+    result = tensor.correlation(*bounds, min_periods=min_periods)
+    expected = pooled_corr(rows, *bounds, labels=tensor.labels, min_periods=min_periods)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+def test_rolling_matches_pooled_pandas():
+    rows = long_rows(seed=1)
+    tensor = PeriodTensor(rows)
+    rolling = tensor.rolling(window=4, step=2)
+    assert list(rolling) == [(2000, 2003), (2002, 2005), (2004, 2007), (2006, 2009), (2008, 2011)]
+    for (start, end), corr in rolling.items():
+        expected = pooled_corr(rows, start, end, labels=tensor.labels)
+        np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+def test_from_store_matches_rows():
+    rows = long_rows(seed=2)
+    query = {'Source': ['IHME'], 'Indicator': ['Indicator 0', 'Indicator 2', 'Indicator 4']}
+    from_store = PeriodTensor.from_store(TensorStore(rows), query)
+    selected = rows[rows['Source'].isin(query['Source']) & rows['Indicator'].isin(query['Indicator'])]
+    from_rows = PeriodTensor(selected)
+
+    assert list(from_store.labels) == list(from_rows.labels)
+    np.testing.assert_array_equal(from_store.periods, from_rows.periods)
+    for bounds in [(2000, 2011), (2004, 2008)]:
+        np.testing.assert_allclose(from_store.correlation(*bounds).to_numpy(),
+                                   pooled_corr(selected, *bounds, labels=from_store.labels).to_numpy(),
+                                   rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+def test_empty_table_has_no_windows():
+    tensor = PeriodTensor(long_rows().iloc[:0])
+    assert tensor.windows(5) == []
+    windows, corr, counts = tensor.frames(5)
+    assert windows == [] and len(corr) == 0
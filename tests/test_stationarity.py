@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from dashboards.prediction import batch_forecast
+from dashboards.prediction.batch_forecast import series_tasks
+from dashboards.prediction.stationarity import StationarityCache, differencing_order
+from dashboards.tensor_store import TensorStore
+
+
+def trending_rows(seed: int = 0) -> pd.DataFrame:
+    """Two states of a trending indicator with LGA rows, a missing value and rows in no particular order."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for state, slope in [('Abia', 2.0), ('Lagos', 0.0)]:
+        for year in range(1990, 2020):
+            lgas = ['All', 'LGA 1'] if year % 3 else ['All']
+            frames.append(pd.DataFrame({'Indicator': 'Immunisation', 'Period': year, 'State': state, 'LGA': lgas,
+                                        'Source': 'NHMIS',
+                                        'Value': slope * (year - 1990) + rng.normal(0, 1, len(lgas))}))
+    rows = pd.concat(frames, ignore_index=True)
+    rows.loc[5, 'Value'] = np.nan
+    return rows.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def test_analyse_all_tests_the_series_the_forecasts_fit():
+    rows = trending_rows()
+    cache = StationarityCache()
+    table = cache.analyse_all(rows)
+    assert len(table) == 2 and table['error'].isna().all()
+
+    store = TensorStore(rows)
+    orders = cache.orders()
+    for key, *_ in series_tasks(rows, []):
+        indicator, state, source, _ = key
+        # what prediction_operation hands to ForecastModelCache.fit
+        values = store.series_rows(source, indicator, state)['Value'].fillna(method='ffill').to_numpy()
+        assert orders[key] == differencing_order(values)
+
+
+def test_workers_start_with_the_orders_handed_to_them(tmp_path):
+    rows = trending_rows()
+    cache = StationarityCache()
+    cache.analyse_all(rows)
+    batch_forecast.init_worker(str(tmp_path), cache.orders())
+    assert batch_forecast._model_cache.stationarity.orders() == cache.orders()
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dashboards.tensor_store import TensorStore
+
+TOLERANCE = 1e-9
+
+
+def long_rows(rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    Long format rows laid out like the correlation input sheet, with several LGA rows landing in
+    some cells and missing values. The values are small integers so float32 holds their sums exactly.
+    """
+    rng = np.random.default_rng(seed)
+    data_frame = pd.DataFrame({
+        'Indicator': rng.choice([f"Indicator {i}" for i in range(6)], rows),
+        'Period': rng.integers(2000, 2010, rows),
+        'State': rng.choice([f"State {i:02d}" for i in range(12)], rows),
+        'LGA': rng.choice(['All', 'LGA 1', 'LGA 2'], rows),
+        'Source': rng.choice(['IHME', 'DHS', 'MICS'], rows),
+        'Value': rng.integers(0, 50, rows).astype('float64'),
+    })
+    data_frame.loc[rng.random(rows) < 0.15, 'Value'] = np.nan
+    # a state whose only rows have missing values
+    data_frame.loc[data_frame['State'] == 'State 11', 'Value'] = np.nan
+    return data_frame
+
+
+def select_rows(rows: pd.DataFrame, query: dict) -> pd.DataFrame:
+    """Picks the rows matching a query of column to a label or a list of labels."""
+    mask = np.ones(len(rows), dtype=bool)
+    for column, value in query.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        mask &= rows[column].isin(values).to_numpy()
+    return rows[mask]
+
+
+def summed(rows: pd.DataFrame, dimensions: list) -> pd.Series:
+    """Sums the values of the rows over every dimension not kept, groups without a value are NaN."""
+    return rows.groupby(dimensions)['Value'].sum(min_count=1)
+
+
+QUERIES = [
+    {'Source': ['IHME'], 'Period': 2005},
+    {'Source': ['IHME', 'MICS'], 'Period': [2001, 2003, 2008], 'Indicator': ['Indicator 0', 'Indicator 3']},
+    {'Source': 'DHS'},
+    {},
+]
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_pivot_matches_pandas(query):
+    rows = long_rows()
+    result = TensorStore(rows).pivot(query, 'State', 'Indicator')
+    expected = summed(select_rows(rows, query), ['State', 'Indicator']).unstack('Indicator')
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+    assert list(result.index) == list(expected.index)
+    assert list(result.columns) == list(expected.columns)
+
+
+def test_pivot_fill_value():
+    rows = long_rows()
+    query = {'Source': ['DHS'], 'Period': 2002}
+    result = TensorStore(rows).pivot(query, 'State', 'Indicator', fill_value=0)
+    expected = summed(select_rows(rows, query), ['State', 'Indicator']).unstack('Indicator').fillna(0)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=TOLERANCE)
+
+
+# a dimension picked with a single label is dropped, so it can't be kept
+@pytest.mark.parametrize('query', QUERIES[1:])
+@pytest.mark.parametrize('require_value', [False, True])
+def test_aggregate_matches_pandas(query, require_value):
+    rows = long_rows(seed=1)
+    dimensions = ['Period', 'State', 'Indicator']
+    values, present, labels = TensorStore(rows).aggregate(query, dimensions, require_value=require_value)
+
+    selected = select_rows(rows, query)
+    if require_value:
+        selected = selected.dropna(subset=['Value'])
+    expected = summed(selected, dimensions)
+    for dimension, dimension_labels in zip(dimensions, labels):
+        assert list(dimension_labels) == sorted(selected[dimension].unique())
+
+    full = expected.reindex(pd.MultiIndex.from_product(labels, names=dimensions))
+    np.testing.assert_allclose(values.ravel(), full.to_numpy(), rtol=0, atol=TOLERANCE, equal_nan=True)
+    has_row = selected.groupby(dimensions).size().reindex(full.index, fill_value=0) > 0
+    np.testing.assert_array_equal(present.ravel(), has_row.to_numpy())
+
+
+def test_aggregate_keeps_dimensions_in_the_order_asked_for():
+    rows = long_rows(seed=2)
+    store = TensorStore(rows)
+    values, _, (indicators, sources) = store.aggregate({'Period': [2004, 2005]}, ['Indicator', 'Source'])
+    transposed, _, (sources_first, indicators_second) = store.aggregate({'Period': [2004, 2005]},
+                                                                         ['Source', 'Indicator'])
+    assert list(indicators) == list(indicators_second) and list(sources) == list(sources_first)
+    np.testing.assert_array_equal(values, transposed.T)
+
+
+def test_aggregate_of_a_label_not_in_the_table_is_empty():
+    values, present, labels = TensorStore(long_rows()).aggregate({'Source': 'NDHS'}, ['State', 'Indicator'])
+    assert values.shape == (0, 0) and present.shape == (0, 0)
+    assert [len(dimension_labels) for dimension_labels in labels] == [0, 0]
+
+
+def test_series_rows_match_the_table():
+    rows = long_rows(seed=3)
+    store = TensorStore(rows)
+    series = store.series_rows('IHME', 'Indicator 1', 'State 02')
+    # the rows of a period, e.g one per LGA, are averaged
+    expected = select_rows(rows, {'Source': 'IHME', 'Indicator': 'Indicator 1', 'State': 'State 02'}) \
+        .groupby('Period')['Value'].mean()
+    np.testing.assert_array_equal(series['Period'].to_numpy(), expected.index.to_numpy())
+    # float32 holds the sums exactly but not every mean
+    np.testing.assert_allclose(series['Value'].to_numpy(), expected.to_numpy(), rtol=1e-6, equal_nan=True)
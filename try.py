@@ -1,6 +1,6 @@
 import plotly.express as px
 import pandas as pd
-from column_formatter import ColumnFormatter
+from dashboards.correlation.column_formatter import ColumnFormatter
 from dash import dcc, Dash, html
 from dash.dependencies import Input, Output
 
@@ -60,8 +60,8 @@ def correlation_operations(data_frame:pd.DataFrame, query_elem:str, query,
     target_map = column_formatter.enumerate_column()
     print(f"New index column successfully enumerated\n\n")
 
-    # replace current values in the column with their maped enumerated equivalent(it prints a confirmation message if successful)
-    column_formatter.replace_column_values(target_map=target_map)
+    # replace current values in the column with their maped enumerated equivalent
+    refined_df[new_index_column] = column_formatter.replace_column_values(target_map=target_map)
 
     # reshape the table
     reshaped_table = reshape_table(data_frame=refined_df, new_columns=new_columns, new_index=new_index_column, new_values=new_values)